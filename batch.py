@@ -0,0 +1,200 @@
+"""
+Ponto de entrada da Sofia em modo batch (offline).
+
+Lê um ficheiro JSONL de mensagens, uma por linha, e grava um JSONL de
+respostas com a intenção detectada e os tempos de cada uma. Serve para
+avaliações e testes de regressão com milhares de mensagens.
+
+- O ficheiro de entrada é lido em streaming e as respostas são gravadas à
+  medida que ficam prontas, pelo que a memória não cresce com o ficheiro.
+- Até --concorrencia mensagens são processadas em simultâneo, mas as
+  mensagens do mesmo user_id são sempre processadas pela ordem do ficheiro
+  (o estado da conversa, como o modo boards, depende dessa ordem).
+- Um checkpoint regista as linhas concluídas; se o processo for interrompido,
+  volta a correr com os mesmos argumentos para continuar de onde parou.
+
+Cada linha de entrada é um objeto JSON com a mensagem em 'mensagem' (ou
+'message', 'body', 'texto') e, opcionalmente, 'user_id', 'nome_usuario' e
+'id' (ou 'request_id').
+
+Uso:
+    python batch.py mensagens.jsonl respostas.jsonl --concorrencia 8
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import sys
+import time
+from typing import Any, Dict, Optional, Set
+
+CAMPOS_MENSAGEM = ('mensagem', 'message', 'body', 'texto')
+CAMPOS_ID = ('id', 'request_id')
+
+
+class Checkpoint:
+    """
+    As linhas já concluídas: todas até 'contigua', mais as concluídas fora de ordem acima dela.
+    """
+    def __init__(self, caminho: str):
+        self.caminho = caminho
+        self.contigua = 0
+        self.acima: Set[int] = set()
+        if os.path.exists(caminho):
+            with open(caminho, encoding="utf-8") as f:
+                dados = json.load(f)
+            self.contigua = dados.get('contigua', 0)
+            self.acima = set(dados.get('acima', []))
+
+    def concluida(self, linha: int) -> bool:
+        return linha <= self.contigua or linha in self.acima
+
+    def marcar(self, linha: int):
+        """Marca a linha como concluída e grava o checkpoint (de forma atómica)."""
+        self.acima.add(linha)
+        while self.contigua + 1 in self.acima:
+            self.contigua += 1
+            self.acima.discard(self.contigua)
+        temporario = self.caminho + ".tmp"
+        with open(temporario, "w", encoding="utf-8") as f:
+            json.dump({'contigua': self.contigua, 'acima': sorted(self.acima)}, f)
+        os.replace(temporario, self.caminho)
+
+
+def _ler_pedido(linha: str) -> Dict[str, Any]:
+    """
+    Interpreta uma linha de entrada.
+
+    Raises:
+        ValueError: Se a linha não for JSON ou não tiver a mensagem.
+    """
+    dados = json.loads(linha)
+    if not isinstance(dados, dict):
+        raise ValueError("a linha não é um objeto JSON")
+    mensagem = next((dados[c] for c in CAMPOS_MENSAGEM if dados.get(c)), None)
+    if mensagem is None:
+        raise ValueError(f"sem nenhum dos campos {', '.join(CAMPOS_MENSAGEM)}")
+    return {
+        'id': next((dados[c] for c in CAMPOS_ID if c in dados), None),
+        'user_id': str(dados.get('user_id', 'batch')),
+        'nome_usuario': dados.get('nome_usuario', "Usuário"),
+        'mensagem': str(mensagem),
+    }
+
+
+async def processar_ficheiro(sofia: Any, entrada: str, saida: str, concorrencia: int = 8, caminho_checkpoint: Optional[str] = None, recomecar: bool = False) -> Dict[str, int]:
+    """
+    Processa o ficheiro de entrada e grava as respostas.
+
+    Args:
+        sofia (Any): A SofiaBrain (ou qualquer objeto com o método processar).
+        entrada (str): O ficheiro JSONL de mensagens.
+        saida (str): O ficheiro JSONL de respostas.
+        concorrencia (int): O número máximo de mensagens em processamento.
+        caminho_checkpoint (Optional[str]): O ficheiro do checkpoint (por padrão, saida + '.checkpoint').
+        recomecar (bool): Se True, ignora o checkpoint e reescreve a saída desde o início.
+
+    Returns:
+        Dict[str, int]: Quantas linhas foram processadas, quantas falharam e quantas já estavam concluídas.
+    """
+    caminho_checkpoint = caminho_checkpoint or saida + ".checkpoint"
+    if recomecar and os.path.exists(caminho_checkpoint):
+        os.remove(caminho_checkpoint)
+    retomar = os.path.exists(caminho_checkpoint)
+    checkpoint = Checkpoint(caminho_checkpoint)
+    if retomar:
+        print(f"⏯️  A retomar do checkpoint: linhas 1-{checkpoint.contigua} (e mais {len(checkpoint.acima)}) já concluídas.", file=sys.stderr)
+
+    semaforo = asyncio.Semaphore(concorrencia)
+    # A última tarefa de cada usuário em curso; só contém usuários com mensagens por terminar
+    ultimas: Dict[str, asyncio.Task] = {}
+    pendentes: Set[asyncio.Task] = set()
+    estatisticas = {'processadas': 0, 'erros': 0, 'ja_concluidas': 0}
+
+    with open(saida, "a" if retomar else "w", encoding="utf-8") as f_saida:
+        def _gravar(numero: int, registo: Dict[str, Any]):
+            f_saida.write(json.dumps(registo, ensure_ascii=False) + "\n")
+            f_saida.flush()
+            checkpoint.marcar(numero)
+            estatisticas['processadas'] += 1
+            estatisticas['erros'] += 'erro' in registo
+            if estatisticas['processadas'] % 100 == 0:
+                print(f"📝 {estatisticas['processadas']} mensagem(ns) processada(s)...", file=sys.stderr)
+
+        async def _executar(numero: int, pedido: Dict[str, Any], anterior: Optional[asyncio.Task]):
+            tarefa = asyncio.current_task()
+            chegada = time.perf_counter()
+            try:
+                if anterior is not None:
+                    await asyncio.wait([anterior])
+                registo = {'linha': numero, **pedido, 'espera_ms': round((time.perf_counter() - chegada) * 1000, 1)}
+                try:
+                    resposta = await sofia.processar(pedido['user_id'], pedido['mensagem'], pedido['nome_usuario'])
+                    registo.update(resposta=resposta.texto, intencao=resposta.intencao, duracao_ms=round(resposta.duracao_ms, 1))
+                except Exception as e:
+                    registo['erro'] = f"{type(e).__name__}: {e}"
+                _gravar(numero, registo)
+            finally:
+                semaforo.release()
+                if ultimas.get(pedido['user_id']) is tarefa:
+                    del ultimas[pedido['user_id']]
+
+        with open(entrada, encoding="utf-8") as f_entrada:
+            for numero, linha in enumerate(f_entrada, 1):
+                if checkpoint.concluida(numero):
+                    estatisticas['ja_concluidas'] += 1
+                    continue
+                if not linha.strip():
+                    checkpoint.marcar(numero)
+                    continue
+                try:
+                    pedido = _ler_pedido(linha)
+                except ValueError as e:
+                    _gravar(numero, {'linha': numero, 'erro': f"Linha inválida: {e}"})
+                    continue
+
+                await semaforo.acquire()
+                tarefa = asyncio.create_task(_executar(numero, pedido, ultimas.get(pedido['user_id'])))
+                ultimas[pedido['user_id']] = tarefa
+                pendentes.add(tarefa)
+                tarefa.add_done_callback(pendentes.discard)
+
+        if pendentes:
+            await asyncio.wait(pendentes)
+
+    return estatisticas
+
+
+async def main(args: argparse.Namespace):
+    from brain import SofiaBrain
+    from config import constants
+
+    sofia = SofiaBrain(app_constants=vars(constants))
+    inicio = time.perf_counter()
+    with contextlib.ExitStack() as pilha:
+        if args.silencioso:
+            pilha.enter_context(contextlib.redirect_stdout(pilha.enter_context(open(os.devnull, "w"))))
+        estatisticas = await processar_ficheiro(sofia, args.entrada, args.saida, args.concorrencia, args.checkpoint, args.recomecar)
+    print(
+        f"✅ {estatisticas['processadas']} mensagem(ns) processada(s) em {time.perf_counter() - inicio:.1f}s "
+        f"({estatisticas['erros']} com erro, {estatisticas['ja_concluidas']} já concluída(s) antes).",
+        file=sys.stderr
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sofia em modo batch: mensagens em JSONL, respostas em JSONL.")
+    parser.add_argument("entrada", help="Ficheiro JSONL com as mensagens.")
+    parser.add_argument("saida", help="Ficheiro JSONL onde gravar as respostas.")
+    parser.add_argument("--concorrencia", type=int, default=8)
+    parser.add_argument("--checkpoint", default=None, help="Ficheiro do checkpoint (por padrão, <saida>.checkpoint).")
+    parser.add_argument("--recomecar", action="store_true", help="Ignora o checkpoint e recomeça do início.")
+    parser.add_argument("--silencioso", action="store_true", help="Não mostra os logs de cada mensagem.")
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(main(args))
+    except KeyboardInterrupt:
+        print("\n⏸️  Interrompido; volte a correr o mesmo comando para continuar.", file=sys.stderr)
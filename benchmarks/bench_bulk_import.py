@@ -0,0 +1,102 @@
+"""
+Benchmark do tempo de carga de funcionários, projetos e participações.
+
+Compara a inserção linha a linha pelo ORM (uma consulta por nome para não
+duplicar e um db.add por linha, como no database/setup.py) com a importação
+em massa de database/bulk.py (lotes numa única transação), a partir dos
+mesmos ficheiros CSV sintéticos, em bases SQLite temporárias.
+
+Uso:
+    python -m benchmarks.bench_bulk_import --funcionarios 5000 --projetos 500 --participantes 8
+"""
+
+import argparse
+import csv
+import os
+import tempfile
+import time
+from typing import Dict
+
+from sqlalchemy.orm import sessionmaker
+
+from database import bulk, models
+from database.session import criar_engine
+
+
+def _gerar_ficheiros(pasta: str, total_funcionarios: int, total_projetos: int, participantes_por_projeto: int) -> Dict[str, str]:
+    """Escreve os CSVs sintéticos e devolve o caminho de cada um, por tabela."""
+    dados = {
+        'funcionarios': (('nome', 'cargo', 'setor'), [
+            {'nome': f"Funcionário {i}", 'cargo': "Dev", 'setor': ""} for i in range(total_funcionarios)
+        ]),
+        'projetos': (('nome', 'descricao', 'status'), [
+            {'nome': f"Projeto {i}", 'descricao': "Descrição.", 'status': "Ativo"} for i in range(total_projetos)
+        ]),
+        'participacoes': (('funcionario', 'projeto'), [
+            {'funcionario': f"Funcionário {(i * participantes_por_projeto + j) % total_funcionarios}", 'projeto': f"Projeto {i}"}
+            for i in range(total_projetos) for j in range(participantes_por_projeto)
+        ]),
+    }
+    caminhos = {}
+    for tabela, (colunas, linhas) in dados.items():
+        caminhos[tabela] = os.path.join(pasta, f"{tabela}.csv")
+        with open(caminhos[tabela], 'w', encoding='utf-8', newline='') as ficheiro:
+            escritor = csv.DictWriter(ficheiro, fieldnames=colunas)
+            escritor.writeheader()
+            escritor.writerows(linhas)
+    return caminhos
+
+
+def _carregar_linha_a_linha(engine, caminhos: Dict[str, str]):
+    """Carrega os ficheiros pelo ORM, uma linha de cada vez."""
+    db = sessionmaker(bind=engine)()
+    try:
+        for linha in bulk.ler_ficheiro(caminhos['funcionarios']):
+            if not db.query(models.Funcionario).filter_by(nome=linha['nome']).first():
+                db.add(models.Funcionario(nome=linha['nome'], cargo=linha['cargo']))
+                db.flush()
+        for linha in bulk.ler_ficheiro(caminhos['projetos']):
+            if not db.query(models.Projeto).filter_by(nome=linha['nome']).first():
+                db.add(models.Projeto(nome=linha['nome'], descricao=linha['descricao'], status=linha['status']))
+                db.flush()
+        for linha in bulk.ler_ficheiro(caminhos['participacoes']):
+            funcionario = db.query(models.Funcionario).filter_by(nome=linha['funcionario']).first()
+            projeto = db.query(models.Projeto).filter_by(nome=linha['projeto']).first()
+            if funcionario and projeto and funcionario not in projeto.participantes:
+                projeto.participantes.append(funcionario)
+        db.commit()
+    finally:
+        db.close()
+
+
+def _carregar_em_massa(engine, caminhos: Dict[str, str]):
+    """Carrega os ficheiros com a importação em massa."""
+    for tabela in ('funcionarios', 'projetos', 'participacoes'):
+        bulk.importar_ficheiro(engine, tabela, caminhos[tabela])
+
+
+def executar(total_funcionarios: int, total_projetos: int, participantes_por_projeto: int) -> Dict[str, float]:
+    """Mede, em segundos, o tempo de carga de cada abordagem numa base de dados nova."""
+    resultados = {}
+    with tempfile.TemporaryDirectory() as pasta:
+        caminhos = _gerar_ficheiros(pasta, total_funcionarios, total_projetos, participantes_por_projeto)
+        for nome, carregar in (('linha_a_linha', _carregar_linha_a_linha), ('em_massa', _carregar_em_massa)):
+            engine = criar_engine(f"sqlite:///{os.path.join(pasta, f'{nome}.db')}")
+            models.Base.metadata.create_all(bind=engine)
+            inicio = time.perf_counter()
+            carregar(engine, caminhos)
+            resultados[nome] = time.perf_counter() - inicio
+            engine.dispose()
+    return resultados
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Tempo de carga: ORM linha a linha vs. importação em massa.")
+    parser.add_argument("--funcionarios", type=int, default=5000)
+    parser.add_argument("--projetos", type=int, default=500)
+    parser.add_argument("--participantes", type=int, default=8)
+    args = parser.parse_args()
+
+    total_linhas = args.funcionarios + args.projetos + args.projetos * args.participantes
+    for abordagem, segundos in executar(args.funcionarios, args.projetos, args.participantes).items():
+        print(f"{abordagem:>13}: {segundos:.2f}s ({total_linhas / segundos:,.0f} linhas/s)")
@@ -0,0 +1,138 @@
+"""
+Benchmark da latência de preparação de uma pergunta geral.
+
+Compara a ordem anterior do handle_general_question (classificar o tom, depois
+formatar o histórico e depois montar o prompt) com a preparação em paralelo
+(tom, histórico e fragmentos com asyncio.gather), usando uma OpenAI falsa com
+latência configurável e uma base SQLite temporária com dados sintéticos.
+
+A preparação em paralelo é medida sem e com o cache de respostas configurado
+(como no SofiaBrain); com o cache, cada pergunta é uma falha no cache, o
+caminho em que o prompt tem mesmo de ser montado.
+
+O cenário "frio" invalida o cache de fragmentos antes de cada pergunta (como
+depois de uma escrita na base de dados); o "quente" usa o cache.
+
+Uso:
+    python -m benchmarks.bench_general_pipeline --latencia-tom 0.3 --projetos 500
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from typing import Dict
+
+from sqlalchemy.orm import sessionmaker
+
+from benchmarks.bench_knowledge_queries import _popular
+from config import prompts
+from core.answer_cache import CacheRespostas
+from database import models
+from database.fragment_cache import incrementar_versao
+from database.session import criar_engine, PoolSessoesLeitura, ExecutorBD
+from handlers import general_handlers
+
+PERGUNTAS = [
+    "Quem participa no Projeto 7?",
+    "O que faz o Setor 3?",
+    "Quem lidera o Setor 1?",
+    "Quando acontece a Cerimónia 2?",
+]
+
+
+class _OpenAIFalsa:
+    def __init__(self, latencia_tom: float):
+        self._latencia_tom = latencia_tom
+
+    async def classificar_tom_mensagem(self, mensagem: str) -> str:
+        await asyncio.sleep(self._latencia_tom)
+        return "neutro"
+
+    async def gerar_resposta_geral(self, **kwargs) -> str:
+        return "ok"
+
+
+class _HistoricoFalso:
+    def format_for_prompt(self, user_id: str) -> str:
+        return "Usuário: olá\nSofia: Olá! Como posso ajudar?"
+
+
+async def _sequencial(openai, historico_conversa, executor_bd, mensagem: str):
+    """Reproduz a ordem anterior: tom, depois histórico, depois prompt."""
+    tom = await openai.classificar_tom_mensagem(mensagem)
+    historico = historico_conversa.format_for_prompt("bench")
+    system_prompt = await prompts.gerar_system_prompt_async(executor_bd, historico, tom, pergunta=mensagem)
+    return await openai.gerar_resposta_geral(user_message=mensagem, system_prompt=system_prompt)
+
+
+async def _paralelo(openai, historico_conversa, executor_bd, mensagem: str):
+    return await general_handlers.handle_general_question(
+        "bench", mensagem, "Bench", None, openai, historico_conversa, {}, executor_bd=executor_bd
+    )
+
+
+async def _paralelo_com_cache(openai, historico_conversa, executor_bd, mensagem: str):
+    # Um cache vazio a cada pergunta: mede a falha no cache, que tem de montar o prompt
+    return await general_handlers.handle_general_question(
+        "bench", mensagem, "Bench", None, openai, historico_conversa, {}, executor_bd=executor_bd,
+        cache_respostas=CacheRespostas()
+    )
+
+
+async def _medir(abordagem, openai, historico_conversa, executor_bd, repeticoes: int, frio: bool) -> float:
+    """Devolve a latência média, em milissegundos, por pergunta."""
+    total = 0.0
+    for _ in range(repeticoes):
+        for mensagem in PERGUNTAS:
+            if frio:
+                incrementar_versao(models.Projeto.__tablename__)
+            inicio = time.perf_counter()
+            await abordagem(openai, historico_conversa, executor_bd, mensagem)
+            total += time.perf_counter() - inicio
+    return total / (repeticoes * len(PERGUNTAS)) * 1000
+
+
+def executar(latencia_tom: float, total_projetos: int, participantes: int, repeticoes: int) -> Dict[str, Dict[str, float]]:
+    """Mede as abordagens, com o cache de fragmentos frio e quente."""
+    with tempfile.TemporaryDirectory() as pasta:
+        url = f"sqlite:///{os.path.join(pasta, 'bench.db')}"
+        engine = criar_engine(url)
+        models.Base.metadata.create_all(bind=engine)
+        _popular(sessionmaker(bind=engine), total_projetos, participantes)
+        executor_bd = ExecutorBD(PoolSessoesLeitura(criar_engine(url, somente_leitura=True)))
+        openai, historico_conversa = _OpenAIFalsa(latencia_tom), _HistoricoFalso()
+
+        async def _correr():
+            resultados = {}
+            for cenario, frio in (('frio', True), ('quente', False)):
+                sequencial = await _medir(_sequencial, openai, historico_conversa, executor_bd, repeticoes, frio)
+                paralelo = await _medir(_paralelo, openai, historico_conversa, executor_bd, repeticoes, frio)
+                com_cache = await _medir(_paralelo_com_cache, openai, historico_conversa, executor_bd, repeticoes, frio)
+                resultados[cenario] = {
+                    'sequencial_ms': sequencial, 'paralelo_ms': paralelo, 'paralelo_com_cache_ms': com_cache,
+                    'poupado_ms': sequencial - paralelo,
+                }
+            return resultados
+
+        resultados = asyncio.run(_correr())
+        executor_bd.fechar()
+        executor_bd.sessoes.fechar()
+        engine.dispose()
+    return resultados
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Latência por pergunta geral: preparação sequencial vs. em paralelo.")
+    parser.add_argument("--latencia-tom", type=float, default=0.3, help="Latência simulada da classificação do tom, em segundos.")
+    parser.add_argument("--projetos", type=int, default=500)
+    parser.add_argument("--participantes", type=int, default=8)
+    parser.add_argument("--repeticoes", type=int, default=5)
+    args = parser.parse_args()
+
+    for cenario, metricas in executar(args.latencia_tom, args.projetos, args.participantes, args.repeticoes).items():
+        print(
+            f"{cenario:>6}: sequencial {metricas['sequencial_ms']:.1f} ms, paralelo {metricas['paralelo_ms']:.1f} ms, "
+            f"paralelo com cache de respostas {metricas['paralelo_com_cache_ms']:.1f} ms (poupados {metricas['poupado_ms']:.1f} ms por pergunta)"
+        )
@@ -0,0 +1,131 @@
+"""
+Benchmark do número de consultas SQL necessárias para montar os fragmentos do prompt.
+
+Compara a abordagem anterior (cada fragmento consulta a base de dados e as
+participações são carregadas projeto a projeto) com o carregamento em bloco
+de database/knowledge.py, com e sem o cache versionado de fragmentos, numa
+base SQLite temporária com dados sintéticos.
+
+Uso:
+    python -m benchmarks.bench_knowledge_queries --projetos 50 --participantes 8
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from typing import Callable, Dict
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from config import prompts
+from database import models
+from database import fragments
+from database.knowledge import carregar_conhecimento
+
+
+def _popular(Session, total_projetos: int, participantes_por_projeto: int):
+    """Cria dados sintéticos com projetos, funcionários e participações."""
+    db = Session()
+    db.add(models.Persona(descricao="Você é Sofia."))
+    db.add(models.Empresa(nome="Sonar", descricao="Empresa de tecnologia."))
+    for i in range(5):
+        db.add(models.Setor(nome=f"Setor {i}", descricao="Descrição do setor."))
+        db.add(models.Gerente(nome=f"Gerente {i}", area=f"Setor {i}"))
+        db.add(models.Cerimonia(nome=f"Cerimónia {i}", descricao="Semanal."))
+    funcionarios = [models.Funcionario(nome=f"Funcionário {i}", cargo="Dev") for i in range(total_projetos * 2)]
+    db.add_all(funcionarios)
+    for i in range(total_projetos):
+        projeto = models.Projeto(nome=f"Projeto {i}", descricao="Descrição.", status="Ativo")
+        projeto.participantes = funcionarios[i:i + participantes_por_projeto]
+        db.add(projeto)
+    for i in range(20):
+        db.add(models.ConhecimentoManual(pergunta=f"Pergunta {i}?", resposta=f"Resposta {i}."))
+    db.commit()
+    db.close()
+
+
+def _fragmentos_antes(db) -> list:
+    """Reproduz as consultas feitas pelos geradores antes do carregamento em bloco."""
+    textos = [
+        str(db.query(models.Persona).first()),
+        str(db.query(models.Empresa).first()),
+        str(db.query(models.Setor).all()),
+        str(db.query(models.Funcionario).limit(15).all()),
+        str(db.query(models.Gerente).all()),
+        str(db.query(models.Projeto).filter_by(status="Ativo").all()),
+    ]
+    for projeto in db.query(models.Projeto).filter(models.Projeto.participantes.any()).limit(5).all():
+        textos.append(", ".join(p.nome for p in projeto.participantes))
+    textos.append(str(db.query(models.ConhecimentoManual).limit(10).all()))
+    textos.append(str(db.query(models.Cerimonia).all()))
+    return textos
+
+
+def _fragmentos_depois(db) -> list:
+    """Carrega o conhecimento em bloco e gera todos os fragmentos a partir dele."""
+    conhecimento = carregar_conhecimento(db)
+    return [
+        fragments.gerar_fragmento_persona(conhecimento),
+        fragments.gerar_fragmento_empresa(conhecimento),
+        fragments.gerar_fragmento_setores(conhecimento),
+        fragments.gerar_fragmento_funcionarios(conhecimento),
+        fragments.gerar_fragmento_gerentes(conhecimento),
+        fragments.gerar_fragmento_projetos(conhecimento),
+        fragments.gerar_fragmento_participacoes(conhecimento),
+        fragments.gerar_fragmento_conhecimentos(conhecimento),
+        fragments.gerar_fragmento_cerimonias(conhecimento),
+    ]
+
+
+def _medir(engine, Session, funcao: Callable, repeticoes: int) -> Dict[str, float]:
+    """Mede o número de consultas e o tempo médio de uma abordagem."""
+    contador = {'consultas': 0}
+
+    def _contar(*args):
+        contador['consultas'] += 1
+
+    event.listen(engine, "before_cursor_execute", _contar)
+    try:
+        inicio = time.perf_counter()
+        for _ in range(repeticoes):
+            db = Session()
+            funcao(db)
+            db.close()
+        duracao = time.perf_counter() - inicio
+    finally:
+        event.remove(engine, "before_cursor_execute", _contar)
+
+    return {
+        'consultas_por_prompt': contador['consultas'] / repeticoes,
+        'ms_por_prompt': duracao / repeticoes * 1000,
+    }
+
+
+def executar(total_projetos: int, participantes_por_projeto: int, repeticoes: int) -> Dict[str, Dict[str, float]]:
+    """Executa o benchmark e devolve as métricas de cada abordagem."""
+    with tempfile.TemporaryDirectory() as pasta:
+        engine = create_engine(f"sqlite:///{os.path.join(pasta, 'bench.db')}")
+        models.Base.metadata.create_all(bind=engine)
+        Session = sessionmaker(bind=engine)
+        _popular(Session, total_projetos, participantes_por_projeto)
+
+        resultados = {
+            'antes': _medir(engine, Session, _fragmentos_antes, repeticoes),
+            'depois': _medir(engine, Session, _fragmentos_depois, repeticoes),
+            'com_cache': _medir(engine, Session, prompts.gerar_fragmentos_estaticos, repeticoes),
+        }
+        engine.dispose()
+    return resultados
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Consultas SQL por prompt: antes e depois do carregamento em bloco.")
+    parser.add_argument("--projetos", type=int, default=50)
+    parser.add_argument("--participantes", type=int, default=8)
+    parser.add_argument("--repeticoes", type=int, default=50)
+    args = parser.parse_args()
+
+    for abordagem, metricas in executar(args.projetos, args.participantes, args.repeticoes).items():
+        print(f"{abordagem:>9}: {metricas['consultas_por_prompt']:.0f} consultas, {metricas['ms_por_prompt']:.2f} ms por prompt")
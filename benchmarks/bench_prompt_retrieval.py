@@ -0,0 +1,74 @@
+"""
+Benchmark do tamanho e do tempo de montagem do prompt de sistema.
+
+Compara o prompt com todos os fragmentos (setores, equipa, projetos...) com o
+prompt que só inclui o conhecimento relevante para a pergunta (BM25 local),
+numa base SQLite temporária com dados sintéticos.
+
+Uso:
+    python -m benchmarks.bench_prompt_retrieval --projetos 200 --participantes 8
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from typing import Dict
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from benchmarks.bench_knowledge_queries import _popular
+from config import prompts
+from database import models
+from database.retrieval import estimar_tokens
+
+PERGUNTAS = [
+    "Quem participa no Projeto 7?",
+    "O que faz o Setor 3?",
+    "Quem lidera o Setor 1?",
+    "Quando acontece a Cerimónia 2?",
+    "Qual é a resposta para a Pergunta 4?",
+]
+
+
+def executar(total_projetos: int, participantes_por_projeto: int, repeticoes: int) -> Dict[str, Dict[str, float]]:
+    """Mede tokens e tempo por prompt, com e sem seleção por relevância."""
+    with tempfile.TemporaryDirectory() as pasta:
+        engine = create_engine(f"sqlite:///{os.path.join(pasta, 'bench.db')}")
+        models.Base.metadata.create_all(bind=engine)
+        Session = sessionmaker(bind=engine)
+        _popular(Session, total_projetos, participantes_por_projeto)
+
+        db = Session()
+        abordagens = {
+            'completo': lambda pergunta: prompts.gerar_system_prompt(db, "", "neutro"),
+            'relevante': lambda pergunta: prompts.gerar_system_prompt(db, "", "neutro", pergunta=pergunta),
+        }
+
+        resultados = {}
+        for nome, montar in abordagens.items():
+            tokens = [estimar_tokens(montar(p)) for p in PERGUNTAS]
+            inicio = time.perf_counter()
+            for _ in range(repeticoes):
+                for pergunta in PERGUNTAS:
+                    montar(pergunta)
+            duracao = time.perf_counter() - inicio
+            resultados[nome] = {
+                'tokens_medios': sum(tokens) / len(tokens),
+                'ms_por_prompt': duracao / (repeticoes * len(PERGUNTAS)) * 1000,
+            }
+        db.close()
+        engine.dispose()
+    return resultados
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Tamanho e tempo do prompt: completo vs. conhecimento relevante.")
+    parser.add_argument("--projetos", type=int, default=200)
+    parser.add_argument("--participantes", type=int, default=8)
+    parser.add_argument("--repeticoes", type=int, default=50)
+    args = parser.parse_args()
+
+    for abordagem, metricas in executar(args.projetos, args.participantes, args.repeticoes).items():
+        print(f"{abordagem:>9}: ~{metricas['tokens_medios']:.0f} tokens, {metricas['ms_por_prompt']:.3f} ms por prompt")
@@ -0,0 +1,86 @@
+"""
+Benchmark da camada de resiliência perante um serviço externo degradado.
+
+Simula perguntas gerais concorrentes (classificação do tom + resposta) contra
+uma OpenAI falsa lenta e com falhas, com e sem o ClienteResiliente, e compara
+a latência por pedido, o número de chamadas que chegam ao serviço e as
+respostas de fallback.
+
+Uso:
+    python -m benchmarks.bench_resilience --pedidos 300 --concorrencia 50 --latencia 0.5 --taxa-falhas 0.8
+"""
+
+import argparse
+import asyncio
+import time
+from typing import Any, Dict, List
+
+from benchmarks.fake_services import OpenAIFalsa, Perturbacao
+from core.resilience import ClienteResiliente, PoliticaResiliencia, ServicoResiliente
+
+
+async def _pergunta(openai: Any) -> bool:
+    """Devolve True se a pergunta foi respondida, False se caiu no fallback."""
+    try:
+        await openai.classificar_tom_mensagem("pergunta")
+        await openai.gerar_resposta_geral(user_message="pergunta", system_prompt="")
+        return True
+    except Exception:
+        return False
+
+
+async def _executar_cenario(openai: Any, pedidos: int, concorrencia: int) -> Dict[str, float]:
+    semaforo = asyncio.Semaphore(concorrencia)
+    latencias: List[float] = []
+    respondidas = 0
+
+    async def _um_pedido():
+        nonlocal respondidas
+        async with semaforo:
+            inicio = time.perf_counter()
+            respondidas += await _pergunta(openai)
+            latencias.append(time.perf_counter() - inicio)
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(_um_pedido() for _ in range(pedidos)))
+    duracao = time.perf_counter() - inicio
+    latencias.sort()
+    return {
+        'duracao_s': duracao,
+        'p50_ms': latencias[len(latencias) // 2] * 1000,
+        'p99_ms': latencias[int(len(latencias) * 0.99) - 1] * 1000,
+        'respondidas': respondidas,
+    }
+
+
+def executar(pedidos: int, concorrencia: int, latencia: float, taxa_falhas: float) -> Dict[str, Dict[str, float]]:
+    """Corre o mesmo cenário degradado sem e com a camada de resiliência."""
+    resultados = {}
+    for nome in ('direto', 'resiliente'):
+        perturbacao = Perturbacao(latencia=latencia, jitter=latencia / 4, taxa_falhas=taxa_falhas, semente=42)
+        openai: Any = OpenAIFalsa(perturbacao)
+        cliente = None
+        if nome == 'resiliente':
+            cliente = ClienteResiliente('openai', PoliticaResiliencia(max_concorrencia=16, tentativas=2, espera_base=0.05, limiar_falhas=5, tempo_aberto=30.0))
+            openai = ServicoResiliente(openai, cliente, ['classificar_tom_mensagem'])
+        resultados[nome] = asyncio.run(_executar_cenario(openai, pedidos, concorrencia))
+        resultados[nome]['chamadas_servico'] = perturbacao.chamadas
+        if cliente:
+            resultados[nome]['rejeitadas'] = cliente.metricas()['rejeitadas']
+    return resultados
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serviço externo degradado: chamadas diretas vs. camada de resiliência.")
+    parser.add_argument("--pedidos", type=int, default=300)
+    parser.add_argument("--concorrencia", type=int, default=50)
+    parser.add_argument("--latencia", type=float, default=0.5, help="Latência simulada de cada chamada, em segundos.")
+    parser.add_argument("--taxa-falhas", type=float, default=0.8)
+    args = parser.parse_args()
+
+    for cenario, m in executar(args.pedidos, args.concorrencia, args.latencia, args.taxa_falhas).items():
+        print(
+            f"{cenario:>10}: {m['duracao_s']:.2f}s no total, p50 {m['p50_ms']:.0f} ms, p99 {m['p99_ms']:.0f} ms, "
+            f"{m['respondidas']} respondida(s), {m['chamadas_servico']} chamada(s) ao serviço"
+            + (f", {m['rejeitadas']} rejeitada(s) pelo disjuntor" if 'rejeitadas' in m else "")
+        )
@@ -0,0 +1,174 @@
+"""
+Benchmark do débito do modo multi-processo em função do número de workers.
+
+Arranca a FrenteWorkers e N workers sintéticos (cada um num processo, com o
+seu CacheManager e o cache partilhado em SQLite) e envia pedidos concorrentes
+de vários usuários. Cada pedido faz o trabalho de CPU de uma pergunta sobre
+boards (análise da mensagem, deteção de intenção e consultas ao BoardSnapshot);
+o board é "buscado" (latência simulada + construção do snapshot) uma vez, antes
+da carga, tal como no aquecimento do primeiro worker, e os restantes workers
+recebem-no pelo cache partilhado.
+
+Os ganhos dependem dos núcleos disponíveis: numa máquina com um só núcleo o
+débito não aumenta, mas o board continua a ser buscado uma única vez.
+
+Uso:
+    python -m benchmarks.bench_workers --workers 1,2,4 --pedidos 400 --work-items 20000
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import tempfile
+import time
+from typing import Any, Dict, List
+
+from core.worker_pool import FrenteWorkers, iniciar_workers, ler_pedido, resposta_http
+
+PORTA_FRENTE = 8290
+PORTA_BASE_WORKERS = 8300
+
+
+def _worker_sintetico(indice: int, porta: int, caminho_cache: str, work_items: int, latencia_azure: float):
+    """Processo worker com o mesmo trabalho de CPU de uma pergunta sobre boards."""
+    from benchmarks.suite import PERGUNTAS_BOARDS, _carregar_constantes, _work_items
+    from core import board_query
+    from core.board_snapshot import BoardSnapshot
+    from core.cache import CacheManager
+    from core.intent_router import detect_intent
+    from core.message_analysis import MessageAnalysis
+    from core.shared_cache import CacheCompartilhado
+
+    constantes = _carregar_constantes()
+    partilhado = CacheCompartilhado(caminho_cache)
+    cache = CacheManager(600, 300, shared_cache=partilhado)
+
+    async def _responder(mensagem: str) -> Dict[str, Any]:
+        hits_partilhados = partilhado.hits
+        snapshot = cache.get("boards_Bench")
+        origem = "partilhado" if partilhado.hits > hits_partilhados else "local"
+        if snapshot is None:
+            origem = "azure"
+            await asyncio.sleep(latencia_azure)
+            snapshot = BoardSnapshot("Bench", _work_items(work_items), constantes)
+            cache.set("boards_Bench", snapshot)
+        detect_intent(mensagem, "bench", {}, constantes, MessageAnalysis(mensagem, constantes))
+        for pergunta in PERGUNTAS_BOARDS:
+            consulta = board_query.interpretar_pergunta(pergunta, snapshot, constantes)
+            board_query.executar_consulta(snapshot, consulta)
+        return {'origem': origem, 'worker': indice}
+
+    async def _ligacao(reader, writer):
+        try:
+            metodo, caminho, corpo = await ler_pedido(reader)
+            if caminho.startswith('/health'):
+                writer.write(resposta_http(200, {'pronto': True}))
+            else:
+                writer.write(resposta_http(200, await _responder(json.loads(corpo)['mensagem'])))
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def _servir():
+        servidor = await asyncio.start_server(_ligacao, '127.0.0.1', porta)
+        async with servidor:
+            await servidor.serve_forever()
+
+    with open(os.devnull, "w") as nulo, contextlib.redirect_stdout(nulo):
+        asyncio.run(_servir())
+
+
+def _frente(indice: int, porta: int, portas_workers: List[int]):
+    with open(os.devnull, "w") as nulo, contextlib.redirect_stdout(nulo):
+        asyncio.run(FrenteWorkers(portas_workers).servir('127.0.0.1', porta))
+
+
+async def _pedido(caminho: str, corpo: bytes = b'', metodo: str = 'POST') -> Dict[str, Any]:
+    reader, writer = await asyncio.open_connection('127.0.0.1', PORTA_FRENTE)
+    writer.write(f"{metodo} {caminho} HTTP/1.1\r\nContent-Length: {len(corpo)}\r\n\r\n".encode('latin-1') + corpo)
+    await writer.drain()
+    bruto = await reader.read()
+    writer.close()
+    cabecalho, _, dados = bruto.partition(b'\r\n\r\n')
+    if b' 200 ' not in cabecalho.split(b'\r\n', 1)[0]:
+        raise ConnectionError(cabecalho.decode('latin-1'))
+    return json.loads(dados)
+
+
+async def _aguardar_pronto(timeout: float = 60.0):
+    limite = time.monotonic() + timeout
+    while True:
+        try:
+            await _pedido('/health/ready', metodo='GET')
+            return
+        except (OSError, ConnectionError):
+            if time.monotonic() > limite:
+                raise
+            await asyncio.sleep(0.2)
+
+
+async def _carga(pedidos: int, concorrencia: int, usuarios: int) -> Dict[str, Any]:
+    semaforo = asyncio.Semaphore(concorrencia)
+    latencias: List[float] = []
+    origens: Dict[str, int] = {}
+
+    async def _um(i: int):
+        corpo = json.dumps({'user_id': f"usuario_{i % usuarios}", 'mensagem': "quantos bugs em andamento no modo boards"}).encode()
+        async with semaforo:
+            inicio = time.perf_counter()
+            resposta = await _pedido('/mensagem', corpo)
+            latencias.append(time.perf_counter() - inicio)
+            origens[resposta['origem']] = origens.get(resposta['origem'], 0) + 1
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(_um(i) for i in range(pedidos)))
+    duracao = time.perf_counter() - inicio
+    latencias.sort()
+    return {
+        'pedidos_s': pedidos / duracao,
+        'p50_ms': latencias[len(latencias) // 2] * 1000,
+        'p95_ms': latencias[int(len(latencias) * 0.95) - 1] * 1000,
+        'origens': origens,
+    }
+
+
+def executar(lista_workers: List[int], pedidos: int, concorrencia: int, usuarios: int, work_items: int, latencia_azure: float) -> Dict[int, Dict[str, Any]]:
+    """Mede o débito para cada número de workers, com um cache partilhado novo em cada cenário."""
+    resultados = {}
+    for total in lista_workers:
+        with tempfile.TemporaryDirectory() as pasta:
+            caminho_cache = os.path.join(pasta, "shared_cache.db")
+            portas = [PORTA_BASE_WORKERS + i for i in range(total)]
+            processos = iniciar_workers(_worker_sintetico, total, PORTA_BASE_WORKERS, caminho_cache, work_items, latencia_azure)
+            processos += iniciar_workers(_frente, 1, PORTA_FRENTE, portas)
+            try:
+                asyncio.run(_aguardar_pronto())
+                # Como o aquecimento do primeiro worker: o board é buscado antes da carga
+                asyncio.run(_pedido('/mensagem', json.dumps({'user_id': "aquecimento", 'mensagem': "modo boards"}).encode()))
+                resultados[total] = asyncio.run(_carga(pedidos, concorrencia, usuarios))
+            finally:
+                for processo in processos:
+                    processo.terminate()
+                    processo.join()
+    return resultados
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Débito do modo multi-processo por número de workers.")
+    parser.add_argument("--workers", default="1,2,4", help="Números de workers a medir, separados por vírgulas.")
+    parser.add_argument("--pedidos", type=int, default=400)
+    parser.add_argument("--concorrencia", type=int, default=32)
+    parser.add_argument("--usuarios", type=int, default=50)
+    parser.add_argument("--work-items", type=int, default=20000)
+    parser.add_argument("--latencia-azure", type=float, default=1.0, help="Latência simulada da busca de um board, em segundos.")
+    args = parser.parse_args()
+
+    print(f"🖥️  {os.cpu_count()} núcleo(s) disponível(is)")
+    lista = [int(n) for n in args.workers.split(",")]
+    for total, m in executar(lista, args.pedidos, args.concorrencia, args.usuarios, args.work_items, args.latencia_azure).items():
+        print(
+            f"{total:>2} worker(s): {m['pedidos_s']:.1f} pedidos/s, p50 {m['p50_ms']:.0f} ms, p95 {m['p95_ms']:.0f} ms, "
+            f"origem do board: {m['origens']}"
+        )
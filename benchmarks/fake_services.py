@@ -0,0 +1,96 @@
+"""
+Serviços externos falsos (OpenAI, SharePoint, Azure Boards), com latência e
+falhas injetáveis, para exercitar a Sofia e a camada de resiliência sem
+depender dos serviços reais.
+
+A latência, o jitter e a taxa de falhas podem ser alterados a meio de uma
+execução (ex: para simular uma degradação e depois a recuperação).
+"""
+
+import asyncio
+import random
+import time
+from typing import Dict, List, Optional
+
+
+class FalhaInjetada(Exception):
+    """Erro simulado de um serviço externo (um 503, para contar como falha do serviço)."""
+    status_code = 503
+
+
+class Perturbacao:
+    """
+    Latência e falhas a injetar nas chamadas de um serviço falso.
+    """
+    def __init__(self, latencia: float = 0.0, jitter: float = 0.0, taxa_falhas: float = 0.0, semente: Optional[int] = None):
+        self.latencia = latencia
+        self.jitter = jitter
+        self.taxa_falhas = taxa_falhas
+        self.chamadas = 0
+        self._rng = random.Random(semente)
+
+    def _sortear(self) -> float:
+        self.chamadas += 1
+        return max(0.0, self.latencia + self._rng.uniform(-self.jitter, self.jitter))
+
+    def _talvez_falhar(self, operacao: str):
+        if self._rng.random() < self.taxa_falhas:
+            raise FalhaInjetada(f"Falha simulada em '{operacao}'.")
+
+    async def aguardar(self, operacao: str):
+        await asyncio.sleep(self._sortear())
+        self._talvez_falhar(operacao)
+
+    def aguardar_sync(self, operacao: str):
+        time.sleep(self._sortear())
+        self._talvez_falhar(operacao)
+
+
+class OpenAIFalsa:
+    """Imita a interface do OpenAIService usada pelos handlers."""
+    def __init__(self, perturbacao: Optional[Perturbacao] = None):
+        self.perturbacao = perturbacao or Perturbacao()
+
+    async def classificar_tom_mensagem(self, mensagem: str) -> str:
+        await self.perturbacao.aguardar('classificar_tom_mensagem')
+        return "neutro"
+
+    async def interpretar_termo_busca(self, termo: str) -> str:
+        await self.perturbacao.aguardar('interpretar_termo_busca')
+        return termo.strip()
+
+    async def gerar_resposta_geral(self, user_message: str = "", system_prompt: str = "", **kwargs) -> str:
+        await self.perturbacao.aguardar('gerar_resposta_geral')
+        return f"Resposta simulada para: {user_message}"
+
+
+class SharePointFalso:
+    """Imita a interface (síncrona) do SharePointService usada pelos handlers."""
+    def __init__(self, perturbacao: Optional[Perturbacao] = None, arquivos: Optional[List[Dict]] = None):
+        self.perturbacao = perturbacao or Perturbacao()
+        self.arquivos = arquivos if arquivos is not None else [
+            {'name': f"Relatorio_{i}.docx", 'webUrl': f"https://exemplo.sharepoint.com/Relatorio_{i}.docx",
+             'lastModifiedDateTime': "2024-01-01T10:00:00Z"}
+            for i in range(20)
+        ]
+
+    def search_files(self, termo: str) -> List[Dict]:
+        self.perturbacao.aguardar_sync('search_files')
+        return [a for a in self.arquivos if termo.lower() in a['name'].lower()]
+
+    def list_recent_files(self, limit: int = 10) -> List[Dict]:
+        self.perturbacao.aguardar_sync('list_recent_files')
+        return self.arquivos[:limit]
+
+
+class AzureBoardsFalso:
+    """Imita a interface (síncrona) do AzureBoardsService, instanciado por projeto."""
+    perturbacao = Perturbacao()
+    total_work_items = 100
+
+    def __init__(self, projeto: str):
+        self.projeto = projeto
+
+    def buscar_work_items(self, batch_size: int = 200) -> List[Dict]:
+        self.perturbacao.aguardar_sync('buscar_work_items')
+        return [{'id': i, 'fields': {'System.Title': f"Tarefa {i}", 'System.State': "Active"}} for i in range(self.total_work_items)]
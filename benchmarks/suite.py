@@ -0,0 +1,429 @@
+"""
+Suite de micro-benchmarks dos caminhos críticos da Sofia, com limiares de regressão.
+
+Cobre a deteção de intenção, o CacheManager com 10k+ chaves, os helpers de
+busca e de URLs, os formatadores do file_handler, as consultas aos boards em
+DataFrames sintéticos de 1k a 100k work items e o gerar_system_prompt sobre
+uma cópia do sofia.db (o ficheiro original nunca é aberto para escrita).
+
+Cada caso é calibrado para correr pelo menos --tempo-minimo segundos por
+repetição e guarda a mediana e o mínimo do tempo por chamada. Os resultados
+são gravados em JSON e comparados com a baseline: um caso regride quando a
+sua mediana ultrapassa a da baseline em mais do que o limiar. Nesse caso o
+processo termina com código 1, para poder ser usado na integração contínua.
+
+Uso:
+    python -m benchmarks.suite --guardar-baseline           # grava a baseline desta máquina
+    python -m benchmarks.suite                              # compara com a baseline
+    python -m benchmarks.suite --filtro boards --limiar 0.3
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import platform
+import re
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.fake_services import SharePointFalso
+from config import constants, prompts
+from core import board_query
+from core.board_snapshot import BoardSnapshot
+from core.cache import CacheManager
+from core.file_catalog import CatalogoArquivos
+from core.intent_router import detect_intent, _calculate_file_score
+from core.message_analysis import MessageAnalysis
+from database.fragment_cache import incrementar_versao
+from database.session import criar_engine, PoolSessoesLeitura
+from handlers import file_handler
+from utils import helpers
+
+PASTA = os.path.dirname(os.path.abspath(__file__))
+BASELINE_PADRAO = os.path.join(PASTA, "baseline.json")
+RESULTADOS_PADRAO = os.path.join(PASTA, "resultados.json")
+LIMIAR_PADRAO = 0.25
+
+MENSAGENS = [
+    "Olá, tudo bem?",
+    "buscar arquivo relatorio_final.docx",
+    "me mostra os 5 arquivos mais recentes",
+    "quantos bugs em andamento da Maria no sonar labs",
+    "Qual é a missão da empresa?",
+    "quero ensinar uma resposta nova",
+    "encontrar o documento da proposta comercial de março",
+    "estava só a pensar numa ideia para o projeto",
+]
+
+PERGUNTAS_BOARDS = [
+    "quantos bugs em andamento da Maria Silva",
+    "tarefas a fazer do cliente Cliente 3",
+    "quantas tarefas concluídas por responsável",
+]
+
+
+class Caso(NamedTuple):
+    nome: str
+    preparar: Callable[["Contexto"], Callable[[], Any]]
+    limiar: Optional[float] = None
+
+
+CASOS: List[Caso] = []
+
+
+def caso(nome: str, limiar: Optional[float] = None):
+    """Regista um caso; a função decorada prepara os dados e devolve o callable a medir."""
+    def _registar(preparar: Callable[["Contexto"], Callable[[], Any]]):
+        CASOS.append(Caso(nome, preparar, limiar))
+        return preparar
+    return _registar
+
+
+class Contexto:
+    """Dados partilhados entre os casos (constantes compiladas, base de dados copiada, loop)."""
+    def __init__(self, caminho_db: str):
+        self.constants = _carregar_constantes()
+        self.loop = asyncio.new_event_loop()
+        self._pasta = tempfile.TemporaryDirectory()
+        self._caminho_db = caminho_db
+        self._sessoes: Optional[PoolSessoesLeitura] = None
+        self._snapshots: Dict[int, BoardSnapshot] = {}
+
+    @property
+    def sessoes(self) -> PoolSessoesLeitura:
+        if self._sessoes is None:
+            copia = os.path.join(self._pasta.name, "sofia.db")
+            shutil.copy(self._caminho_db, copia)
+            self._sessoes = PoolSessoesLeitura(criar_engine(f"sqlite:///{copia}", somente_leitura=True))
+        return self._sessoes
+
+    def snapshot(self, total: int) -> BoardSnapshot:
+        if total not in self._snapshots:
+            self._snapshots[total] = BoardSnapshot("Bench", _work_items(total), self.constants)
+        return self._snapshots[total]
+
+    def fechar(self):
+        if self._sessoes is not None:
+            self._sessoes.fechar()
+            self._sessoes.engine.dispose()
+        self.loop.close()
+        self._pasta.cleanup()
+
+
+def _carregar_constantes() -> Dict[str, Any]:
+    """Reproduz o SofiaBrain._load_constants_and_patterns sem instanciar os serviços."""
+    carregadas = {k: getattr(constants, k) for k in dir(constants) if k.isupper()}
+    for nome, valor in vars(prompts).items():
+        if nome.isupper() and isinstance(valor, str):
+            carregadas.setdefault(nome, valor)
+    regex_patterns = dict(carregadas.get('REGEX_PATTERNS', {}))
+    regex_patterns['file_extension_compiled'] = re.compile(regex_patterns.get('file_extension', r'\.\w+$'), re.IGNORECASE)
+    regex_patterns['file_naming_compiled'] = re.compile(regex_patterns.get('file_naming', ''))
+    regex_patterns['greeting_compiled'] = re.compile(regex_patterns.get('greeting', '^ola'), re.IGNORECASE)
+    carregadas['REGEX_PATTERNS'] = regex_patterns
+    return carregadas
+
+
+def _work_items(total: int, semente: int = 42) -> pd.DataFrame:
+    """Gera um DataFrame sintético com as colunas usadas pelas consultas aos boards."""
+    rng = np.random.default_rng(semente)
+    tipos = np.array(["Task", "Bug", "User Story", "Feature"])
+    estados = np.array(["New", "Active", "Em Andamento", "Done", "Closed", "To Do"])
+    responsaveis = np.array([f"{p} {a}" for p in ("Maria", "João", "Ana", "Pedro", "Rita") for a in ("Silva", "Costa", "Ávila", "Santos")])
+    clientes = np.array([f"Cliente {i}" for i in range(30)])
+    datas = pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 365, total), unit="D")
+    return pd.DataFrame({
+        'id': np.arange(total),
+        'titulo': [f"Item {i}" for i in range(total)],
+        'tipo': tipos[rng.integers(0, len(tipos), total)],
+        'estado': estados[rng.integers(0, len(estados), total)],
+        'responsavel': responsaveis[rng.integers(0, len(responsaveis), total)],
+        'cliente': clientes[rng.integers(0, len(clientes), total)],
+        'epico': [f"Épico {i % 50}" for i in range(total)],
+        'data_criacao': datas,
+        'data_alteracao': datas,
+        'url': [f"https://dev.azure.com/bench/_workitems/edit/{i}" for i in range(total)],
+    })
+
+
+def _arquivos(total: int) -> List[Dict[str, str]]:
+    return [
+        {'name': f"Relatorio_{i}.docx", 'webUrl': f"https://exemplo.sharepoint.com/sites/equipa/Relatorio_{i}.docx",
+         'lastModifiedDateTime': f"2024-03-{1 + i % 28:02d}T10:{i % 60:02d}:00Z"}
+        for i in range(total)
+    ]
+
+
+# --- Casos ---
+
+@caso("intent.detect_intent")
+def _detect_intent(ctx: Contexto):
+    def _executar():
+        for mensagem in MENSAGENS:
+            detect_intent(mensagem, "bench", {}, ctx.constants, MessageAnalysis(mensagem, ctx.constants))
+    return _executar
+
+
+@caso("intent.calculate_file_score")
+def _file_score(ctx: Contexto):
+    regex = ctx.constants['REGEX_PATTERNS']
+
+    def _executar():
+        for mensagem in MENSAGENS:
+            _calculate_file_score(MessageAnalysis(mensagem, ctx.constants), regex['file_extension_compiled'], regex['file_naming_compiled'])
+    return _executar
+
+
+def _cache_cheio(total: int) -> CacheManager:
+    cache = CacheManager(default_duration_seconds=600, cleanup_interval_seconds=-1)
+    for i in range(total):
+        cache.set(f"chave_{i}", i)
+    return cache
+
+
+@caso("cache.set_10k")
+def _cache_set(ctx: Contexto):
+    cache = _cache_cheio(10_000)
+    return lambda: cache.set("chave_5000", 1)
+
+
+@caso("cache.get_10k")
+def _cache_get(ctx: Contexto):
+    cache = _cache_cheio(10_000)
+    return lambda: (cache.get("chave_5000"), cache.get("inexistente"))
+
+
+@caso("cache.cleanup_10k")
+def _cache_cleanup(ctx: Contexto):
+    return _cache_cheio(10_000).cleanup
+
+
+@caso("helpers.extract_search_term")
+def _extract_search_term(ctx: Contexto):
+    c = ctx.constants
+
+    def _executar():
+        for mensagem in MENSAGENS:
+            helpers.extract_search_term(mensagem, c['REGEX_PATTERNS'], c['FILE_KEYWORDS'], c['MIN_WORD_LENGTH'], c['MAX_RELEVANT_WORDS'])
+    return _executar
+
+
+@caso("helpers.obter_url_valida")
+def _obter_url_valida(ctx: Contexto):
+    c = ctx.constants
+    arquivos = _arquivos(20)
+
+    def _executar():
+        for arquivo in arquivos:
+            helpers.obter_url_valida(arquivo, c['URL_FIELDS'], c['URL_VALIDATION_PATTERNS'], c['INVALID_URL_PATTERNS'])
+    return _executar
+
+
+@caso("file_handler.formatar_resultados_busca")
+def _formatar_busca(ctx: Contexto):
+    itens = CatalogoArquivos().registar(_arquivos(20))
+    return lambda: file_handler._formatar_resultados_busca("relatorio", itens, ctx.constants, helpers)
+
+
+@caso("file_handler.buscar_arquivo_em_cache")
+def _buscar_em_cache(ctx: Contexto):
+    cache = CacheManager(600, 300)
+    catalogo = CatalogoArquivos()
+    sharepoint = SharePointFalso(arquivos=_arquivos(20))
+    ctx.loop.run_until_complete(file_handler.buscar_arquivo_por_termo("Relatorio", cache, sharepoint, None, ctx.constants, helpers, catalogo))
+    return lambda: ctx.loop.run_until_complete(file_handler.buscar_arquivo_por_termo("relatório ", cache, sharepoint, None, ctx.constants, helpers, catalogo))
+
+
+@caso("file_handler.listar_arquivos_recentes")
+def _listar_recentes(ctx: Contexto):
+    sharepoint = SharePointFalso(arquivos=_arquivos(20))
+    return lambda: ctx.loop.run_until_complete(file_handler.listar_arquivos_recentes(sharepoint, ctx.constants, helpers, 20))
+
+
+for _total in (1_000, 10_000, 100_000):
+    def _registar_boards(total: int):
+        sufixo = f"{total // 1000}k"
+
+        @caso(f"boards.snapshot_{sufixo}", limiar=0.5)
+        def _construir(ctx: Contexto):
+            df = _work_items(total)
+            return lambda: BoardSnapshot("Bench", df, ctx.constants)
+
+        @caso(f"boards.consulta_{sufixo}")
+        def _consultar(ctx: Contexto):
+            snapshot = ctx.snapshot(total)
+
+            def _executar():
+                for pergunta in PERGUNTAS_BOARDS:
+                    responsavel = snapshot.identificar_responsavel(set(helpers.tokenizar(pergunta)))
+                    consulta = board_query.interpretar_pergunta(pergunta, snapshot, ctx.constants, responsavel)
+                    board_query.executar_consulta(snapshot, consulta)
+            return _executar
+
+        @caso(f"boards.tarefas_{sufixo}")
+        def _tarefas(ctx: Contexto):
+            snapshot = ctx.snapshot(total)
+            return lambda: snapshot.tarefas(responsavel="Maria Silva", grupo_estado="em andamento", com_epicos=False)
+
+    _registar_boards(_total)
+
+
+@caso("prompts.gerar_system_prompt_quente")
+def _prompt_quente(ctx: Contexto):
+    def _executar():
+        with ctx.sessoes.sessao() as db:
+            prompts.gerar_system_prompt(db, "Usuário: olá\nSofia: Olá!", "neutro", pergunta=MENSAGENS[4])
+    return _executar
+
+
+@caso("prompts.gerar_system_prompt_frio", limiar=0.5)
+def _prompt_frio(ctx: Contexto):
+    def _executar():
+        # Simula uma escrita no conhecimento: os fragmentos têm de ser reconstruídos
+        incrementar_versao("projeto")
+        with ctx.sessoes.sessao() as db:
+            prompts.gerar_system_prompt(db, "Usuário: olá\nSofia: Olá!", "neutro", pergunta=MENSAGENS[4])
+    return _executar
+
+
+# --- Medição e comparação ---
+
+def medir(funcao: Callable[[], Any], repeticoes: int, tempo_minimo: float) -> Dict[str, float]:
+    """
+    Mede o tempo por chamada de uma função.
+
+    Args:
+        funcao (Callable): A função a medir (já com os dados preparados).
+        repeticoes (int): Quantas repetições calibradas correr.
+        tempo_minimo (float): A duração mínima, em segundos, de cada repetição.
+
+    Returns:
+        Dict[str, float]: A mediana e o mínimo por chamada (µs) e o número de chamadas por repetição.
+    """
+    funcao()  # aquecimento (caches, imports preguiçosos)
+    execucoes = 1
+    while True:
+        inicio = time.perf_counter()
+        for _ in range(execucoes):
+            funcao()
+        if time.perf_counter() - inicio >= tempo_minimo or execucoes >= 1_000_000:
+            break
+        execucoes *= 2
+
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        for _ in range(execucoes):
+            funcao()
+        tempos.append((time.perf_counter() - inicio) / execucoes * 1e6)
+    return {'mediana_us': statistics.median(tempos), 'min_us': min(tempos), 'execucoes': execucoes}
+
+
+def executar(filtro: str = "", caminho_db: str = "sofia.db", repeticoes: int = 5, tempo_minimo: float = 0.2) -> Dict[str, Any]:
+    """Corre os casos cujo nome contém o filtro e devolve os resultados com os metadados da máquina."""
+    ctx = Contexto(caminho_db)
+    resultados: Dict[str, Dict[str, float]] = {}
+    try:
+        for c in CASOS:
+            if filtro not in c.nome:
+                continue
+            print(f"⏱️  {c.nome}...", file=sys.stderr)
+            # Os logs dos componentes (ex: CacheManager) não devem inundar a saída do benchmark
+            with open(os.devnull, "w") as nulo, contextlib.redirect_stdout(nulo):
+                resultados[c.nome] = medir(c.preparar(ctx), repeticoes, tempo_minimo)
+    finally:
+        ctx.fechar()
+    return {
+        'gerado_em': datetime.now().isoformat(timespec="seconds"),
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+        'resultados': resultados,
+    }
+
+
+def comparar(atual: Dict[str, Any], baseline: Dict[str, Any], limiar: float) -> List[str]:
+    """
+    Imprime a comparação com a baseline e devolve os nomes dos casos que regrediram.
+
+    O limiar de cada caso (se definido no registo) prevalece sobre o global.
+    """
+    limiares = {c.nome: c.limiar for c in CASOS if c.limiar is not None}
+    regressoes = []
+    print(f"{'caso':<44} {'baseline':>12} {'atual':>12} {'variação':>9}")
+    for nome, medicao in atual['resultados'].items():
+        base = baseline.get('resultados', {}).get(nome)
+        if base is None:
+            print(f"{nome:<44} {'-':>12} {medicao['mediana_us']:>10.1f}µs {'novo':>9}")
+            continue
+        variacao = medicao['mediana_us'] / base['mediana_us'] - 1
+        regrediu = variacao > limiares.get(nome, limiar)
+        if regrediu:
+            regressoes.append(nome)
+        print(
+            f"{nome:<44} {base['mediana_us']:>10.1f}µs {medicao['mediana_us']:>10.1f}µs {variacao:>+8.0%}"
+            + (" ❌ regressão" if regrediu else "")
+        )
+    return regressoes
+
+
+def _ler_json(caminho: str) -> Optional[Dict[str, Any]]:
+    if not os.path.exists(caminho):
+        return None
+    with open(caminho, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _escrever_json(caminho: str, dados: Dict[str, Any]):
+    with open(caminho, "w", encoding="utf-8") as f:
+        json.dump(dados, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Micro-benchmarks dos caminhos críticos, comparados com uma baseline.")
+    parser.add_argument("--filtro", default="", help="Corre só os casos cujo nome contém este texto (ex: 'boards').")
+    parser.add_argument("--db", default="sofia.db", help="A base de dados a copiar para os casos de prompts.")
+    parser.add_argument("--repeticoes", type=int, default=5)
+    parser.add_argument("--tempo-minimo", type=float, default=0.2, help="Duração mínima, em segundos, de cada repetição.")
+    parser.add_argument("--saida", default=RESULTADOS_PADRAO, help="Onde gravar os resultados em JSON.")
+    parser.add_argument("--baseline", default=BASELINE_PADRAO)
+    parser.add_argument("--limiar", type=float, default=LIMIAR_PADRAO, help="Regressão máxima tolerada (0.25 = 25%% mais lento).")
+    parser.add_argument("--guardar-baseline", action="store_true", help="Grava os resultados como a nova baseline.")
+    parser.add_argument("--listar", action="store_true", help="Lista os casos registados e termina.")
+    args = parser.parse_args()
+
+    if args.listar:
+        print("\n".join(c.nome for c in CASOS))
+        sys.exit(0)
+
+    atual = executar(args.filtro, args.db, args.repeticoes, args.tempo_minimo)
+    _escrever_json(args.saida, atual)
+    print(f"💾 Resultados gravados em {args.saida}")
+
+    if args.guardar_baseline:
+        baseline = _ler_json(args.baseline) or {'resultados': {}}
+        baseline.update({k: v for k, v in atual.items() if k != 'resultados'})
+        baseline['resultados'].update(atual['resultados'])
+        _escrever_json(args.baseline, baseline)
+        print(f"📌 Baseline atualizada em {args.baseline}")
+        sys.exit(0)
+
+    baseline = _ler_json(args.baseline)
+    if baseline is None:
+        print(f"⚠️ Sem baseline em {args.baseline}; corra com --guardar-baseline para a criar.")
+        sys.exit(0)
+
+    regressoes = comparar(atual, baseline, args.limiar)
+    if regressoes:
+        print(f"❌ {len(regressoes)} caso(s) regrediram além do limiar: {', '.join(regressoes)}")
+        sys.exit(1)
+    print("✅ Nenhuma regressão além do limiar.")
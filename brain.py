@@ -8,9 +8,25 @@ processamento para o handler apropriado.
 """
 
 import re
-from typing import Dict, Any
+import asyncio
+import time
+from typing import Dict, Any, List, NamedTuple
 from core.cache import CacheManager
+from core.shared_cache import CacheCompartilhado
+from core.warmup import EstadoAquecimento, CHAVE_ESTADO_PARTILHADO
+from core.board_history import HistoricoBoards
+from core.answer_index import IndiceRespostas
+from core.answer_cache import CacheRespostas
+from core.memory import ContabilidadeMemoria
+from core.file_catalog import catalogo_arquivos
+from core.scheduler import EscalonadorFaixas, FAIXA_RAPIDA
+from core.resilience import ClienteResiliente, PoliticaResiliencia, ServicoResiliente, CircuitoAberto, fabrica_resiliente
+from database.session import criar_engine, PoolSessoesLeitura, ExecutorBD
+from database import fragment_cache
+from database.fragment_cache import cache_fragmentos
+from database.models import ConhecimentoManual
 from core.intent_router import detect_intent
+from core.message_analysis import MessageAnalysis
 from handlers import general_handler, file_handler, boards_handler
 from utils import helpers
 from config import constants, prompts
@@ -18,9 +34,16 @@ from src.services.api.openai.openai_service import OpenAIService
 from src.services.history.conversation_history import ConversationHistory
 from src.services.module.sharepoint.sharepoint_service import SharePointService
 from src.services.module.boards import processing as boards_processing_module
+from src.services.module.boards.azure_boards_service import AzureBoardsService
 from config.settings import SessionLocal, DB_CONN_STR
 
 
+class RespostaSofia(NamedTuple):
+    texto: str
+    intencao: str
+    duracao_ms: float
+
+
 class SofiaBrain:
     """
     A classe orquestradora que conecta todos os componentes da Sofia.
@@ -42,13 +65,17 @@ class SofiaBrain:
         self.sharepoint_service = SharePointService()
         self.conversation_history = ConversationHistory()
         self.boards_processing = boards_processing_module
+        self.azure_boards_service = AzureBoardsService
         self.openai_service = type('obj', (object,), {'classificar_tom_mensagem' : lambda x: 'neutro', 'gerar_resposta_geral': lambda **kwargs: 'Resposta da OpenAI.'})()
         self.sharepoint_service = None
         self.conversation_history = type('obj', (object,), {'add_interaction' : lambda *args: None, 'format_for_prompt': lambda x: ''})()
         self.boards_processing = None
+        self._proteger_servicos_externos()
+        self.cache_partilhado = CacheCompartilhado(self.constants['SHARED_CACHE_DB']) if self.constants.get('SHARED_CACHE_DB') else None
         self.cache_manager = CacheManager(
             default_duration_seconds=self.constants.get('CACHE_DURATION', 600),
-            cleanup_interval_seconds=self.constants.get('CACHE_CLEANUP_INTERVAL', 300)
+            cleanup_interval_seconds=self.constants.get('CACHE_CLEANUP_INTERVAL', 300),
+            shared_cache=self.cache_partilhado
         )
         
         self.user_states: Dict[str, Any] = {
@@ -58,12 +85,101 @@ class SofiaBrain:
             'ultimo_colaborador_consultado': {},
             'ultimo_board_por_usuario': {},
         }
+        self.estado_aquecimento = EstadoAquecimento()
+        # Tarefas de fundo do modo servidor (aquecimento, relatórios...), canceladas ao terminar
+        self.tarefas_fundo: List[asyncio.Task] = []
+        self.historico_boards = HistoricoBoards(
+            self.constants.get('BOARDS_HISTORY_DB', 'boards_history.db'),
+            retencao_dias=self.constants.get('BOARDS_HISTORY_RETENTION_DAYS', 90)
+        )
+        self.sessoes_leitura = PoolSessoesLeitura(
+            criar_engine(DB_CONN_STR, somente_leitura=True, pool_size=self.constants.get('READ_SESSION_POOL_SIZE', 8)),
+            tamanho_maximo=self.constants.get('READ_SESSION_POOL_SIZE', 8)
+        )
+        self.executor_bd = ExecutorBD(self.sessoes_leitura, self.constants.get('DB_EXECUTOR_THREADS', 4))
+        # As versões das tabelas vêm da base de dados, para ver também as escritas de outros processos
+        fragment_cache.configurar(self.sessoes_leitura.engine, self.constants.get('KNOWLEDGE_VERSION_CHECK_INTERVAL', 1.0))
+        self.indice_respostas = self._carregar_indice_respostas()
+        self._lock_indice = asyncio.Lock()
+        self.cache_respostas = CacheRespostas(
+            limiar_semelhanca=self.constants.get('ANSWER_CACHE_SIMILARITY', 0.8),
+            ttl_segundos=self.constants.get('ANSWER_CACHE_TTL', 3600),
+            max_entradas=self.constants.get('ANSWER_CACHE_MAX_ENTRIES', 1000),
+            palavras_excluidas=self.constants.get('HISTORY_DEPENDENT_KEYWORDS', [])
+        )
+        self.escalonador = EscalonadorFaixas(self.constants.get('SCHEDULER_LANES', {}))
+        self.memoria = self._criar_contabilidade_memoria()
         
         print("✅ Sofia pronta para conversar!")
 
+    def _carregar_indice_respostas(self) -> IndiceRespostas:
+        """Carrega as perguntas aprendidas manualmente para um índice novo em memória."""
+        indice = IndiceRespostas(self.constants.get('ANSWER_MATCH_THRESHOLD', 0.8))
+        indice.versao = fragment_cache.versao(ConhecimentoManual.__tablename__)
+        try:
+            with self.sessoes_leitura.sessao() as db:
+                total = indice.carregar(db)
+            print(f"📚 {total} resposta(s) aprendida(s) carregada(s).")
+        except Exception as e:
+            print(f"⚠️ Não foi possível carregar as respostas aprendidas: {e}")
+        return indice
+
+    async def _sincronizar_indice_respostas(self):
+        """
+        Recarrega o índice, numa thread, quando a tabela das respostas aprendidas muda noutro processo.
+
+        Os aprendizados deste processo já são acrescentados ao índice pelo handle_learning,
+        que também avança a versão do índice; só as escritas de outros workers obrigam a recarregar.
+        """
+        if fragment_cache.versao(ConhecimentoManual.__tablename__) == self.indice_respostas.versao:
+            return
+        async with self._lock_indice:
+            if fragment_cache.versao(ConhecimentoManual.__tablename__) != self.indice_respostas.versao:
+                self.indice_respostas = await asyncio.to_thread(self._carregar_indice_respostas)
+
+    def _criar_contabilidade_memoria(self) -> ContabilidadeMemoria:
+        """Regista os componentes que guardam dados em memória, para o relatório de memória."""
+        memoria = ContabilidadeMemoria(
+            usar_tracemalloc=self.constants.get('MEMORY_TRACEMALLOC_ENABLED', False),
+            frames_tracemalloc=self.constants.get('MEMORY_TRACEMALLOC_FRAMES', 1),
+            top_alocacoes=self.constants.get('MEMORY_TOP_ALLOCATIONS', 10)
+        )
+        memoria.registar('cache_manager', lambda: self.cache_manager)
+        memoria.registar('user_states', lambda: self.user_states)
+        memoria.registar('historico_conversas', lambda: self.conversation_history)
+        memoria.registar('cache_fragmentos', lambda: cache_fragmentos)
+        memoria.registar('catalogo_arquivos', lambda: catalogo_arquivos)
+        memoria.registar('cache_respostas', lambda: self.cache_respostas)
+        memoria.registar('indice_respostas', lambda: self.indice_respostas)
+        memoria.registar('montador_prompt', lambda: prompts.montador_prompt)
+        return memoria
+
+    def _proteger_servicos_externos(self):
+        """Faz passar as chamadas à OpenAI, ao SharePoint e ao Azure Boards pela camada de resiliência."""
+        politicas = self.constants.get('OUTBOUND_POLICIES', {})
+        idempotentes = self.constants.get('OUTBOUND_IDEMPOTENT_METHODS', {})
+        self.clientes_externos = {
+            nome: ClienteResiliente(nome, PoliticaResiliencia(**politicas.get(nome, {})))
+            for nome in ('openai', 'sharepoint', 'azure_boards')
+        }
+        if self.openai_service is not None:
+            self.openai_service = ServicoResiliente(self.openai_service, self.clientes_externos['openai'], idempotentes.get('openai', []))
+        if self.sharepoint_service is not None:
+            self.sharepoint_service = ServicoResiliente(self.sharepoint_service, self.clientes_externos['sharepoint'], idempotentes.get('sharepoint', []))
+        self.azure_boards_service = fabrica_resiliente(self.azure_boards_service, self.clientes_externos['azure_boards'], idempotentes.get('azure_boards', []))
+
+    def _mensagem_fallback(self, servico: str) -> str:
+        """Devolve a mensagem de fallback de um serviço externo indisponível."""
+        chave = self.constants.get('SERVICE_FALLBACK_MESSAGES', {}).get(servico, 'ERROR_TECHNICAL_MESSAGE')
+        return self.constants.get(chave) or prompts.ERROR_TECHNICAL_MESSAGE
+
     def _load_constants_and_patterns(self, app_constants: Dict) -> Dict:
         """Carrega constantes e pré-compila padrões de Regex para otimização."""
         loaded_constants = app_constants.copy()
+        # As mensagens de texto (fallbacks, erros...) vivem em config/prompts.py
+        for nome, valor in vars(prompts).items():
+            if nome.isupper() and isinstance(valor, str):
+                loaded_constants.setdefault(nome, valor)
         regex_patterns = loaded_constants.get('REGEX_PATTERNS', {})
         regex_patterns['file_extension_compiled'] = re.compile(regex_patterns.get('file_extension', r'\.\w+$'), re.IGNORECASE)
         regex_patterns['file_naming_compiled'] = re.compile(regex_patterns.get('file_naming', ''))
@@ -72,55 +188,122 @@ class SofiaBrain:
         
         return loaded_constants
 
+    async def aquecer(self, forcar_atualizacao: bool = False) -> EstadoAquecimento:
+        """
+        Pré-carrega no cache todos os boards configurados, em paralelo.
+
+        Enquanto o primeiro aquecimento não termina, estado_aquecimento.pronto
+        fica a False, permitindo ao modo servidor recusar tráfego no readiness.
+        No modo multi-processo, o estado é publicado no cache partilhado para
+        os workers que não aquecem (ver acompanhar_aquecimento).
+        """
+        estado = await boards_handler.aquecer_boards(
+            self.cache_manager, self.constants, self.azure_boards_service,
+            self.boards_processing, self.estado_aquecimento, forcar_atualizacao,
+            self.historico_boards
+        )
+        if self.cache_partilhado is not None:
+            self.cache_partilhado.set(CHAVE_ESTADO_PARTILHADO, estado.resumo(), self.constants.get('CACHE_DURATION', 600))
+        return estado
+
+    async def acompanhar_aquecimento(self, intervalo_segundos: float = 1.0):
+        """
+        Nos workers que não aquecem, fica pronto quando o aquecimento publicado no cache partilhado ficar pronto.
+
+        Até lá, o readiness deste worker recusa tráfego, tal como o do worker que aquece.
+        """
+        self.estado_aquecimento.em_execucao = True
+        while not self.estado_aquecimento.pronto:
+            partilhado = self.cache_partilhado.get(CHAVE_ESTADO_PARTILHADO) if self.cache_partilhado is not None else None
+            if partilhado is not None:
+                self.estado_aquecimento.copiar_resumo(partilhado[0])
+            if not self.estado_aquecimento.pronto:
+                await asyncio.sleep(intervalo_segundos)
+
+    async def manter_aquecido(self, intervalo_segundos: int):
+        """Repete o aquecimento periodicamente, para que os boards nunca expirem do cache."""
+        while True:
+            await asyncio.sleep(intervalo_segundos)
+            await self.aquecer(forcar_atualizacao=True)
+
+    def _escolher_faixa(self, intent: str, user_id: str, user_message: str, analise: MessageAnalysis) -> str:
+        """
+        Escolhe a faixa de prioridade da mensagem.
+
+        Buscas de arquivos e perguntas sobre boards que vão ser respondidas a
+        partir do cache entram na faixa rápida; as restantes entram na faixa
+        da sua intenção (SCHEDULER_INTENT_LANES).
+        """
+        if intent == "file" and self.cache_manager.contem(file_handler.chave_cache_busca(analise.termo_busca)):
+            return FAIXA_RAPIDA
+        if intent == "boards" and boards_handler.resposta_sem_busca(user_id, analise, self.user_states, self.cache_manager, self.constants):
+            return FAIXA_RAPIDA
+        return self.constants.get('SCHEDULER_INTENT_LANES', {}).get(intent, "geral")
+
+    async def _despachar(self, intent: str, user_id: str, user_message: str, nome_usuario: str, analise: MessageAnalysis) -> str:
+        """Delega a mensagem para o handler da intenção detectada."""
+        if intent == "greeting":
+            return general_handler.handle_greetings(user_message, self.constants, analise)
+        
+        elif intent == "admin":
+            return await general_handler.handle_admin_commands(user_id, user_message, self.sharepoint_service, self.memoria)
+
+        elif intent == "learning":
+            return await general_handler.handle_learning(user_id, user_message, self.user_states, self.constants, SessionLocal, self.indice_respostas)
+
+        elif intent == "file_list":
+            quantidade = helpers.extrair_quantidade_listagem(analise.lower, self.constants.get('REGEX_PATTERNS',{}), self.constants.get('DEFAULT_FILE_LIMIT'), self.constants.get('MAX_FILE_LIMIT'), analise.numeros)
+            return await file_handler.listar_arquivos_recentes(self.sharepoint_service, self.constants, helpers, quantidade)
+
+        elif intent == "file":
+            return await file_handler.buscar_arquivo_por_termo(analise.termo_busca, self.cache_manager, self.sharepoint_service, self.openai_service, self.constants, helpers)
+
+        elif intent == "boards":
+            if 'modo_analise_boards' not in self.user_states: self.user_states['modo_analise_boards'] = {}
+            self.user_states['modo_analise_boards'][user_id] = True
+            return await boards_handler.handle_boards_analysis(user_id, user_message, self.user_states, self.cache_manager, self.constants, self.azure_boards_service, self.boards_processing, self.historico_boards, analise)
+        
+        else:
+            return await general_handler.handle_general_question(user_id, user_message, nome_usuario, None, self.openai_service, self.conversation_history, self.constants, self.indice_respostas, self.executor_bd, self.cache_respostas)
+
     async def responder(self, user_id: str, user_message: str, nome_usuario: str = "Usuário") -> str:
         """
         Processa uma mensagem do usuário e retorna a resposta apropriada.
 
         Este é o método principal que orquestra o fluxo de resposta.
         """
+        return (await self.processar(user_id, user_message, nome_usuario)).texto
+
+    async def processar(self, user_id: str, user_message: str, nome_usuario: str = "Usuário") -> RespostaSofia:
+        """
+        Processa uma mensagem e devolve a resposta junto com a intenção detectada e a duração.
+
+        Usado pelo modo batch, que grava a intenção e os tempos de cada resposta.
+        """
+        inicio = time.perf_counter()
         print(f"\n▶️  Processando mensagem de '{user_id}': '{user_message}'")
         self.cache_manager.cleanup()
+        # Relê numa thread as versões das tabelas (escritas de outros processos); o resto da mensagem usa a cópia em memória
+        await fragment_cache.atualizar_versoes_async()
+        await self._sincronizar_indice_respostas()
         
-        intent = detect_intent(user_message, user_id, self.user_states, self.constants)
+        # A mensagem é analisada uma única vez e a análise é partilhada pelo router, handlers e helpers
+        analise = MessageAnalysis(user_message, self.constants)
+        intent = detect_intent(user_message, user_id, self.user_states, self.constants, analise)
         print(f"🧠 Intenção detectada: {intent.upper()}")
 
-        resposta = ""
+        faixa = self._escolher_faixa(intent, user_id, user_message, analise)
+        print(f"🚦 Faixa: {faixa}")
         try:
-            if intent == "greeting":
-                resposta = general_handler.handle_greetings(user_message, self.constants)
-            
-            elif intent == "admin":
-                resposta = await general_handler.handle_admin_commands(user_id, user_message, self.sharepoint_service)
-
-            elif intent == "learning":
-                resposta = general_handler.handle_learning(user_id, user_message, self.user_states, self.constants)
-
-            elif intent == "file_list":
-                quantidade = helpers.extrair_quantidade_listagem(user_message, self.constants.get('REGEX_PATTERNS',{}), self.constants.get('DEFAULT_FILE_LIMIT'), self.constants.get('MAX_FILE_LIMIT'))
-                resposta = await file_handler.listar_arquivos_recentes(self.sharepoint_service, self.constants, helpers, quantidade)
-
-            elif intent == "file":
-                termo = helpers.extract_search_term(user_message, self.constants.get('REGEX_PATTERNS',{}), self.constants.get('FILE_KEYWORDS'), self.constants.get('MIN_WORD_LENGTH'), self.constants.get('MAX_RELEVANT_WORDS'))
-                resposta = await file_handler.buscar_arquivo_por_termo(termo, self.cache_manager, self.sharepoint_service, self.openai_service, self.constants, helpers)
-
-            elif intent == "boards":
-                if 'modo_analise_boards' not in self.user_states: self.user_states['modo_analise_boards'] = {}
-                self.user_states['modo_analise_boards'][user_id] = True
-                resposta = await boards_handler.handle_boards_analysis(user_id, user_message, self.user_states, self.cache_manager, self.constants, self.boards_processing)
-            
-            else:
-                db_session = SessionLocal()
-                db_session = None
-                try:
-                    resposta = await general_handler.handle_general_question(user_id, user_message, nome_usuario, db_session, self.openai_service, self.conversation_history, self.constants)
-                finally:
-                    if db_session: db_session.close()
-                    pass
-
+            async with self.escalonador.vez(faixa, user_id):
+                resposta = await self._despachar(intent, user_id, user_message, nome_usuario, analise)
+        except CircuitoAberto as e:
+            print(f"⚡ {e}")
+            resposta = self._mensagem_fallback(e.servico)
         except Exception as e:
             resposta = helpers.format_error_response(e, intent, user_id)
             
         self.conversation_history.add_interaction(user_id, user_message, resposta)
         print(f"◀️  Resposta para '{user_id}': '{resposta[:100]}...'")
         
-        return resposta
\ No newline at end of file
+        return RespostaSofia(resposta, intent, (time.perf_counter() - inicio) * 1000)
\ No newline at end of file
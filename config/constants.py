@@ -1,22 +1,42 @@
 import re
 
 # Palavras-chave e Comandos
-ADMIN_COMMANDS = {"diagnosticar sharepoint": "", "testar busca": ""}
+ADMIN_COMMANDS = {"diagnosticar sharepoint": "", "testar busca": "", "relatorio de memoria": "", "relatório de memória": ""}
 BOARDS_COMMANDS = ["analisar board", "modo boards", "azure boards"]
 LEARNING_TRIGGERS = ["quero te ensinar", "aprenda", "anote"]
 LIST_PATTERNS = ["liste os arquivos", "arquivos recentes"]
 EXIT_COMMANDS = ["sair", "exit", "sair do modo boards"]
 HELP_COMMANDS = ["ajuda", "help", "comandos"]
 CLIENT_KEYWORDS = ["cliente", "clientes"]
+CLIENT_SEARCH_KEYWORDS = ["cliente", "clientes", "épico", "epico", "épicos", "epicos"]
 ACTIVITY_KEYWORDS = ["atividades", "atividade", "tarefas"]
 COLLABORATOR_REFERENCES = ["dele", "dela", "suas tarefas"]
 PROGRESS_KEYWORDS = ["em andamento", "fazendo", "progresso"]
 TODO_KEYWORDS = ["a fazer", "to do", "pendente"]
+COMPLETED_KEYWORDS = ["concluído", "concluída", "concluídos", "concluídas", "finalizado", "finalizada", "finalizados", "finalizadas", "done"]
+COUNT_KEYWORDS = ["quantos", "quantas", "total de", "número de", "numero de"]
+GROUP_BY_KEYWORDS = {"por responsável": "responsavel", "por responsavel": "responsavel", "por pessoa": "responsavel", "por cliente": "cliente", "por estado": "estado", "por status": "estado", "por tipo": "tipo"}
 TASK_COUNT_KEYWORDS = ["mais tarefas", "quem tem mais"]
+TREND_KEYWORDS = ["mudou", "mudança", "evolução", "evolucao", "tendência", "tendencia"]
+VELOCITY_KEYWORDS = ["velocidade", "vazão", "ritmo"]
+BURNDOWN_KEYWORDS = ["burndown", "burn down"]
+HISTORY_DEPENDENT_KEYWORDS = [  # Perguntas com estas expressões não são respondidas a partir do cache
+    "isso", "isto", "disso", "nisso", "ele", "ela", "eles", "elas", "dele", "dela", "anterior", "acima",
+    "antes", "disse", "falou", "falamos", "mesmo", "outro", "outra",
+    "hoje", "ontem", "amanha", "agora", "dia", "data", "hora", "semana",
+]
 
 # Mapeamentos
 BOARD_PROJECTS = {"sonar": "Sonar", "sonar labs": "Sonar Labs"}
 MAPA_TIPOS_ITENS = {"bug": "bug", "bugs": "bug", "tarefa": "task", "tarefas": "task"}
+BOARD_STATE_GROUPS = {
+    "em andamento": ["em andamento", "active", "doing", "in progress", "committed"],
+    "a fazer": ["a fazer", "new", "to do", "proposed", "approved"],
+    "concluido": ["concluído", "concluido", "done", "closed", "resolved"],
+}
+BOARD_CLIENT_COLUMN = "cliente"
+BOARD_DATE_COLUMNS = ["data_criacao", "data_alteracao"]
+BOARD_EPIC_COLUMNS = ["epico", "cliente"]  # Colunas que só existem quando os work items são processados com os épicos
 
 # Parâmetros de Configuração
 CACHE_DURATION = 600  
@@ -25,6 +45,86 @@ DEFAULT_FILE_LIMIT = 10
 MAX_FILE_LIMIT = 50
 MIN_WORD_LENGTH = 2
 MAX_RELEVANT_WORDS = 5
+ANSWER_MATCH_THRESHOLD = 0.8  # Semelhança mínima para reutilizar uma resposta aprendida
+ANSWER_CACHE_SIMILARITY = 0.8  # Semelhança mínima para reutilizar uma resposta da OpenAI
+ANSWER_CACHE_TTL = 3600  # Segundos durante os quais uma resposta da OpenAI é reutilizada
+ANSWER_CACHE_MAX_ENTRIES = 1000
+RETRIEVAL_TOP_K = 8  # Linhas de conhecimento mais relevantes incluídas no prompt
+RETRIEVAL_TOKEN_BUDGET = 600  # Orçamento (estimado) de tokens para esse conhecimento
+PROMPT_TOKEN_BUDGET = 3000  # Orçamento (estimado) de tokens do prompt de sistema completo
+PROMPT_SECTION_BUDGETS = {  # Máximo de tokens de cada secção do prompt
+    "persona": 300,
+    "empresa": 300,
+    "instrucoes": 150,
+    "conhecimento": 1200,
+    "projetos": 800,
+    "historico": 1000,
+}
+PROMPT_SECTION_PRIORITIES = {  # Ordem pela qual as secções recebem orçamento (0 = primeiro)
+    "persona": 0,
+    "empresa": 0,
+    "instrucoes": 0,
+    "conhecimento": 1,
+    "projetos": 2,
+    "historico": 3,
+}
+PROMPT_MANDATORY_SECTIONS = ["persona", "instrucoes"]  # Secções do prompt que nunca são cortadas
+READ_SESSION_POOL_SIZE = 8  # Sessões só de leitura reutilizadas entre pedidos
+DB_EXECUTOR_THREADS = 4  # Threads dedicadas às consultas à base de dados
+KNOWLEDGE_VERSION_CHECK_INTERVAL = 1.0  # Segundos entre leituras das versões das tabelas (escritas de outros processos)
+
+# Resiliência das chamadas aos serviços externos
+OUTBOUND_POLICIES = {  # Concorrência, tentativas (só idempotentes), espera (s) e disjuntor de cada serviço
+    "openai": {"max_concorrencia": 16, "tentativas": 2, "espera_base": 0.3, "espera_max": 2.0, "limiar_falhas": 5, "tempo_aberto": 30.0},
+    "sharepoint": {"max_concorrencia": 8, "tentativas": 3, "espera_base": 0.2, "espera_max": 2.0, "limiar_falhas": 5, "tempo_aberto": 30.0},
+    "azure_boards": {"max_concorrencia": 2, "tentativas": 3, "espera_base": 0.5, "espera_max": 5.0, "limiar_falhas": 3, "tempo_aberto": 60.0},
+}
+OUTBOUND_IDEMPOTENT_METHODS = {  # Métodos sem efeitos secundários, que podem ser repetidos
+    "openai": ["classificar_tom_mensagem", "interpretar_termo_busca"],
+    "sharepoint": ["search_files", "list_recent_files"],
+    "azure_boards": ["buscar_work_items"],
+}
+SERVICE_FALLBACK_MESSAGES = {  # Mensagem devolvida quando o disjuntor de um serviço está aberto
+    "openai": "OPENAI_FALLBACK_MESSAGE",
+    "sharepoint": "ERROR_TECHNICAL_MESSAGE",
+    "azure_boards": "ERROR_TECHNICAL_MESSAGE",
+}
+BOARD_CATEGORY_MAX_RATIO = 0.5
+BOARDS_SNAPSHOT_DIR = None  # Ex: "snapshots/boards" para gravar os boards em Parquet
+BOARDS_WARMUP_ENABLED = True  # Aquecimento dos boards no arranque do modo servidor
+BOARDS_WARMUP_CONCURRENCY = 2
+BOARDS_WARMUP_INTERVAL = 540  # Reaquece antes de os boards expirarem do cache (0 desativa)
+BOARDS_HISTORY_DB = "boards_history.db"
+BOARDS_HISTORY_RETENTION_DAYS = 90  # Dias de histórico dos boards guardados (0 = sem limite)
+
+# Modo multi-processo do servidor
+SERVER_WORKERS = 1  # Processos worker atrás da frente (1 = processo único)
+SERVER_WORKER_BASE_PORT = 8100  # O worker i ouve em 127.0.0.1:(porta base + i)
+SHARED_CACHE_DB = None  # Ficheiro SQLite do cache partilhado entre workers (no modo multi-processo, "shared_cache.db" se None)
+
+# Contabilidade de memória
+MEMORY_TRACEMALLOC_ENABLED = False  # Regista as alocações do Python (custo de CPU e memória; só para diagnóstico)
+MEMORY_TRACEMALLOC_FRAMES = 1  # Frames da pilha guardados por alocação
+MEMORY_TOP_ALLOCATIONS = 10  # Linhas de código mostradas no top de alocações e no crescimento
+MEMORY_REPORT_PATH = "memory_usage.jsonl"
+MEMORY_REPORT_INTERVAL = 0  # Segundos entre relatórios gravados no JSONL do modo servidor (0 desativa)
+
+# Faixas de prioridade: mensagens em simultâneo por faixa (0 = sem limite)
+SCHEDULER_LANES = {
+    "rapida": 0,  # Saudações, administração, aprendizado e respostas já em cache
+    "arquivos": 4,
+    "boards": 2,
+    "geral": 8,
+}
+SCHEDULER_INTENT_LANES = {  # Faixa de cada intenção quando a resposta não está em cache
+    "greeting": "rapida",
+    "admin": "rapida",
+    "learning": "rapida",
+    "file": "arquivos",
+    "file_list": "arquivos",
+    "boards": "boards",
+    "general": "geral",
+}
 
 # Padrões de Regex (aqui como strings)
 REGEX_PATTERNS = {
@@ -4,8 +4,7 @@ Isso facilita a manutenção, tradução e consistência da comunicação.
 """
 
 from datetime import datetime
-from functools import lru_cache
-from typing import Any
+from typing import Any, Callable
 from sqlalchemy.orm import Session
 
 from database.fragments import (
@@ -19,6 +18,14 @@ from database.fragments import (
     gerar_fragmento_projetos,
     gerar_fragmento_participacoes
 )
+from database.fragment_cache import cache_fragmentos
+from database.knowledge import carregar_conhecimento, carregar_conhecimento_async
+from database.retrieval import IndiceBM25, documentos_do_conhecimento, selecionar_contexto
+from config.constants import (
+    RETRIEVAL_TOP_K, RETRIEVAL_TOKEN_BUDGET,
+    PROMPT_TOKEN_BUDGET, PROMPT_SECTION_BUDGETS, PROMPT_SECTION_PRIORITIES, PROMPT_MANDATORY_SECTIONS
+)
+from core.prompt_assembler import MontadorPrompt
 
 
 # Mensagens Gerais e de Interação 
@@ -77,45 +84,198 @@ ERROR_TECHNICAL_MESSAGE = "Ocorreu um erro técnico inesperado. A equipe de dese
 
 # Geração do Prompt de Sistema para a OpenAI
 
-@lru_cache(maxsize=32)
-def gerar_system_prompt(db: Any = None, historico_conversa: str = "", tom: str = "neutro") -> str:
+GERADORES_FRAGMENTOS = {
+    'persona': gerar_fragmento_persona,
+    'empresa': gerar_fragmento_empresa,
+    'setores': gerar_fragmento_setores,
+    'funcionarios': gerar_fragmento_funcionarios,
+    'gerentes': gerar_fragmento_gerentes,
+    'projetos': gerar_fragmento_projetos,
+    'participacoes': gerar_fragmento_participacoes,
+    'conhecimentos': gerar_fragmento_conhecimentos,
+    'cerimonias': gerar_fragmento_cerimonias,
+}
+
+
+# Secção do prompt (para os orçamentos de tokens) de cada fragmento
+SECAO_POR_FRAGMENTO = {
+    'persona': 'persona',
+    'empresa': 'empresa',
+    'setores': 'conhecimento',
+    'funcionarios': 'conhecimento',
+    'gerentes': 'conhecimento',
+    'projetos': 'projetos',
+    'participacoes': 'projetos',
+    'conhecimentos': 'conhecimento',
+    'cerimonias': 'conhecimento',
+}
+SECAO_POR_DOCUMENTO = {
+    "Principais Projetos Atuais": 'projetos',
+    "Participação em Projetos": 'projetos',
+}
+
+montador_prompt = MontadorPrompt(
+    PROMPT_TOKEN_BUDGET, PROMPT_SECTION_BUDGETS, PROMPT_SECTION_PRIORITIES,
+    secoes_obrigatorias=PROMPT_MANDATORY_SECTIONS
+)
+
+
+PERSONA_PADRAO = "Você é Sofia, uma assistente de IA da Sonar. Você é prestativa, eficiente e se comunica de forma clara e amigável."
+
+
+def obter_conhecimento(db: Session):
+    """Devolve o ConhecimentoSnapshot, recarregando-o só quando alguma tabela mudou."""
+    return cache_fragmentos.obter('conhecimento', lambda: carregar_conhecimento(db))
+
+
+async def obter_conhecimento_async(executor_bd: Any):
+    """Versão assíncrona do obter_conhecimento; as consultas correm nas threads do ExecutorBD."""
+    return await cache_fragmentos.obter_async('conhecimento', lambda: carregar_conhecimento_async(executor_bd))
+
+
+def _montar_fragmentos_estaticos(obter: Callable[[], Any]) -> list:
+    """Devolve todos os fragmentos do cache, gerando os que mudaram a partir do snapshot devolvido por obter()."""
+    return [
+        (SECAO_POR_FRAGMENTO[nome], cache_fragmentos.obter(nome, lambda gerar=gerar: gerar(obter())))
+        for nome, gerar in GERADORES_FRAGMENTOS.items()
+    ]
+
+
+def _montar_fragmentos_relevantes(conhecimento: Any, pergunta: str, top_k: int, orcamento_tokens: int) -> list:
+    """Devolve a persona, a empresa e o conhecimento escolhido pelo índice BM25 para a pergunta."""
+    indice = cache_fragmentos.obter('indice_conhecimento', lambda: IndiceBM25(documentos_do_conhecimento(conhecimento)))
+    fragmentos = [
+        ('persona', cache_fragmentos.obter('persona', lambda: gerar_fragmento_persona(conhecimento))),
+        ('empresa', cache_fragmentos.obter('empresa', lambda: gerar_fragmento_empresa(conhecimento))),
+    ]
+    return fragmentos + [
+        (SECAO_POR_DOCUMENTO.get(secao, 'conhecimento'), texto)
+        for secao, texto in selecionar_contexto(indice, pergunta, top_k, orcamento_tokens)
+    ]
+
+
+def gerar_fragmentos_estaticos(db: Any = None) -> list:
+    """
+    Devolve os fragmentos que dependem apenas da base de dados.
+
+    Cada fragmento é servido pelo cache versionado e só é regenerado quando
+    as tabelas de onde vem são alteradas. Nesse caso, todos leem o mesmo
+    snapshot de conhecimento, carregado de uma só vez.
     """
-    Monta o prompt de sistema dinamicamente. No futuro, usará o banco de dados
-    para definir a persona, contexto e o tom da resposta da IA.
+    if not db:
+        return [('persona', PERSONA_PADRAO)]
+
+    try:
+        return _montar_fragmentos_estaticos(lambda: obter_conhecimento(db))
+    except Exception as e:
+        print(f"Erro ao carregar o conhecimento da base de dados: {e}")
+        return [('persona', PERSONA_PADRAO)]
+
+
+async def gerar_fragmentos_estaticos_async(executor_bd: Any = None) -> list:
+    """Versão assíncrona do gerar_fragmentos_estaticos."""
+    if not executor_bd:
+        return [('persona', PERSONA_PADRAO)]
+
+    try:
+        conhecimento = await obter_conhecimento_async(executor_bd)
+        return _montar_fragmentos_estaticos(lambda: conhecimento)
+    except Exception as e:
+        print(f"Erro ao carregar o conhecimento da base de dados: {e}")
+        return [('persona', PERSONA_PADRAO)]
+
+
+def gerar_fragmentos_relevantes(db: Any, pergunta: str, top_k: int = RETRIEVAL_TOP_K, orcamento_tokens: int = RETRIEVAL_TOKEN_BUDGET) -> list:
     """
-    fragmentos = []
-
-    if db:
-        fragmentos = [
-            gerar_fragmento_persona(db),
-            gerar_fragmento_empresa(db),
-            gerar_fragmento_setores(db),
-            gerar_fragmento_funcionarios(db),
-            gerar_fragmento_gerentes(db),
-            gerar_fragmento_projetos(db),
-            gerar_fragmento_participacoes(db),
-            gerar_fragmento_conhecimentos(db),
-            gerar_fragmento_cerimonias(db),
-        ]
-    else:
-        
-        fragmentos.append("Você é Sofia, uma assistente de IA da Sonar. Você é prestativa, eficiente e se comunica de forma clara e amigável.")
+    Devolve a persona, a empresa e apenas o conhecimento relevante para a pergunta.
 
+    O índice BM25 é construído a partir do snapshot de conhecimento e fica no
+    cache de fragmentos até alguma tabela ser alterada.
+    """
+    if not db:
+        return [('persona', PERSONA_PADRAO)]
+
+    try:
+        return _montar_fragmentos_relevantes(obter_conhecimento(db), pergunta, top_k, orcamento_tokens)
+    except Exception as e:
+        print(f"Erro ao selecionar o conhecimento relevante: {e}")
+        return [('persona', PERSONA_PADRAO)]
+
+
+async def gerar_fragmentos_relevantes_async(executor_bd: Any, pergunta: str, top_k: int = RETRIEVAL_TOP_K, orcamento_tokens: int = RETRIEVAL_TOKEN_BUDGET) -> list:
+    """Versão assíncrona do gerar_fragmentos_relevantes."""
+    if not executor_bd:
+        return [('persona', PERSONA_PADRAO)]
+
+    try:
+        conhecimento = await obter_conhecimento_async(executor_bd)
+        return _montar_fragmentos_relevantes(conhecimento, pergunta, top_k, orcamento_tokens)
+    except Exception as e:
+        print(f"Erro ao selecionar o conhecimento relevante: {e}")
+        return [('persona', PERSONA_PADRAO)]
+
+
+def gerar_fragmentos(db: Any = None, pergunta: str = "") -> list:
+    """Devolve os fragmentos do conhecimento: os relevantes para a pergunta ou, sem pergunta, todos."""
+    return gerar_fragmentos_relevantes(db, pergunta) if pergunta else gerar_fragmentos_estaticos(db)
+
+
+async def gerar_fragmentos_async(executor_bd: Any = None, pergunta: str = "") -> list:
+    """Versão assíncrona do gerar_fragmentos."""
+    if pergunta:
+        return await gerar_fragmentos_relevantes_async(executor_bd, pergunta)
+    return await gerar_fragmentos_estaticos_async(executor_bd)
+
+
+def completar_system_prompt(fragmentos: list, historico_conversa: str, tom: str) -> str:
+    """
+    Acrescenta a data, o tom e o histórico aos fragmentos e monta o prompt final
+    dentro do orçamento de tokens.
+
+    Só esta parte depende do tom, o que permite preparar os fragmentos em
+    paralelo com a classificação do tom.
+    """
+    fragmentos = list(fragmentos)
     data_hoje = datetime.now().strftime("%d de %B de %Y")
-    fragmentos.append(
+    fragmentos.append((
+        'instrucoes',
         f"A data de hoje é {data_hoje}. Use essa informação para responder perguntas como 'qual é o dia de hoje?'."
-    )
+    ))
 
     if tom == "animado":
-        fragmentos.append(
+        fragmentos.append((
+            'instrucoes',
             "Adote um tom leve, simpático, entusiasmado e espontâneo. Use emoticons para deixar a interação mais agradável. 😊"
-        )
+        ))
     elif tom == "sério":
-        fragmentos.append(
+        fragmentos.append((
+            'instrucoes',
             "Adote um tom mais formal, direto e profissional, mantendo cordialidade e clareza."
-        )
+        ))
 
     if historico_conversa:
-        fragmentos.append("\n--- Histórico da Conversa Recente ---\n" + historico_conversa)
+        fragmentos.append(('historico', "\n--- Histórico da Conversa Recente ---\n" + historico_conversa))
+
+    return montador_prompt.montar(fragmentos)
+
+
+def gerar_system_prompt(db: Any = None, historico_conversa: str = "", tom: str = "neutro", pergunta: str = "") -> str:
+    """
+    Monta o prompt de sistema dinamicamente.
 
-    return "\n\n".join(p for p in fragmentos if p and p.strip())
\ No newline at end of file
+    Quando a pergunta é indicada, só o conhecimento relevante para ela entra no
+    prompt; caso contrário, é usado o bloco estático completo. Ambos vêm do
+    cache de fragmentos; a data, o tom e o histórico são acrescentados a cada pedido.
+    O montador_prompt corta as secções menos prioritárias que excedam o orçamento.
+    """
+    return completar_system_prompt(gerar_fragmentos(db, pergunta), historico_conversa, tom)
+
+
+async def gerar_system_prompt_async(executor_bd: Any = None, historico_conversa: str = "", tom: str = "neutro", pergunta: str = "") -> str:
+    """
+    Versão assíncrona do gerar_system_prompt.
+
+    Quando o conhecimento tem de ser recarregado, as consultas correm em
+    paralelo nas threads do ExecutorBD, sem bloquear o event loop.
+    """
+    return completar_system_prompt(await gerar_fragmentos_async(executor_bd, pergunta), historico_conversa, tom)
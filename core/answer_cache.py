@@ -0,0 +1,206 @@
+"""
+Este módulo guarda as respostas da OpenAI às perguntas gerais, para que
+perguntas iguais ou quase iguais (de qualquer usuário) não voltem a gerar
+um prompt e uma chamada à OpenAI.
+
+A chave de cada resposta é a pergunta normalizada, a versão dos dados de
+conhecimento e o tom. A procura é feita primeiro por correspondência exata e,
+depois, por semelhança: cada pergunta tem uma assinatura MinHash das suas
+palavras relevantes, dividida em bandas (LSH) para encontrar candidatas, que
+só são aceites se todas as palavras relevantes (incluindo as negações)
+corresponderem de um lado e do outro, admitindo erros de digitação: "o
+projeto não está ativo" não reutiliza a resposta de "o projeto está ativo".
+
+Perguntas que dependem do histórico ou da data ("e ele?", "hoje") nunca são
+guardadas. As entradas expiram ao fim de um TTL e as menos usadas são
+removidas quando o cache chega ao tamanho máximo.
+"""
+
+import random
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, NamedTuple, Optional, Set, Tuple
+
+from core.answer_index import normalizar_pergunta, palavras_relevantes, semelhanca_palavras
+
+NUM_PERMUTACOES = 64
+LINHAS_POR_BANDA = 4
+_PRIMO = (1 << 61) - 1
+_rng = random.Random(20240601)
+_COEFICIENTES = [(_rng.randrange(1, _PRIMO), _rng.randrange(0, _PRIMO)) for _ in range(NUM_PERMUTACOES)]
+
+
+def assinatura_minhash(palavras: frozenset) -> Tuple[int, ...]:
+    """Calcula a assinatura MinHash de um conjunto de palavras."""
+    hashes = [zlib.crc32(p.encode('utf-8')) for p in palavras]
+    return tuple(min((a * h + b) % _PRIMO for h in hashes) for a, b in _COEFICIENTES)
+
+
+def _bandas(assinatura: Tuple[int, ...]) -> List[Tuple[int, Tuple[int, ...]]]:
+    return [
+        (i, assinatura[i:i + LINHAS_POR_BANDA])
+        for i in range(0, len(assinatura), LINHAS_POR_BANDA)
+    ]
+
+
+class _Entrada(NamedTuple):
+    resposta: str
+    palavras: frozenset
+    assinatura: Tuple[int, ...]
+    criada_em: float
+
+
+class CacheRespostas:
+    """
+    Cache em memória das respostas a perguntas gerais, com procura exata e por semelhança.
+    """
+    def __init__(
+        self,
+        limiar_semelhanca: float = 0.8,
+        ttl_segundos: int = 3600,
+        max_entradas: int = 1000,
+        palavras_excluidas: Optional[List[str]] = None
+    ):
+        """
+        Inicializa o cache vazio.
+
+        Args:
+            limiar_semelhanca (float): A semelhança mínima (ver semelhanca_palavras) para reutilizar uma resposta.
+            ttl_segundos (int): O tempo de vida de cada resposta.
+            max_entradas (int): O número máximo de respostas guardadas.
+            palavras_excluidas (List[str]): Expressões que tornam uma pergunta dependente
+                                            do histórico ou da data (nunca guardada).
+        """
+        self._limiar = limiar_semelhanca
+        self._ttl = ttl_segundos
+        self._max_entradas = max_entradas
+        self._excluidas = [normalizar_pergunta(p) for p in (palavras_excluidas or [])]
+        self._entradas: "OrderedDict[Tuple[Hashable, str, str], _Entrada]" = OrderedDict()
+        self._baldes: Dict[Tuple[Hashable, str, int, Tuple[int, ...]], Set[str]] = {}
+        self._versao: Hashable = None
+        self._lock = threading.Lock()
+        self.hits_exatos = 0
+        self.hits_semelhantes = 0
+        self.misses = 0
+        self.excluidas = 0
+
+    def pode_guardar(self, pergunta: str) -> bool:
+        """Indica se a pergunta é independente do histórico e da data (e pode ser guardada)."""
+        normalizada = f" {normalizar_pergunta(pergunta)} "
+        # Perguntas de seguimento ("e o Rui?") só fazem sentido com a conversa anterior
+        if not normalizada.strip() or normalizada.startswith(" e "):
+            return False
+        return not any(f" {e} " in normalizada for e in self._excluidas)
+
+    def _remover(self, chave: Tuple[Hashable, str, str]):
+        entrada = self._entradas.pop(chave)
+        versao, tom, normalizada = chave
+        for banda in _bandas(entrada.assinatura):
+            balde = self._baldes.get((versao, tom) + banda)
+            if balde:
+                balde.discard(normalizada)
+                if not balde:
+                    del self._baldes[(versao, tom) + banda]
+
+    def _trocar_versao(self, versao: Hashable):
+        """Esquece todas as respostas quando os dados de conhecimento mudam (só chamada pelo procurar)."""
+        if versao != self._versao:
+            self._entradas.clear()
+            self._baldes.clear()
+            self._versao = versao
+
+    def procurar(self, pergunta: str, tom: str, versao: Hashable) -> Optional[Tuple[str, float]]:
+        """
+        Procura a resposta a uma pergunta igual ou parecida, com o mesmo tom e versão dos dados.
+
+        Args:
+            pergunta (str): A mensagem do usuário.
+            tom (str): O tom classificado para a mensagem.
+            versao (Hashable): A versão atual dos dados de conhecimento.
+
+        Returns:
+            Optional[Tuple[str, float]]: A resposta e a semelhança (1.0 quando exata), ou None.
+        """
+        if not self.pode_guardar(pergunta):
+            with self._lock:
+                self.excluidas += 1
+            return None
+
+        normalizada = normalizar_pergunta(pergunta)
+        agora = time.monotonic()
+        with self._lock:
+            self._trocar_versao(versao)
+
+            chave = (versao, tom, normalizada)
+            entrada = self._entradas.get(chave)
+            if entrada and agora - entrada.criada_em <= self._ttl:
+                self._entradas.move_to_end(chave)
+                self.hits_exatos += 1
+                return entrada.resposta, 1.0
+
+            palavras = palavras_relevantes(normalizada)
+            candidatas: Set[str] = set()
+            for banda in _bandas(assinatura_minhash(palavras)):
+                candidatas |= self._baldes.get((versao, tom) + banda, set())
+
+            melhor, melhor_semelhanca = None, 0.0
+            for candidata in candidatas:
+                entrada = self._entradas.get((versao, tom, candidata))
+                if not entrada or agora - entrada.criada_em > self._ttl:
+                    continue
+                semelhanca = semelhanca_palavras(palavras, entrada.palavras)
+                if semelhanca > melhor_semelhanca:
+                    melhor, melhor_semelhanca = candidata, semelhanca
+
+            if melhor is not None and melhor_semelhanca >= self._limiar:
+                self._entradas.move_to_end((versao, tom, melhor))
+                self.hits_semelhantes += 1
+                return self._entradas[(versao, tom, melhor)].resposta, melhor_semelhanca
+
+            self.misses += 1
+        return None
+
+    def guardar(self, pergunta: str, tom: str, versao: Hashable, resposta: str):
+        """
+        Guarda a resposta a uma pergunta (se ela puder ser guardada).
+
+        A versão é a dos dados lidos antes de gerar a resposta. Se entretanto os
+        dados mudaram (o procurar de outro pedido já viu uma versão diferente), a
+        resposta está desatualizada e não é guardada: só o procurar muda a versão
+        do cache, para que um pedido lento não apague as respostas atuais.
+        """
+        if not resposta or not self.pode_guardar(pergunta):
+            return
+
+        normalizada = normalizar_pergunta(pergunta)
+        palavras = palavras_relevantes(normalizada)
+        entrada = _Entrada(resposta, palavras, assinatura_minhash(palavras), time.monotonic())
+        with self._lock:
+            if self._versao is None:
+                self._versao = versao
+            elif versao != self._versao:
+                return
+            chave = (versao, tom, normalizada)
+            if chave in self._entradas:
+                self._remover(chave)
+            self._entradas[chave] = entrada
+            for banda in _bandas(entrada.assinatura):
+                self._baldes.setdefault((versao, tom) + banda, set()).add(normalizada)
+
+            while len(self._entradas) > self._max_entradas:
+                self._remover(next(iter(self._entradas)))
+
+    def metricas(self) -> Dict[str, Any]:
+        """Devolve o número de entradas e a taxa de acerto do cache."""
+        with self._lock:
+            consultas = self.hits_exatos + self.hits_semelhantes + self.misses
+            return {
+                'entradas': len(self._entradas),
+                'hits_exatos': self.hits_exatos,
+                'hits_semelhantes': self.hits_semelhantes,
+                'misses': self.misses,
+                'excluidas': self.excluidas,
+                'taxa_acerto': round((self.hits_exatos + self.hits_semelhantes) / consultas, 3) if consultas else 0.0,
+            }
@@ -0,0 +1,170 @@
+"""
+Este módulo mantém em memória um índice das perguntas ensinadas manualmente
+à Sofia (tabela conhecimentos_manuais), para as responder localmente sem
+passar pela OpenAI.
+
+A procura é feita primeiro por correspondência exata da pergunta normalizada
+(sem acentos, pontuação ou maiúsculas) e, depois, por semelhança entre os
+conjuntos de palavras, usando um índice invertido palavra -> perguntas para
+limitar os candidatos. Uma pergunta parecida só é aceite se todas as palavras
+relevantes de cada lado tiverem correspondência no outro (admitindo erros de
+digitação) e se a negação for a mesma: "qual a senha do email" não é "qual a
+senha do wifi". O índice é atualizado incrementalmente a cada novo aprendizado.
+"""
+
+import threading
+from difflib import SequenceMatcher
+from typing import Dict, Any, Optional, Set, Tuple
+
+from database.models import ConhecimentoManual
+from utils import helpers
+
+PALAVRAS_IGNORADAS = {
+    "a", "o", "as", "os", "um", "uma", "de", "da", "do", "das", "dos", "e", "em", "no", "na",
+    "nos", "nas", "para", "por", "com", "que", "qual", "quais", "me", "voce", "sofia",
+}
+# As negações nunca são ignoradas: "o projeto não está ativo?" não é "o projeto está ativo?"
+NEGACOES = frozenset({"nao", "nem", "nunca", "jamais", "sem", "nenhum", "nenhuma", "ninguem", "nada"})
+MAX_CANDIDATOS_FUZZY = 5
+LIMIAR_ERRO_DIGITACAO = 0.8  # Semelhança mínima entre duas palavras para as tratar como a mesma
+TAMANHO_MINIMO_ERRO_DIGITACAO = 4
+
+
+def normalizar_pergunta(pergunta: str) -> str:
+    """Normaliza uma pergunta para comparação (minúsculas, sem acentos nem pontuação)."""
+    return " ".join(helpers.tokenizar(pergunta))
+
+
+def palavras_relevantes(pergunta_normalizada: str) -> frozenset:
+    """Devolve o conjunto de palavras da pergunta, sem as palavras de ligação."""
+    palavras = set(pergunta_normalizada.split())
+    return frozenset(palavras - PALAVRAS_IGNORADAS) or frozenset(palavras)
+
+
+def _semelhanca_palavra(palavra: str, outra: str) -> float:
+    """
+    Compara duas palavras, tolerando erros de digitação.
+
+    Palavras curtas, negações e palavras com a primeira letra diferente
+    ("ativo" / "inativo") só correspondem se forem iguais.
+    """
+    if palavra == outra:
+        return 1.0
+    if (
+        min(len(palavra), len(outra)) < TAMANHO_MINIMO_ERRO_DIGITACAO
+        or palavra[0] != outra[0]
+        or palavra in NEGACOES or outra in NEGACOES
+    ):
+        return 0.0
+    semelhanca = SequenceMatcher(None, palavra, outra).ratio()
+    return semelhanca if semelhanca >= LIMIAR_ERRO_DIGITACAO else 0.0
+
+
+def semelhanca_palavras(palavras: frozenset, outras: frozenset) -> float:
+    """
+    Compara os conjuntos de palavras relevantes de duas perguntas.
+
+    Returns:
+        float: 0.0 se a negação for diferente ou se alguma palavra de um dos lados
+               não tiver correspondência no outro; caso contrário, a média da
+               semelhança de cada palavra com a sua correspondente (1.0 se forem iguais).
+    """
+    if (palavras & NEGACOES) != (outras & NEGACOES):
+        return 0.0
+    total, contadas = 0.0, 0
+    for lado, outro in ((palavras, outras), (outras, palavras)):
+        for palavra in lado:
+            melhor = 1.0 if palavra in outro else max((_semelhanca_palavra(palavra, o) for o in outro), default=0.0)
+            if not melhor:
+                return 0.0
+            total += melhor
+            contadas += 1
+    return total / contadas if contadas else 0.0
+
+
+class IndiceRespostas:
+    """
+    Índice em memória das perguntas e respostas aprendidas manualmente.
+    """
+    def __init__(self, limiar_semelhanca: float = 0.8):
+        """
+        Inicializa o índice vazio.
+
+        Args:
+            limiar_semelhanca (float): A semelhança mínima (0 a 1) para aceitar
+                                       uma pergunta parecida como resposta.
+        """
+        self._limiar = limiar_semelhanca
+        # A versão da tabela conhecimentos_manuais refletida no índice (None = desconhecida)
+        self.versao: Optional[int] = None
+        self._respostas: Dict[str, str] = {}
+        self._palavras_por_pergunta: Dict[str, frozenset] = {}
+        self._perguntas_por_palavra: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._respostas)
+
+    def carregar(self, db: Any) -> int:
+        """
+        Carrega todas as perguntas aprendidas da base de dados.
+
+        Args:
+            db (Session): A sessão da base de dados.
+
+        Returns:
+            int: O número de perguntas no índice.
+        """
+        for pergunta, resposta in db.query(ConhecimentoManual.pergunta, ConhecimentoManual.resposta):
+            self.adicionar(pergunta, resposta)
+        return len(self)
+
+    def adicionar(self, pergunta: str, resposta: str):
+        """Adiciona ou atualiza uma pergunta no índice."""
+        chave = normalizar_pergunta(pergunta)
+        if not chave:
+            return
+
+        palavras = palavras_relevantes(chave)
+        with self._lock:
+            self._respostas[chave] = resposta
+            self._palavras_por_pergunta[chave] = palavras
+            for palavra in palavras:
+                self._perguntas_por_palavra.setdefault(palavra, set()).add(chave)
+
+    def procurar(self, mensagem: str) -> Optional[Tuple[str, float]]:
+        """
+        Procura a resposta de uma pergunta já aprendida.
+
+        Args:
+            mensagem (str): A pergunta do usuário.
+
+        Returns:
+            Optional[Tuple[str, float]]: A resposta e a semelhança (1.0 quando exata),
+                                         ou None se nenhuma pergunta for parecida o suficiente.
+        """
+        chave = normalizar_pergunta(mensagem)
+        if not chave:
+            return None
+
+        with self._lock:
+            resposta = self._respostas.get(chave)
+            if resposta is not None:
+                return resposta, 1.0
+
+            palavras = palavras_relevantes(chave)
+            partilhadas: Dict[str, int] = {}
+            for palavra in palavras:
+                for candidata in self._perguntas_por_palavra.get(palavra, ()):
+                    partilhadas[candidata] = partilhadas.get(candidata, 0) + 1
+
+            candidatas = sorted(partilhadas, key=partilhadas.get, reverse=True)[:MAX_CANDIDATOS_FUZZY]
+            melhor, melhor_semelhanca = None, 0.0
+            for candidata in candidatas:
+                semelhanca = semelhanca_palavras(palavras, self._palavras_por_pergunta[candidata])
+                if semelhanca > melhor_semelhanca:
+                    melhor, melhor_semelhanca = candidata, semelhanca
+
+            if melhor is not None and melhor_semelhanca >= self._limiar:
+                return self._respostas[melhor], melhor_semelhanca
+        return None
@@ -0,0 +1,242 @@
+"""
+Este módulo guarda o histórico agregado dos boards, um registo por atualização.
+
+A cada atualização de um board é gravado em SQLite um registo compacto com as
+contagens por estado, grupo de estado, tipo e responsável. Fica apenas o
+último registo de cada projeto em cada hora, e os registos mais antigos do
+que a janela de retenção são apagados no arranque e a cada gravação, para que
+a base de dados não cresça sem limite. As perguntas de
+tendência, velocidade e burndown ("como mudou o backlog esta semana?") são
+respondidas a partir destes agregados, sem voltar ao Azure Boards.
+"""
+
+import json
+import re
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional
+
+
+def extrair_periodo_dias(pergunta_lower: str, padrao: int = 7) -> int:
+    """
+    Extrai o período da pergunta em dias (ex: 'esta semana' -> 7, 'últimos 3 dias' -> 3).
+
+    Args:
+        pergunta_lower (str): A pergunta do usuário em minúsculas.
+        padrao (int): O período usado quando nenhum é mencionado.
+
+    Returns:
+        int: O número de dias a analisar.
+    """
+    match = re.search(r'(\d+)\s+dias?', pergunta_lower)
+    if match:
+        return max(1, int(match.group(1)))
+    if "mês" in pergunta_lower or "mes " in pergunta_lower:
+        return 30
+    if "semana" in pergunta_lower:
+        return 7
+    if "hoje" in pergunta_lower or "ontem" in pergunta_lower:
+        return 1
+    return padrao
+
+
+def _formatar_delta(antes: int, depois: int) -> str:
+    """Formata uma variação como 'antes → depois (+n)'."""
+    return f"{antes} → {depois} ({depois - antes:+d})"
+
+
+class HistoricoBoards:
+    """
+    Armazena e consulta os agregados de cada atualização dos boards em SQLite.
+    """
+    def __init__(self, caminho_db: str, retencao_dias: int = 90):
+        """
+        Abre (ou cria) a base de dados do histórico e apaga os registos fora da retenção.
+
+        Args:
+            caminho_db (str): O caminho do ficheiro SQLite (ex: 'boards_history.db').
+            retencao_dias (int): Quantos dias de histórico guardar (0 = sem limite).
+        """
+        self.retencao_dias = retencao_dias
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(caminho_db, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS historico_boards (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                projeto TEXT NOT NULL,
+                registado_em TEXT NOT NULL,
+                total INTEGER NOT NULL,
+                por_grupo_estado TEXT NOT NULL,
+                por_estado TEXT NOT NULL,
+                por_tipo TEXT NOT NULL,
+                por_responsavel TEXT NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS ix_historico_projeto_data ON historico_boards (projeto, registado_em)"
+        )
+        with self._lock:
+            self._compactar()
+            self._conn.commit()
+
+    def _compactar(self):
+        """
+        Mantém só o último registo de cada projeto em cada hora e apaga os registos fora da retenção.
+
+        Deve ser chamado com o lock adquirido; o commit fica a cargo de quem chama.
+        """
+        self._conn.execute(
+            "DELETE FROM historico_boards WHERE id NOT IN ("
+            "SELECT MAX(id) FROM historico_boards GROUP BY projeto, substr(registado_em, 1, 13))"
+        )
+        self._apagar_fora_da_retencao()
+
+    def _apagar_fora_da_retencao(self):
+        """Apaga os registos mais antigos do que a janela de retenção (com o lock adquirido)."""
+        if self.retencao_dias:
+            limite = (datetime.now() - timedelta(days=self.retencao_dias)).isoformat(timespec='seconds')
+            self._conn.execute("DELETE FROM historico_boards WHERE registado_em < ?", (limite,))
+
+    def registar(self, snapshot: Any):
+        """
+        Grava os agregados de um BoardSnapshot acabado de construir.
+
+        Um registo anterior do mesmo projeto na mesma hora é substituído, e os
+        registos fora da retenção são apagados.
+
+        Args:
+            snapshot (BoardSnapshot): O snapshot do board atualizado.
+        """
+        registado_em = snapshot.criado_em.isoformat(timespec='seconds')
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM historico_boards WHERE projeto = ? AND substr(registado_em, 1, 13) = ?",
+                (snapshot.projeto, registado_em[:13]),
+            )
+            self._conn.execute(
+                "INSERT INTO historico_boards (projeto, registado_em, total, por_grupo_estado, por_estado, por_tipo, por_responsavel) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    snapshot.projeto,
+                    registado_em,
+                    snapshot.total,
+                    json.dumps(snapshot.contagem_por_grupo_estado, ensure_ascii=False),
+                    json.dumps(snapshot.contagem_por_estado, ensure_ascii=False),
+                    json.dumps(snapshot.contagem_por_tipo, ensure_ascii=False),
+                    json.dumps(snapshot.contagem_por_responsavel, ensure_ascii=False),
+                ),
+            )
+            self._apagar_fora_da_retencao()
+            self._conn.commit()
+
+    def registos(self, projeto: str, dias: int) -> List[Dict[str, Any]]:
+        """
+        Devolve os registos de um projeto nos últimos dias, do mais antigo para o mais recente.
+
+        Args:
+            projeto (str): O nome do projeto no Azure Boards.
+            dias (int): O número de dias a recuar.
+
+        Returns:
+            List[Dict[str, Any]]: Os registos com as contagens já descodificadas.
+        """
+        desde = (datetime.now() - timedelta(days=dias)).isoformat(timespec='seconds')
+        with self._lock:
+            linhas = self._conn.execute(
+                "SELECT registado_em, total, por_grupo_estado, por_estado, por_tipo, por_responsavel "
+                "FROM historico_boards WHERE projeto = ? AND registado_em >= ? ORDER BY registado_em",
+                (projeto, desde),
+            ).fetchall()
+
+        return [
+            {
+                'registado_em': datetime.fromisoformat(linha[0]),
+                'total': linha[1],
+                'por_grupo_estado': json.loads(linha[2]),
+                'por_estado': json.loads(linha[3]),
+                'por_tipo': json.loads(linha[4]),
+                'por_responsavel': json.loads(linha[5]),
+            }
+            for linha in linhas
+        ]
+
+    def _ultimo_por_dia(self, projeto: str, dias: int) -> List[Dict[str, Any]]:
+        """Reduz os registos do período ao último registo de cada dia."""
+        por_dia: Dict[str, Dict[str, Any]] = {}
+        for registo in self.registos(projeto, dias):
+            por_dia[registo['registado_em'].strftime('%Y-%m-%d')] = registo
+        return [por_dia[dia] for dia in sorted(por_dia)]
+
+    def tendencia(self, projeto: str, nome_amigavel: str, dias: int) -> str:
+        """Compara o primeiro e o último registo do período."""
+        registos = self.registos(projeto, dias)
+        if len(registos) < 2:
+            return f"Ainda não tenho histórico suficiente do board {nome_amigavel} para os últimos {dias} dia(s)."
+
+        inicio, fim = registos[0], registos[-1]
+        linhas = [f"- **Total**: {_formatar_delta(inicio['total'], fim['total'])}"]
+        for grupo in sorted(set(inicio['por_grupo_estado']) | set(fim['por_grupo_estado'])):
+            antes, depois = inicio['por_grupo_estado'].get(grupo, 0), fim['por_grupo_estado'].get(grupo, 0)
+            linhas.append(f"- **{grupo.replace('concluido', 'concluído').capitalize()}**: {_formatar_delta(antes, depois)}")
+        for tipo in sorted(set(inicio['por_tipo']) | set(fim['por_tipo'])):
+            antes, depois = inicio['por_tipo'].get(tipo, 0), fim['por_tipo'].get(tipo, 0)
+            if antes != depois:
+                linhas.append(f"- **{tipo.title()}**: {_formatar_delta(antes, depois)}")
+
+        periodo = f"{inicio['registado_em'].strftime('%d/%m %H:%M')} a {fim['registado_em'].strftime('%d/%m %H:%M')}"
+        return f"📈 Evolução do board {nome_amigavel} ({periodo}):\n\n" + "\n".join(linhas)
+
+    def velocidade(self, projeto: str, nome_amigavel: str, dias: int) -> str:
+        """Estima os itens concluídos por dia a partir da variação do grupo 'concluido'."""
+        registos = self.registos(projeto, dias)
+        if len(registos) < 2:
+            return f"Ainda não tenho histórico suficiente do board {nome_amigavel} para calcular a velocidade."
+
+        inicio, fim = registos[0], registos[-1]
+        concluidos = fim['por_grupo_estado'].get('concluido', 0) - inicio['por_grupo_estado'].get('concluido', 0)
+        dias_decorridos = max((fim['registado_em'] - inicio['registado_em']).total_seconds() / 86400, 1 / 24)
+        return (
+            f"🚀 No board {nome_amigavel}, foram concluídos **{concluidos}** item(ns) em "
+            f"{dias_decorridos:.1f} dia(s), uma média de **{concluidos / dias_decorridos:.1f}** por dia."
+        )
+
+    def burndown(self, projeto: str, nome_amigavel: str, dias: int) -> str:
+        """Lista os itens ainda abertos no fim de cada dia do período."""
+        registos = self._ultimo_por_dia(projeto, dias)
+        if not registos:
+            return f"Ainda não tenho histórico do board {nome_amigavel} para os últimos {dias} dia(s)."
+
+        linhas = [
+            f"- {r['registado_em'].strftime('%d/%m')}: **{r['total'] - r['por_grupo_estado'].get('concluido', 0)}** item(ns) em aberto"
+            for r in registos
+        ]
+        return f"📉 Burndown do board {nome_amigavel} (últimos {dias} dia(s)):\n\n" + "\n".join(linhas)
+
+    def fechar(self):
+        """Fecha a ligação à base de dados do histórico."""
+        with self._lock:
+            self._conn.close()
+
+
+def responder_pergunta_historico(historico: Optional[HistoricoBoards], pergunta_lower: str, projeto: str, nome_amigavel: str, constants: Dict[str, Any]) -> Optional[str]:
+    """
+    Responde perguntas de tendência, velocidade ou burndown, se a pergunta for desse tipo.
+
+    Returns:
+        Optional[str]: A resposta, ou None se a pergunta não for sobre o histórico.
+    """
+    if historico is None:
+        return None
+
+    dias = extrair_periodo_dias(pergunta_lower)
+    if any(k in pergunta_lower for k in constants.get('BURNDOWN_KEYWORDS', [])):
+        return historico.burndown(projeto, nome_amigavel, dias)
+    if any(k in pergunta_lower for k in constants.get('VELOCITY_KEYWORDS', [])):
+        return historico.velocidade(projeto, nome_amigavel, dias)
+    if any(k in pergunta_lower for k in constants.get('TREND_KEYWORDS', [])):
+        return historico.tendencia(projeto, nome_amigavel, dias)
+    return None
@@ -0,0 +1,208 @@
+"""
+Este módulo implementa uma pequena camada de consultas sobre o BoardSnapshot.
+
+Uma pergunta é interpretada como um conjunto de filtros (tipo, estado,
+responsável e cliente) e uma operação (contar, listar ou agrupar). Os filtros
+são aplicados numa única passagem vetorizada com máscaras booleanas,
+construídas a partir das listas de linhas já pré-calculadas no snapshot.
+Assim, perguntas combinadas como "quantos bugs em andamento da Maria no sonar
+labs" deixam de cair na visão geral.
+"""
+
+import re
+from typing import Dict, Any, List, Optional
+import numpy as np
+import pandas as pd
+from core.board_snapshot import BoardSnapshot
+from utils import helpers
+
+
+class ConsultaBoard:
+    """
+    Representa uma pergunta sobre o board já decomposta em filtros e operação.
+    """
+    def __init__(self):
+        self.tipo: Optional[str] = None
+        self.grupo_estado: Optional[str] = None
+        self.responsavel: Optional[str] = None
+        self.cliente: Optional[str] = None
+        self.operacao: str = "listar"
+        self.agrupar_por: Optional[str] = None
+
+    @property
+    def total_filtros(self) -> int:
+        """O número de filtros preenchidos."""
+        return sum(f is not None for f in (self.tipo, self.grupo_estado, self.responsavel, self.cliente))
+
+    @property
+    def composta(self) -> bool:
+        """
+        Indica se a pergunta combina filtros ou pede um agrupamento.
+
+        Um colaborador com (ou sem) um estado não conta como combinação: essas
+        perguntas continuam a ser respondidas pela consulta de colaborador.
+        """
+        if self.operacao == "agrupar":
+            return True
+        if self.responsavel is not None:
+            return self.tipo is not None or self.cliente is not None
+        return self.total_filtros >= 2
+
+    def descricao(self) -> str:
+        """Descreve os filtros em linguagem natural, com um espaço inicial (ex: ' do tipo Bug de Maria')."""
+        partes = []
+        if self.tipo:
+            partes.append(f"do tipo **{self.tipo.title()}**")
+        if self.grupo_estado:
+            partes.append(self.grupo_estado.replace("concluido", "concluídos"))
+        if self.responsavel:
+            partes.append(f"de **{self.responsavel}**")
+        if self.cliente:
+            partes.append(f"do cliente **{self.cliente}**")
+        return (" " + " ".join(partes)) if partes else ""
+
+
+def _contem_palavra(texto: str, palavra: str) -> bool:
+    """Verifica se a palavra (ou expressão) aparece inteira no texto."""
+    return re.search(rf"\b{re.escape(palavra)}\b", texto) is not None
+
+
+def _detectar_tipo(pergunta_norm: str, constants: Dict[str, Any]) -> Optional[str]:
+    """
+    Detecta o tipo de item pedido (ex: 'bugs' -> 'bug').
+
+    Palavras genéricas como 'tarefas' só contam como tipo quando seguem
+    'quantos'/'quantas', tal como na contagem por tipo original.
+    """
+    palavras_genericas = {helpers.normalizar_texto(p) for p in constants.get('ACTIVITY_KEYWORDS', [])}
+    for chave, tipo in constants.get('MAPA_TIPOS_ITENS', {}).items():
+        chave_norm = helpers.normalizar_texto(chave)
+        if chave_norm in palavras_genericas:
+            if re.search(rf"\bquant[oa]s {re.escape(chave_norm)}\b", pergunta_norm):
+                return tipo
+        elif _contem_palavra(pergunta_norm, chave_norm):
+            return tipo
+    return None
+
+
+def _detectar_grupo_estado(pergunta_norm: str, constants: Dict[str, Any]) -> Optional[str]:
+    """Detecta o grupo de estado pedido a partir das palavras-chave de progresso."""
+    grupos = {
+        "em andamento": constants.get('PROGRESS_KEYWORDS', []),
+        "a fazer": constants.get('TODO_KEYWORDS', []),
+        "concluido": constants.get('COMPLETED_KEYWORDS', []),
+    }
+    for grupo, palavras in grupos.items():
+        if any(_contem_palavra(pergunta_norm, helpers.normalizar_texto(p)) for p in palavras):
+            return grupo
+    return None
+
+
+def _detectar_cliente(pergunta_norm: str, snapshot: BoardSnapshot) -> Optional[str]:
+    """Detecta um cliente do board mencionado na pergunta, preferindo o nome mais longo."""
+    for cliente_norm in sorted(snapshot.clientes_normalizados, key=len, reverse=True):
+        if cliente_norm and _contem_palavra(pergunta_norm, cliente_norm):
+            return snapshot.clientes_normalizados[cliente_norm]
+    return None
+
+
+def interpretar_pergunta(pergunta: str, snapshot: BoardSnapshot, constants: Dict[str, Any], responsavel: Optional[str] = None) -> ConsultaBoard:
+    """
+    Decompõe a pergunta do usuário numa ConsultaBoard.
+
+    Args:
+        pergunta (str): A mensagem do usuário.
+        snapshot (BoardSnapshot): O snapshot do board, usado para reconhecer clientes.
+        constants (Dict[str, Any]): Dicionário com MAPA_TIPOS_ITENS, as palavras-chave
+                                    de estado, COUNT_KEYWORDS e GROUP_BY_KEYWORDS.
+        responsavel (Optional[str]): O colaborador já detetado na pergunta, se houver.
+
+    Returns:
+        ConsultaBoard: Os filtros e a operação pedidos.
+    """
+    pergunta_norm = helpers.normalizar_texto(pergunta)
+    consulta = ConsultaBoard()
+
+    consulta.tipo = _detectar_tipo(pergunta_norm, constants)
+    consulta.grupo_estado = _detectar_grupo_estado(pergunta_norm, constants)
+    consulta.responsavel = responsavel
+    consulta.cliente = _detectar_cliente(pergunta_norm, snapshot)
+
+    for expressao, coluna in constants.get('GROUP_BY_KEYWORDS', {}).items():
+        if helpers.normalizar_texto(expressao) in pergunta_norm:
+            consulta.operacao = "agrupar"
+            consulta.agrupar_por = constants.get('BOARD_CLIENT_COLUMN', 'cliente') if coluna == "cliente" else coluna
+            return consulta
+
+    if any(_contem_palavra(pergunta_norm, helpers.normalizar_texto(p)) for p in constants.get('COUNT_KEYWORDS', [])):
+        consulta.operacao = "contar"
+    return consulta
+
+
+def _mascara(total: int, linhas: np.ndarray) -> np.ndarray:
+    """Converte uma lista de posições numa máscara booleana."""
+    mascara = np.zeros(total, dtype=bool)
+    mascara[linhas] = True
+    return mascara
+
+
+def filtrar(snapshot: BoardSnapshot, consulta: ConsultaBoard) -> np.ndarray:
+    """
+    Aplica todos os filtros da consulta numa única passagem de máscaras booleanas.
+
+    Returns:
+        np.ndarray: As posições (iloc) das linhas que satisfazem todos os filtros.
+    """
+    vazio = np.array([], dtype=int)
+    mascara = np.ones(snapshot.total, dtype=bool)
+
+    if consulta.tipo:
+        mascara &= _mascara(snapshot.total, snapshot.linhas_por_tipo.get(consulta.tipo.lower(), vazio))
+    if consulta.grupo_estado:
+        mascara &= _mascara(snapshot.total, snapshot.linhas_por_grupo_estado.get(consulta.grupo_estado, vazio))
+    if consulta.responsavel:
+        mascara &= _mascara(snapshot.total, snapshot.linhas_por_responsavel.get(consulta.responsavel, vazio))
+    if consulta.cliente:
+        mascara &= _mascara(snapshot.total, snapshot.linhas_por_cliente.get(consulta.cliente, vazio))
+
+    return np.flatnonzero(mascara)
+
+
+def executar_consulta(snapshot: BoardSnapshot, consulta: ConsultaBoard, com_epicos: bool = True) -> Any:
+    """
+    Executa a consulta sobre o snapshot.
+
+    Returns:
+        Any: Um inteiro (contar), um DataFrame (listar) ou uma Series com as
+             contagens por grupo (agrupar).
+    """
+    linhas = filtrar(snapshot, consulta)
+
+    if consulta.operacao == "contar":
+        return int(len(linhas))
+
+    if consulta.operacao == "agrupar":
+        if consulta.agrupar_por not in snapshot.df.columns:
+            return pd.Series(dtype=int)
+        return snapshot.df[consulta.agrupar_por].iloc[linhas].value_counts()
+
+    return snapshot.visao(com_epicos).iloc[linhas]
+
+
+def responder_consulta(snapshot: BoardSnapshot, consulta: ConsultaBoard, nome_amigavel: str, processing_module: Any, com_epicos: bool = True) -> str:
+    """Executa a consulta e formata a resposta para o usuário."""
+    resultado = executar_consulta(snapshot, consulta, com_epicos)
+    descricao = consulta.descricao()
+
+    if consulta.operacao == "contar":
+        return f"🔢 Existem **{resultado}** item(ns){descricao} no board {nome_amigavel}."
+
+    if consulta.operacao == "agrupar":
+        resultado = resultado[resultado > 0]
+        if resultado.empty:
+            return f"Não encontrei itens{descricao} no board {nome_amigavel}."
+        linhas: List[str] = [f"- **{grupo}**: {total}" for grupo, total in resultado.items()]
+        titulo = f"📊 Itens{descricao} por {consulta.agrupar_por} no board {nome_amigavel}:"
+        return titulo + "\n\n" + "\n".join(linhas)
+
+    return processing_module.formatar_lista_tarefas(resultado, f"Itens{descricao} do board {nome_amigavel}")
@@ -0,0 +1,205 @@
+"""
+Este módulo define o BoardSnapshot, uma fotografia dos dados de um board do
+Azure Boards construída uma única vez a cada atualização do cache.
+
+Em vez de varrer o DataFrame a cada pergunta, o snapshot pré-calcula as
+contagens por tipo, estado, responsável e cliente, além das listas de linhas
+por responsável e por estado. Assim, as perguntas mais comuns são respondidas
+com uma simples consulta a dicionário.
+
+O snapshot também mantém um índice invertido dos nomes dos responsáveis
+(palavra sem acentos -> responsáveis), usado para detetar colaboradores
+mencionados numa mensagem através de uma interseção de conjuntos.
+
+Cada snapshot é construído a partir da vista mais rica do board (com épicos).
+A vista sem épicos é derivada dele como uma projeção de colunas, em vez de
+ser buscada e guardada em separado.
+"""
+
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from utils import helpers
+
+# Pesos de cada parte do nome na identificação de um colaborador
+PESO_PRIMEIRO_NOME = 2.0
+PESO_ULTIMO_NOME = 1.5
+PESO_NOME_DO_MEIO = 1.0
+PARTICULAS_NOME = {"da", "de", "do", "das", "dos", "e"}
+
+
+def _contar(df: pd.DataFrame, coluna: str, normalizar: bool = False) -> Dict[str, int]:
+    """Conta as ocorrências de cada valor de uma coluna, ignorando valores nulos."""
+    if coluna not in df.columns:
+        return {}
+    serie = df[coluna].dropna().astype(str)
+    if normalizar:
+        serie = serie.str.strip().str.lower()
+    return {str(valor): int(total) for valor, total in serie.value_counts().items()}
+
+
+def _indices(df: pd.DataFrame, coluna: str, normalizar: bool = False) -> Dict[str, np.ndarray]:
+    """Agrupa as posições das linhas (iloc) de acordo com o valor de uma coluna."""
+    if coluna not in df.columns:
+        return {}
+    serie = df[coluna]
+    if normalizar:
+        serie = serie.astype("object").str.strip().str.lower()
+    grupos = serie.groupby(serie, sort=False, observed=True).indices
+    return {str(valor): np.asarray(posicoes) for valor, posicoes in grupos.items()}
+
+
+def _indexar_nomes(responsaveis: List[str]) -> Dict[str, Dict[str, float]]:
+    """
+    Constrói o índice invertido palavra -> {responsável: peso}.
+
+    O primeiro nome pesa mais do que o último, e este mais do que os nomes
+    do meio. Partículas como 'da' ou 'dos' não são indexadas.
+    """
+    indice: Dict[str, Dict[str, float]] = {}
+    for responsavel in responsaveis:
+        partes = [p for p in helpers.tokenizar(responsavel) if p not in PARTICULAS_NOME]
+        for posicao, parte in enumerate(partes):
+            if posicao == 0:
+                peso = PESO_PRIMEIRO_NOME
+            elif posicao == len(partes) - 1:
+                peso = PESO_ULTIMO_NOME
+            else:
+                peso = PESO_NOME_DO_MEIO
+            pesos = indice.setdefault(parte, {})
+            pesos[responsavel] = max(pesos.get(responsavel, 0.0), peso)
+    return indice
+
+
+def _maior(contagens: Dict[str, int]) -> Tuple[Optional[str], int]:
+    """Devolve a chave com a maior contagem e o respetivo total."""
+    if not contagens:
+        return None, 0
+    chave = max(contagens, key=contagens.get)
+    return chave, contagens[chave]
+
+
+class BoardSnapshot:
+    """
+    Agregados pré-calculados de um board, construídos uma vez por atualização.
+    """
+    def __init__(self, projeto: str, df: pd.DataFrame, constants: Dict[str, Any], memoria: Optional[Dict[str, Any]] = None):
+        """
+        Constrói o snapshot a partir do DataFrame já processado.
+
+        Args:
+            projeto (str): O nome do projeto no Azure Boards.
+            df (pd.DataFrame): O DataFrame devolvido por processar_work_items_df.
+            constants (Dict[str, Any]): Dicionário com as constantes, incluindo
+                                        BOARD_STATE_GROUPS e BOARD_CLIENT_COLUMN.
+            memoria (Optional[Dict[str, Any]]): As estatísticas da compactação do DataFrame.
+        """
+        self.projeto = projeto
+        self.df = df.reset_index(drop=True)
+        self.criado_em = datetime.now()
+        self.total = len(self.df)
+        self.memoria = memoria or {}
+        self._colunas_epicos = [c for c in constants.get('BOARD_EPIC_COLUMNS', []) if c in self.df.columns]
+        self._visao_sem_epicos: Optional[pd.DataFrame] = None
+
+        coluna_cliente = constants.get('BOARD_CLIENT_COLUMN', 'cliente')
+
+        self.contagem_por_tipo = _contar(self.df, 'tipo', normalizar=True)
+        self.contagem_por_estado = _contar(self.df, 'estado', normalizar=True)
+        self.contagem_por_responsavel = _contar(self.df, 'responsavel')
+        self.contagem_por_cliente = _contar(self.df, coluna_cliente)
+
+        self.linhas_por_responsavel = _indices(self.df, 'responsavel')
+        self.linhas_por_tipo = _indices(self.df, 'tipo', normalizar=True)
+        self.linhas_por_cliente = _indices(self.df, coluna_cliente)
+        self.linhas_por_estado = _indices(self.df, 'estado', normalizar=True)
+        self.linhas_por_grupo_estado = self._agrupar_estados(constants.get('BOARD_STATE_GROUPS', {}))
+        self.contagem_por_grupo_estado = {g: int(len(l)) for g, l in self.linhas_por_grupo_estado.items()}
+
+        self.indice_nomes = _indexar_nomes(list(self.linhas_por_responsavel))
+        self.clientes_normalizados = {helpers.normalizar_texto(c): c for c in self.linhas_por_cliente}
+
+        self.responsavel_com_mais_tarefas = _maior(self.contagem_por_responsavel)
+        self.cliente_com_mais_atividades = _maior(self.contagem_por_cliente)
+
+    def _agrupar_estados(self, grupos_estado: Dict[str, List[str]]) -> Dict[str, np.ndarray]:
+        """Junta as linhas dos estados equivalentes (ex: 'Active' e 'Doing') num só grupo."""
+        linhas_por_grupo = {}
+        for grupo, estados in grupos_estado.items():
+            partes = [self.linhas_por_estado[e] for e in estados if e in self.linhas_por_estado]
+            linhas_por_grupo[grupo] = np.sort(np.concatenate(partes)) if partes else np.array([], dtype=int)
+        return linhas_por_grupo
+
+    def identificar_responsavel(self, tokens: set, preferido: Optional[str] = None) -> Optional[str]:
+        """
+        Identifica o responsável mencionado num conjunto de palavras normalizadas.
+
+        Cada candidato soma os pesos das partes do nome presentes na mensagem.
+        Em caso de empate (ex: dois colaboradores chamados 'Ana'), prefere-se
+        o colaborador consultado anteriormente e, depois, o que tem mais tarefas.
+
+        Args:
+            tokens (set): As palavras da mensagem, já normalizadas.
+            preferido (Optional[str]): O último colaborador consultado pelo usuário.
+
+        Returns:
+            Optional[str]: O nome completo do responsável, ou None se nenhum for encontrado.
+        """
+        pontuacoes: Dict[str, float] = {}
+        for token in tokens & self.indice_nomes.keys():
+            for responsavel, peso in self.indice_nomes[token].items():
+                pontuacoes[responsavel] = pontuacoes.get(responsavel, 0.0) + peso
+
+        if not pontuacoes:
+            return None
+
+        melhor = max(pontuacoes.values())
+        empatados = [r for r, p in pontuacoes.items() if p == melhor]
+        if preferido in empatados:
+            return preferido
+        return max(empatados, key=lambda r: self.contagem_por_responsavel.get(r, 0))
+
+    def visao(self, com_epicos: bool = True) -> pd.DataFrame:
+        """
+        Devolve o DataFrame completo ou a vista sem as colunas vindas dos épicos.
+
+        A vista sem épicos é calculada uma única vez, na primeira utilização,
+        e partilha os dados das restantes colunas com o DataFrame completo.
+        """
+        if com_epicos or not self._colunas_epicos:
+            return self.df
+        if self._visao_sem_epicos is None:
+            self._visao_sem_epicos = self.df.drop(columns=self._colunas_epicos)
+        return self._visao_sem_epicos
+
+    def contar_tipo(self, tipo: str) -> int:
+        """Devolve o número de itens de um tipo (ex: 'bug', 'task')."""
+        return self.contagem_por_tipo.get(tipo.lower(), 0)
+
+    def linhas(self, responsavel: Optional[str] = None, grupo_estado: Optional[str] = None) -> np.ndarray:
+        """
+        Devolve as posições das linhas que satisfazem os filtros indicados.
+
+        Args:
+            responsavel (Optional[str]): O nome completo do responsável.
+            grupo_estado (Optional[str]): Um grupo de BOARD_STATE_GROUPS (ex: 'em andamento').
+
+        Returns:
+            np.ndarray: As posições (iloc) das linhas, ordenadas.
+        """
+        vazio = np.array([], dtype=int)
+        linhas_responsavel = self.linhas_por_responsavel.get(responsavel, vazio) if responsavel else None
+        linhas_estado = self.linhas_por_grupo_estado.get(grupo_estado, vazio) if grupo_estado else None
+
+        if linhas_responsavel is not None and linhas_estado is not None:
+            return np.intersect1d(linhas_responsavel, linhas_estado, assume_unique=True)
+        if linhas_responsavel is not None:
+            return linhas_responsavel
+        if linhas_estado is not None:
+            return linhas_estado
+        return np.arange(self.total)
+
+    def tarefas(self, responsavel: Optional[str] = None, grupo_estado: Optional[str] = None, com_epicos: bool = True) -> pd.DataFrame:
+        """Devolve o recorte do DataFrame (ou da vista sem épicos) correspondente aos filtros indicados."""
+        return self.visao(com_epicos).iloc[self.linhas(responsavel, grupo_estado)]
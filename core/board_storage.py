@@ -0,0 +1,147 @@
+"""
+Este módulo reduz o espaço ocupado pelos DataFrames dos boards no cache.
+
+Depois de processar_work_items_df, as colunas de baixa cardinalidade (tipo,
+estado, responsável, cliente...) são convertidas em categorias e as datas em
+datetime64, mantendo o fuso horário original (datas sem fuso continuam sem
+fuso). Nenhuma coluna é descartada: os formatadores do processing_module podem
+ler qualquer uma. Opcionalmente, os snapshots podem ser gravados em Parquet e
+lidos de volta após um reinício (uma leitura completa para memória), evitando
+uma nova ida ao Azure.
+"""
+
+import os
+from datetime import datetime
+from typing import Dict, Any, Optional, Tuple
+import pandas as pd
+
+try:
+    import pyarrow.parquet as pq
+    PARQUET_DISPONIVEL = True
+except ImportError:
+    pq = None
+    PARQUET_DISPONIVEL = False
+
+
+def _memoria_bytes(df: pd.DataFrame) -> int:
+    """Calcula a memória ocupada pelo DataFrame, incluindo o conteúdo das strings."""
+    return int(df.memory_usage(deep=True).sum())
+
+
+def _converter_datas(coluna: pd.Series) -> pd.Series:
+    """
+    Converte uma coluna de datas em datetime64, sem mudar o fuso horário.
+
+    Se os valores tiverem fusos diferentes entre si (não há um dtype único para
+    eles), a coluna fica como estava.
+    """
+    if pd.api.types.is_datetime64_any_dtype(coluna):
+        return coluna
+    try:
+        convertida = pd.to_datetime(coluna, errors='coerce')
+    except (ValueError, TypeError):
+        return coluna
+    return convertida if pd.api.types.is_datetime64_any_dtype(convertida) else coluna
+
+
+def compactar_board_df(df: pd.DataFrame, constants: Dict[str, Any]) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    """
+    Converte o DataFrame de um board para uma representação colunar compacta.
+
+    Args:
+        df (pd.DataFrame): O DataFrame devolvido por processar_work_items_df.
+        constants (Dict[str, Any]): Dicionário com BOARD_DATE_COLUMNS e BOARD_CATEGORY_MAX_RATIO.
+
+    Returns:
+        Tuple[pd.DataFrame, Dict[str, Any]]: O DataFrame compactado e as
+                                             estatísticas de memória (antes, depois, poupado).
+    """
+    memoria_antes = _memoria_bytes(df)
+
+    compacto = df.copy()
+
+    for coluna in constants.get('BOARD_DATE_COLUMNS', []):
+        if coluna in compacto.columns:
+            compacto[coluna] = _converter_datas(compacto[coluna])
+
+    limite_categorias = constants.get('BOARD_CATEGORY_MAX_RATIO', 0.5)
+    total_linhas = max(len(compacto), 1)
+    for coluna in compacto.select_dtypes(include=['object', 'string']).columns:
+        if compacto[coluna].nunique(dropna=True) / total_linhas <= limite_categorias:
+            compacto[coluna] = compacto[coluna].astype('category')
+
+    memoria_depois = _memoria_bytes(compacto)
+    estatisticas = {
+        'antes_bytes': memoria_antes,
+        'depois_bytes': memoria_depois,
+        'poupado_bytes': memoria_antes - memoria_depois,
+    }
+    return compacto, estatisticas
+
+
+def formatar_relatorio_memoria(projeto: str, estatisticas: Dict[str, Any]) -> str:
+    """Cria a linha de log com a memória poupada na compactação de um projeto."""
+    antes = estatisticas['antes_bytes'] / 1024 / 1024
+    depois = estatisticas['depois_bytes'] / 1024 / 1024
+    percentagem = (estatisticas['poupado_bytes'] / estatisticas['antes_bytes'] * 100) if estatisticas['antes_bytes'] else 0.0
+    return f"📉 [Boards] '{projeto}' compactado: {antes:.2f} MB -> {depois:.2f} MB ({percentagem:.0f}% poupado)."
+
+
+def _caminho_snapshot(diretorio: str, cache_key: str) -> str:
+    """Monta o caminho do ficheiro Parquet de um snapshot."""
+    nome = cache_key.replace(' ', '_').replace('/', '_')
+    return os.path.join(diretorio, f"{nome}.parquet")
+
+
+def salvar_snapshot(df: pd.DataFrame, diretorio: str, cache_key: str) -> Optional[str]:
+    """
+    Grava o DataFrame compactado em Parquet, se o pyarrow estiver disponível.
+
+    Args:
+        df (pd.DataFrame): O DataFrame já compactado.
+        diretorio (str): A pasta onde os snapshots são guardados.
+        cache_key (str): A chave do cache do board (ex: 'boards_Sonar').
+
+    Returns:
+        Optional[str]: O caminho do ficheiro gravado, ou None se não foi possível gravar.
+    """
+    if not PARQUET_DISPONIVEL or not diretorio:
+        return None
+    try:
+        os.makedirs(diretorio, exist_ok=True)
+        caminho = _caminho_snapshot(diretorio, cache_key)
+        df.to_parquet(caminho, engine='pyarrow', index=False)
+        return caminho
+    except Exception as e:
+        print(f"⚠️ Não foi possível gravar o snapshot '{cache_key}' em Parquet: {e}")
+        return None
+
+
+def carregar_snapshot(diretorio: str, cache_key: str, validade_segundos: int) -> Optional[pd.DataFrame]:
+    """
+    Lê um snapshot Parquet para memória, se existir e ainda for válido.
+
+    Args:
+        diretorio (str): A pasta onde os snapshots são guardados.
+        cache_key (str): A chave do cache do board.
+        validade_segundos (int): A idade máxima do ficheiro para ser reutilizado.
+
+    Returns:
+        Optional[pd.DataFrame]: O DataFrame recarregado, ou None se não houver snapshot válido.
+    """
+    if not PARQUET_DISPONIVEL or not diretorio:
+        return None
+
+    caminho = _caminho_snapshot(diretorio, cache_key)
+    if not os.path.exists(caminho):
+        return None
+
+    idade = datetime.now().timestamp() - os.path.getmtime(caminho)
+    if idade > validade_segundos:
+        return None
+
+    try:
+        return pq.read_table(caminho).to_pandas()
+    except Exception as e:
+        print(f"⚠️ Não foi possível recarregar o snapshot '{cache_key}': {e}")
+        return None
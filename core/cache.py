@@ -3,6 +3,10 @@ Este módulo fornece uma classe de gerenciamento de cache em memória simples.
 É usado para armazenar temporariamente dados que são caros para buscar,
 como resultados de APIs externas (Azure Boards, SharePoint), para melhorar
 o desempenho e reduzir o número de chamadas de rede.
+
+Opcionalmente, o cache em memória pode ter um nível partilhado por vários
+processos (CacheCompartilhado): as escritas vão para os dois níveis e as
+falhas no nível local são procuradas no partilhado antes de serem falhas.
 """
 
 from datetime import datetime, timedelta
@@ -12,7 +16,7 @@ class CacheManager:
     """
     Gerencia um cache em memória com tempo de expiração para os itens.
     """
-    def __init__(self, default_duration_seconds: int, cleanup_interval_seconds: int):
+    def __init__(self, default_duration_seconds: int, cleanup_interval_seconds: int, shared_cache: Optional[Any] = None):
         """
         Inicializa o CacheManager.
 
@@ -21,7 +25,9 @@ class CacheManager:
                                             permanece no cache antes de ser considerado expirado.
             cleanup_interval_seconds (int): O intervalo em segundos para executar a
                                             limpeza automática de itens expirados.
+            shared_cache (Optional[Any]): O nível partilhado entre processos (CacheCompartilhado), se houver.
         """
+        self._shared = shared_cache
         self._cache: Dict[str, Dict[str, Any]] = {}
         self._default_duration = timedelta(seconds=default_duration_seconds)
         self._cleanup_interval = timedelta(seconds=cleanup_interval_seconds)
@@ -44,6 +50,8 @@ class CacheManager:
             'value': value,
             'expires_at': expiration_time
         }
+        if self._shared is not None:
+            self._shared.set(key, value, duration.total_seconds())
         print(f"📦 [Cache] Item '{key}' adicionado/atualizado. Expira em: {expiration_time.strftime('%H:%M:%S')}")
 
     def get(self, key: str) -> Optional[Any]:
@@ -68,9 +76,26 @@ class CacheManager:
             del self._cache[key]
         else:
             print(f"🤷 [Cache] Miss para a chave '{key}' (não encontrado).")
+
+        if self._shared is not None:
+            partilhado = self._shared.get(key)
+            if partilhado is not None:
+                value, expira_em = partilhado
+                self._cache[key] = {'value': value, 'expires_at': datetime.fromtimestamp(expira_em)}
+                print(f"🔗 [Cache] Hit partilhado para a chave '{key}'.")
+                return value
             
         return None
 
+    def contem(self, key: str) -> bool:
+        """
+        Indica se a chave está no cache local e não expirou, sem a ler nem registar hits ou misses.
+
+        Usado para saber de antemão se uma resposta vai sair do cache (ex: para escolher a faixa da mensagem).
+        """
+        item = self._cache.get(key)
+        return item is not None and datetime.now() < item['expires_at']
+
     def cleanup(self):
         """
         Remove todos os itens expirados do cache.
@@ -90,6 +115,9 @@ class CacheManager:
                 print(f"🗑️ [Cache] {len(expired_keys)} item(ns) expirado(s) removido(s).")
             else:
                 print("✨ [Cache] Nenhum item expirado para remover.")
+
+            if self._shared is not None:
+                self._shared.remover_expirados()
                 
             self._last_cache_cleanup = now
 
@@ -98,5 +126,7 @@ class CacheManager:
         Limpa completamente todos os itens do cache.
         """
         self._cache.clear()
+        if self._shared is not None:
+            self._shared.limpar()
         print("💥 [Cache] Todo o cache foi limpo.")
 
@@ -0,0 +1,113 @@
+"""
+Este módulo mantém o catálogo dos arquivos do SharePoint já vistos pela Sofia.
+
+Cada arquivo devolvido por uma busca ou por uma listagem de recentes é
+guardado uma única vez, pelo seu id: as buscas em cache e as listagens
+referenciam os mesmos objetos, em vez de cada uma guardar a sua cópia.
+
+A formatação (URL válida e data de modificação) é feita na leitura e
+memorizada em cada item, pelo que o mesmo arquivo não é formatado de novo
+em cada resposta. A URL memorizada é recalculada se as regras de validação
+mudarem, e ambas são recalculadas se o SharePoint devolver o arquivo alterado.
+
+O catálogo guarda referências fracas: um arquivo sai do catálogo quando deixa
+de estar em alguma busca em cache (ou numa resposta em curso).
+"""
+
+import threading
+import weakref
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+
+class ItemArquivo:
+    """
+    Um arquivo do SharePoint (os dados devolvidos pela API) com a sua formatação memorizada.
+    """
+    __slots__ = ('dados', '_regras_url', '_url', '_data', '__weakref__')
+
+    def __init__(self, dados: Dict[str, Any]):
+        self.dados = dados
+        self._limpar_memoria()
+
+    def _limpar_memoria(self):
+        self._regras_url: Optional[Tuple] = None
+        self._url: Optional[str] = None
+        self._data: Optional[str] = None
+
+    def __getstate__(self):
+        return self.dados, self._regras_url, self._url, self._data
+
+    def __setstate__(self, estado):
+        self.dados, self._regras_url, self._url, self._data = estado
+
+    @property
+    def nome(self) -> str:
+        return self.dados.get('name', 'Sem nome')
+
+    def url(self, constants: Dict, helpers: Any) -> str:
+        """Devolve a URL válida do arquivo, calculada uma vez por conjunto de regras."""
+        regras = (
+            tuple(constants.get('URL_FIELDS') or ()),
+            tuple(constants.get('URL_VALIDATION_PATTERNS') or ()),
+            tuple(constants.get('INVALID_URL_PATTERNS') or ()),
+        )
+        if self._regras_url != regras:
+            self._url = helpers.obter_url_valida(self.dados, *regras)
+            self._regras_url = regras
+        return self._url
+
+    def data_modificacao(self, helpers: Any) -> str:
+        """Devolve a data de modificação formatada, calculada uma única vez."""
+        if self._data is None:
+            self._data = helpers.formatar_data_com_hora(self.dados.get("lastModifiedDateTime"))
+        return self._data
+
+
+def _identificador(dados: Dict[str, Any]) -> Optional[str]:
+    """O id do arquivo no SharePoint ou, na sua falta, a URL."""
+    return dados.get('id') or dados.get('webUrl')
+
+
+class CatalogoArquivos:
+    """
+    Guarda cada arquivo uma única vez, pelo id, partilhado pelas buscas e pelas listagens.
+    """
+    def __init__(self):
+        self._itens: "weakref.WeakValueDictionary[str, ItemArquivo]" = weakref.WeakValueDictionary()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._itens)
+
+    def registar(self, arquivos: Iterable[Any]) -> Tuple[ItemArquivo, ...]:
+        """
+        Devolve os itens do catálogo correspondentes aos arquivos, criando os que ainda não existem.
+
+        Args:
+            arquivos (Iterable[Any]): Os arquivos devolvidos pelo SharePoint (dicionários) ou
+                                      itens já criados (ex: vindos do cache partilhado entre processos).
+
+        Returns:
+            Tuple[ItemArquivo, ...]: Os itens, pela mesma ordem. Se um arquivo já conhecido
+                                     vier com dados diferentes, o item existente é atualizado.
+        """
+        itens: List[ItemArquivo] = []
+        with self._lock:
+            for arquivo in arquivos:
+                novo = arquivo if isinstance(arquivo, ItemArquivo) else None
+                dados = novo.dados if novo is not None else arquivo
+                chave = _identificador(dados)
+                existente = self._itens.get(chave) if chave else None
+
+                if existente is None:
+                    existente = novo or ItemArquivo(dados)
+                    if chave:
+                        self._itens[chave] = existente
+                elif existente.dados != dados:
+                    existente.dados = dados
+                    existente._limpar_memoria()
+                itens.append(existente)
+        return tuple(itens)
+
+
+catalogo_arquivos = CatalogoArquivos()
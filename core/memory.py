@@ -0,0 +1,247 @@
+"""
+Este módulo contabiliza a memória ocupada por cada componente da Sofia.
+
+Cada componente (cache dos boards, estados dos usuários, histórico das
+conversas, caches de fragmentos e de respostas...) é registado com uma função
+que o devolve, e o seu tamanho é estimado percorrendo recursivamente os
+objetos que ele contém. Os DataFrames e arrays são medidos pelo pandas e pelo
+numpy, que conhecem o tamanho real dos seus buffers. Um objeto partilhado por
+vários componentes é contado uma única vez, no primeiro componente registado
+que o referencia, para que a soma dos componentes não exceda a memória real.
+
+Opcionalmente, o tracemalloc regista as alocações do Python, para mostrar as
+linhas de código que mais memória alocaram e o crescimento entre relatórios.
+Os relatórios podem ser pedidos pelo comando de administração ou gravados
+periodicamente num ficheiro JSONL; em ambos os casos, a medição corre numa
+thread, para não bloquear o event loop.
+"""
+
+import asyncio
+import json
+import os
+import sys
+import threading
+import tracemalloc
+import types
+from collections import deque
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+# Objetos partilhados por todo o processo, que não pertencem a nenhum componente
+_TIPOS_IGNORADOS = (
+    type, types.ModuleType, types.FunctionType, types.BuiltinFunctionType,
+    types.MethodType, types.CodeType, types.FrameType, asyncio.AbstractEventLoop,
+)
+_FILTROS_TRACEMALLOC = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, __file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+def tamanho_profundo(objeto: Any, vistos: Optional[set] = None) -> int:
+    """
+    Estima, em bytes, a memória ocupada por um objeto e por tudo o que ele referencia.
+
+    Cada objeto só é contado uma vez (mesmo que seja referenciado várias vezes).
+    Classes, módulos e funções não são contados.
+
+    Args:
+        objeto (Any): O objeto a medir.
+        vistos (Optional[set]): Os ids dos objetos já contados; partilhe o mesmo
+                                conjunto para não contar duas vezes entre chamadas.
+
+    Returns:
+        int: O tamanho aproximado em bytes.
+    """
+    vistos = set() if vistos is None else vistos
+    total = 0
+    pendentes = [objeto]
+    while pendentes:
+        obj = pendentes.pop()
+        if id(obj) in vistos or isinstance(obj, _TIPOS_IGNORADOS):
+            continue
+        vistos.add(id(obj))
+
+        if isinstance(obj, (pd.DataFrame, pd.Series, pd.Index)):
+            uso = obj.memory_usage(deep=True)
+            total += int(uso.sum()) if isinstance(obj, pd.DataFrame) else int(uso)
+            continue
+        if isinstance(obj, np.ndarray):
+            total += sys.getsizeof(obj)
+            if obj.base is not None:
+                # Uma vista: os dados pertencem ao array base, contado uma única vez
+                pendentes.append(obj.base)
+            continue
+
+        total += sys.getsizeof(obj)
+        try:
+            # Cópias das coleções: outras threads podem alterá-las durante a medição
+            if isinstance(obj, dict):
+                for chave, valor in list(obj.items()):
+                    pendentes.append(chave)
+                    pendentes.append(valor)
+            elif isinstance(obj, (list, tuple, set, frozenset, deque)):
+                pendentes.extend(list(obj))
+            else:
+                if hasattr(obj, '__dict__'):
+                    pendentes.append(vars(obj))
+                for slot in getattr(type(obj), '__slots__', ()):
+                    if hasattr(obj, slot):
+                        pendentes.append(getattr(obj, slot))
+        except RuntimeError:
+            continue
+    return total
+
+
+def _rss_atual() -> int:
+    """Devolve o RSS atual do processo (ou o pico, onde o /proc não existe)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        import resource
+        pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return pico if sys.platform == "darwin" else pico * 1024
+
+
+def _formatar_bytes(total: float) -> str:
+    """Formata um número de bytes (ex: 1536 -> '1.5 KB')."""
+    for unidade in ("B", "KB", "MB", "GB"):
+        if abs(total) < 1024 or unidade == "GB":
+            return f"{total:.0f} {unidade}" if unidade == "B" else f"{total:.1f} {unidade}"
+        total /= 1024
+    return f"{total:.1f} GB"
+
+
+class ContabilidadeMemoria:
+    """
+    Mede a memória de cada componente registado e, opcionalmente, as alocações do tracemalloc.
+    """
+    def __init__(self, usar_tracemalloc: bool = False, frames_tracemalloc: int = 1, top_alocacoes: int = 10):
+        """
+        Inicializa a contabilidade.
+
+        Args:
+            usar_tracemalloc (bool): Se True, inicia o tracemalloc (tem um custo de CPU e de memória).
+            frames_tracemalloc (int): Quantos frames da pilha guardar por alocação.
+            top_alocacoes (int): Quantas linhas de código mostrar no top e no crescimento.
+        """
+        self._componentes: Dict[str, Callable[[], Any]] = {}
+        self._top = top_alocacoes
+        self._lock = threading.Lock()
+        self._ultimo_relatorio: Optional[Dict[str, Any]] = None
+        self._ultimo_snapshot: Optional[tracemalloc.Snapshot] = None
+        if usar_tracemalloc and not tracemalloc.is_tracing():
+            tracemalloc.start(frames_tracemalloc)
+
+    def registar(self, nome: str, obter: Callable[[], Any]):
+        """
+        Regista um componente a medir.
+
+        Args:
+            nome (str): O nome do componente no relatório (ex: 'cache_manager').
+            obter (Callable[[], Any]): Função que devolve o objeto do componente no momento da medição.
+        """
+        self._componentes[nome] = obter
+
+    def medir_componentes(self) -> Dict[str, int]:
+        """
+        Devolve o tamanho aproximado, em bytes, de cada componente registado.
+
+        Os componentes são medidos pela ordem de registo com um único conjunto de
+        objetos vistos: o que já foi contado num componente não volta a ser contado.
+        """
+        tamanhos = {}
+        vistos: set = set()
+        for nome, obter in self._componentes.items():
+            try:
+                tamanhos[nome] = tamanho_profundo(obter(), vistos)
+            except Exception as e:
+                print(f"⚠️ [Memória] Não foi possível medir '{nome}': {e}")
+                tamanhos[nome] = -1
+        return tamanhos
+
+    def _alocacoes(self) -> Optional[Dict[str, Any]]:
+        """Tira um snapshot do tracemalloc e devolve o top de alocações e o crescimento desde o anterior."""
+        if not tracemalloc.is_tracing():
+            return None
+        snapshot = tracemalloc.take_snapshot().filter_traces(_FILTROS_TRACEMALLOC)
+        atual, pico = tracemalloc.get_traced_memory()
+        top = [
+            {'local': str(e.traceback), 'bytes': e.size, 'blocos': e.count}
+            for e in snapshot.statistics('lineno')[:self._top]
+        ]
+        crescimento = []
+        if self._ultimo_snapshot is not None:
+            crescimento = [
+                {'local': str(d.traceback), 'diferenca_bytes': d.size_diff, 'bytes': d.size}
+                for d in snapshot.compare_to(self._ultimo_snapshot, 'lineno')[:self._top]
+                if d.size_diff
+            ]
+        self._ultimo_snapshot = snapshot
+        return {'atual_bytes': atual, 'pico_bytes': pico, 'top': top, 'crescimento': crescimento}
+
+    def relatorio(self) -> Dict[str, Any]:
+        """
+        Gera um relatório de memória.
+
+        Returns:
+            Dict[str, Any]: O instante, o RSS do processo, o tamanho de cada componente,
+                            o crescimento de cada componente desde o relatório anterior
+                            e, com o tracemalloc ativo, o top de alocações e o seu crescimento.
+        """
+        with self._lock:
+            componentes = self.medir_componentes()
+            anteriores = (self._ultimo_relatorio or {}).get('componentes', {})
+            relatorio = {
+                'instante': datetime.now().isoformat(timespec="seconds"),
+                'rss_bytes': _rss_atual(),
+                'componentes': componentes,
+                'crescimento_componentes': {
+                    nome: tamanho - anteriores[nome] for nome, tamanho in componentes.items() if nome in anteriores
+                },
+                'tracemalloc': self._alocacoes(),
+            }
+            self._ultimo_relatorio = relatorio
+        return relatorio
+
+    def gravar_jsonl(self, caminho: str) -> Dict[str, Any]:
+        """Gera um relatório e acrescenta-o, numa linha, ao ficheiro JSONL."""
+        relatorio = self.relatorio()
+        with open(caminho, "a", encoding="utf-8") as f:
+            f.write(json.dumps(relatorio, ensure_ascii=False) + "\n")
+        return relatorio
+
+    async def registar_periodicamente(self, caminho: str, intervalo_segundos: int):
+        """Grava um relatório no ficheiro JSONL a cada intervalo."""
+        while True:
+            await asyncio.sleep(intervalo_segundos)
+            try:
+                relatorio = await asyncio.to_thread(self.gravar_jsonl, caminho)
+                print(f"🧮 [Memória] Relatório gravado em {caminho} (RSS: {_formatar_bytes(relatorio['rss_bytes'])}).")
+            except Exception as e:
+                print(f"❌ [Memória] Erro ao gravar o relatório: {e}")
+
+    @staticmethod
+    def formatar(relatorio: Dict[str, Any]) -> str:
+        """Formata um relatório para a resposta ao comando de administração."""
+        linhas = [f"🧮 **Memória da Sofia** (RSS: {_formatar_bytes(relatorio['rss_bytes'])})", ""]
+        crescimento = relatorio.get('crescimento_componentes', {})
+        for nome, tamanho in sorted(relatorio['componentes'].items(), key=lambda c: -c[1]):
+            variacao = f" ({'+' if crescimento[nome] >= 0 else '-'}{_formatar_bytes(abs(crescimento[nome]))})" if crescimento.get(nome) else ""
+            linhas.append(f"- **{nome}**: {_formatar_bytes(tamanho)}{variacao}")
+
+        alocacoes = relatorio.get('tracemalloc')
+        if alocacoes:
+            linhas += ["", f"📍 **Maiores alocações** (tracemalloc: {_formatar_bytes(alocacoes['atual_bytes'])}, pico {_formatar_bytes(alocacoes['pico_bytes'])})"]
+            linhas += [f"- {a['local']}: {_formatar_bytes(a['bytes'])}" for a in alocacoes['top']]
+            if alocacoes['crescimento']:
+                linhas += ["", "📈 **Crescimento desde o último relatório**"]
+                linhas += [f"- {c['local']}: {'+' if c['diferenca_bytes'] >= 0 else '-'}{_formatar_bytes(abs(c['diferenca_bytes']))}" for c in alocacoes['crescimento']]
+        return "\n".join(linhas)
@@ -0,0 +1,90 @@
+"""
+Este módulo analisa cada mensagem do usuário uma única vez por pedido.
+
+O MessageAnalysis é criado no SofiaBrain.responder e passado ao intent_router,
+aos handlers e aos helpers. Reúne o texto em minúsculas, a forma sem acentos,
+as palavras e os números da mensagem, para que ninguém volte a fazer
+lower(), split() ou regex sobre o mesmo texto. A forma sem acentos, os tokens,
+o termo de busca de arquivos e as palavras-chave de cada lista das constantes
+(ex: 'BOARDS_COMMANDS') só são calculados na primeira vez que são pedidos e
+ficam memorizados.
+"""
+
+import re
+from functools import cached_property
+from typing import Any, Dict, Tuple
+
+from utils import helpers
+
+_PADRAO_PALAVRA = re.compile(r'\w+')
+_PADRAO_NUMERO = re.compile(r'\d+')
+
+
+class MessageAnalysis:
+    """
+    Formas pré-calculadas de uma mensagem, partilhadas por todo o processamento do pedido.
+    """
+    def __init__(self, message: str, constants: Dict[str, Any]):
+        """
+        Analisa a mensagem.
+
+        Args:
+            message (str): A mensagem bruta do usuário.
+            constants (Dict[str, Any]): As constantes, de onde vêm as listas de palavras-chave.
+        """
+        self.original = message
+        self.texto = message.strip()
+        self.lower = self.texto.lower()
+        self.palavras: Tuple[str, ...] = tuple(self.texto.split())
+        self.numeros: Tuple[int, ...] = tuple(int(n) for n in _PADRAO_NUMERO.findall(self.lower))
+        self._constants = constants
+        self._hits: Dict[str, Tuple[str, ...]] = {}
+
+    @cached_property
+    def normalizado(self) -> str:
+        """O texto em minúsculas e sem acentos (ex: 'Tarefas do João' -> 'tarefas do joao')."""
+        return helpers.normalizar_texto(self.texto)
+
+    @cached_property
+    def tokens(self) -> Tuple[str, ...]:
+        """As palavras normalizadas, sem pontuação (o mesmo que helpers.tokenizar)."""
+        return tuple(_PADRAO_PALAVRA.findall(self.normalizado))
+
+    @cached_property
+    def conjunto_tokens(self) -> frozenset:
+        return frozenset(self.tokens)
+
+    @cached_property
+    def termo_busca(self) -> str:
+        """O termo de uma busca de arquivos (helpers.extract_search_term), usado para escolher a faixa e para buscar."""
+        return helpers.extract_search_term(
+            self.original,
+            self._constants.get('REGEX_PATTERNS', {}),
+            self._constants.get('FILE_KEYWORDS'),
+            self._constants.get('MIN_WORD_LENGTH'),
+            self._constants.get('MAX_RELEVANT_WORDS'),
+        )
+
+    def palavras_chave(self, grupo: str) -> Tuple[str, ...]:
+        """
+        Devolve as expressões de uma lista das constantes que aparecem na mensagem.
+
+        Args:
+            grupo (str): O nome da lista nas constantes (ex: 'PROGRESS_KEYWORDS').
+                         Para dicionários (ex: 'ADMIN_COMMANDS'), são usadas as chaves.
+
+        Returns:
+            Tuple[str, ...]: As expressões encontradas no texto em minúsculas.
+        """
+        hits = self._hits.get(grupo)
+        if hits is None:
+            hits = tuple(expressao for expressao in self._constants.get(grupo, ()) if expressao in self.lower)
+            self._hits[grupo] = hits
+        return hits
+
+    def tem(self, grupo: str) -> bool:
+        """Indica se alguma expressão da lista das constantes aparece na mensagem."""
+        return bool(self.palavras_chave(grupo))
+
+    def __repr__(self) -> str:
+        return f"MessageAnalysis({self.texto!r}, tokens={len(self.tokens)}, numeros={self.numeros})"
@@ -0,0 +1,209 @@
+"""
+Este módulo monta o prompt de sistema dentro de um orçamento de tokens.
+
+Cada fragmento do prompt pertence a uma secção (persona, empresa,
+instrucoes, conhecimento, projetos, historico). Cada secção tem um orçamento
+próprio e uma prioridade. As secções obrigatórias (a persona e as
+instruções) entram sempre inteiras. As restantes são servidas por prioridade
+e cortadas, linha a linha, quando o orçamento se esgota; um fragmento em que
+nem o cabeçalho e uma linha cabem é cortado por caracteres. O histórico é
+cortado a partir do início, para ficarem as mensagens mais recentes.
+
+O número de tokens de cada prompt montado é registado para as métricas, e
+cada secção cortada ou descartada por falta de orçamento fica no log.
+"""
+
+import threading
+from collections import deque
+from typing import Callable, Dict, Any, Iterable, List, NamedTuple, Optional, Tuple
+
+from database.retrieval import estimar_tokens
+
+# Secções cujo conteúdo mais recente está no fim (são cortadas a partir do início)
+SECOES_CORTADAS_DO_INICIO = {'historico'}
+
+
+class MedicaoPrompt(NamedTuple):
+    tokens_total: int
+    tokens_por_secao: Dict[str, int]
+    secoes_cortadas: Tuple[str, ...]
+    secoes_descartadas: Tuple[str, ...] = ()
+
+
+def _cortar_caracteres(texto: str, max_tokens: int, do_inicio: bool, contar: Callable[[str], int]) -> str:
+    """Reduz um texto a no máximo max_tokens cortando caracteres (do início ou do fim), com reticências."""
+    texto = texto.strip("\n")
+    if max_tokens <= 0 or not texto:
+        return ""
+    tamanho = min(len(texto), len(texto) * max_tokens // max(contar(texto), 1))
+    while tamanho > 0:
+        parte = "…" + texto[-tamanho:] if do_inicio else texto[:tamanho] + "…"
+        if contar(parte) <= max_tokens:
+            return parte
+        tamanho -= max(1, tamanho // 10)
+    return ""
+
+
+def _cortar_fragmento(texto: str, max_tokens: int, do_inicio: bool, contar: Callable[[str], int]) -> str:
+    """
+    Reduz um fragmento a no máximo max_tokens, mantendo o cabeçalho (primeira linha).
+
+    Quando nem o cabeçalho e uma linha de conteúdo cabem no orçamento, o
+    fragmento é cortado por caracteres. Devolve "" só quando nada cabe.
+    """
+    linhas = texto.strip("\n").split("\n")
+    cabecalho, corpo = linhas[0], linhas[1:]
+    usados = contar(cabecalho)
+    if usados >= max_tokens or not corpo:
+        return _cortar_caracteres(texto, max_tokens, do_inicio, contar)
+
+    if do_inicio:
+        corpo = corpo[::-1]
+
+    mantidas = []
+    for linha in corpo:
+        custo = contar(linha) if linha else 0
+        if usados + custo > max_tokens:
+            break
+        usados += custo
+        mantidas.append(linha)
+
+    # A soma por linha não conta as quebras de linha; acerta com o texto final
+    while mantidas and contar("\n".join([cabecalho] + mantidas)) > max_tokens:
+        mantidas.pop()
+
+    if not any(linha.strip() for linha in mantidas):
+        return _cortar_caracteres(texto, max_tokens, do_inicio, contar)
+    if do_inicio:
+        mantidas = mantidas[::-1]
+    return "\n".join([cabecalho] + mantidas)
+
+
+class MontadorPrompt:
+    """
+    Junta os fragmentos do prompt respeitando orçamentos de tokens por secção e no total.
+    """
+    def __init__(
+        self,
+        orcamento_total: int,
+        orcamentos_secao: Dict[str, int],
+        prioridades: Dict[str, int],
+        contar_tokens: Callable[[str], int] = estimar_tokens,
+        max_medicoes: int = 100,
+        secoes_obrigatorias: Iterable[str] = ()
+    ):
+        """
+        Inicializa o montador.
+
+        Args:
+            orcamento_total (int): O número máximo (estimado) de tokens do prompt.
+            orcamentos_secao (Dict[str, int]): O máximo de tokens de cada secção.
+            prioridades (Dict[str, int]): A prioridade de cada secção (0 é a mais importante).
+            contar_tokens (Callable[[str], int]): A função que estima os tokens de um texto.
+            max_medicoes (int): Quantas medições recentes guardar para as métricas.
+            secoes_obrigatorias (Iterable[str]): As secções que nunca são cortadas (ex: 'persona');
+                                                 são servidas antes das restantes.
+        """
+        self.orcamento_total = orcamento_total
+        self.orcamentos_secao = orcamentos_secao
+        self.prioridades = prioridades
+        self.secoes_obrigatorias = frozenset(secoes_obrigatorias)
+        self._contar = contar_tokens
+        self._medicoes: "deque[MedicaoPrompt]" = deque(maxlen=max_medicoes)
+        self._lock = threading.Lock()
+        self._total_prompts = 0
+        self._total_cortados = 0
+        self._tokens_max = 0
+
+    def montar(self, fragmentos: List[Tuple[str, str]]) -> str:
+        """
+        Monta o prompt a partir de pares (secção, texto), pela ordem indicada.
+
+        Args:
+            fragmentos (List[Tuple[str, str]]): Os fragmentos e a secção de cada um.
+
+        Returns:
+            str: O prompt final, dentro do orçamento.
+        """
+        fragmentos = [(secao, texto) for secao, texto in fragmentos if texto and texto.strip()]
+        secoes_por_prioridade = sorted(
+            {secao for secao, _ in fragmentos},
+            key=lambda secao: (
+                secao not in self.secoes_obrigatorias,
+                self.prioridades.get(secao, max(self.prioridades.values(), default=0) + 1),
+            )
+        )
+
+        restante_total = self.orcamento_total
+        finais: Dict[int, str] = {}
+        tokens_por_secao: Dict[str, int] = {}
+        cortadas = []
+        descartadas = []
+
+        for secao in secoes_por_prioridade:
+            posicoes = [i for i, (s, _) in enumerate(fragmentos) if s == secao]
+            if secao in self.secoes_obrigatorias:
+                # As secções obrigatórias entram sempre inteiras, mesmo acima do orçamento
+                usados_secao = 0
+                for posicao in posicoes:
+                    finais[posicao] = fragmentos[posicao][1]
+                    usados_secao += self._contar(fragmentos[posicao][1])
+                if usados_secao > min(self.orcamentos_secao.get(secao, restante_total), restante_total):
+                    print(f"⚠️ A secção obrigatória '{secao}' excede o orçamento do prompt ({usados_secao} tokens).")
+                tokens_por_secao[secao] = usados_secao
+                restante_total = max(0, restante_total - usados_secao)
+                continue
+
+            restante = min(self.orcamentos_secao.get(secao, restante_total), restante_total)
+            do_inicio = secao in SECOES_CORTADAS_DO_INICIO
+            usados_secao = 0
+            # No histórico, os fragmentos mais recentes (os últimos) têm prioridade
+            for posicao in (reversed(posicoes) if do_inicio else posicoes):
+                texto = fragmentos[posicao][1]
+                custo = self._contar(texto)
+                if custo > restante - usados_secao:
+                    texto = _cortar_fragmento(texto, restante - usados_secao, do_inicio, self._contar)
+                    custo = self._contar(texto) if texto else 0
+                    if secao not in cortadas:
+                        cortadas.append(secao)
+                if texto:
+                    finais[posicao] = texto
+                    usados_secao += custo
+            tokens_por_secao[secao] = usados_secao
+            restante_total -= usados_secao
+            if not usados_secao:
+                descartadas.append(secao)
+
+        prompt = "\n\n".join(finais[i] for i in sorted(finais))
+        self._registar(MedicaoPrompt(self._contar(prompt), tokens_por_secao, tuple(cortadas), tuple(descartadas)))
+        return prompt
+
+    def _registar(self, medicao: MedicaoPrompt):
+        with self._lock:
+            self._medicoes.append(medicao)
+            self._total_prompts += 1
+            self._tokens_max = max(self._tokens_max, medicao.tokens_total)
+            if medicao.secoes_cortadas:
+                self._total_cortados += 1
+        if medicao.secoes_cortadas:
+            print(f"✂️ Prompt cortado para {medicao.tokens_total} tokens (secções: {', '.join(medicao.secoes_cortadas)}).")
+        if medicao.secoes_descartadas:
+            print(f"🗑️ Secções descartadas do prompt por falta de orçamento: {', '.join(medicao.secoes_descartadas)}.")
+
+    @property
+    def ultima_medicao(self) -> Optional[MedicaoPrompt]:
+        with self._lock:
+            return self._medicoes[-1] if self._medicoes else None
+
+    def metricas(self) -> Dict[str, Any]:
+        """Devolve o número de prompts montados e os seus tamanhos, em tokens."""
+        with self._lock:
+            recentes = [m.tokens_total for m in self._medicoes]
+            ultima = self._medicoes[-1] if self._medicoes else None
+            return {
+                'prompts_montados': self._total_prompts,
+                'prompts_cortados': self._total_cortados,
+                'tokens_max': self._tokens_max,
+                'tokens_medios_recentes': round(sum(recentes) / len(recentes), 1) if recentes else 0,
+                'ultimo': ultima._asdict() if ultima else None,
+            }
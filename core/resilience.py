@@ -0,0 +1,324 @@
+"""
+Este módulo protege as chamadas aos serviços externos (OpenAI, SharePoint,
+Azure Boards) contra serviços lentos ou em falha.
+
+Cada serviço tem o seu ClienteResiliente, com:
+- um limite de chamadas em simultâneo (semáforo), para que um serviço lento
+  não acumule pedidos pendurados;
+- novas tentativas com espera exponencial e jitter, só para chamadas idempotentes;
+- um disjuntor (circuit breaker) que, depois de várias falhas seguidas (só erros
+  de servidor, timeouts e erros de ligação; um 404 ou um pedido inválido mostram
+  que o serviço está a responder), rejeita
+  as chamadas de imediato (CircuitoAberto) durante algum tempo, para que a
+  Sofia responda logo com a mensagem de fallback em vez de esperar;
+- métricas de chamadas, falhas, tentativas, rejeições e latência.
+
+O ServicoResiliente envolve uma instância de serviço existente sem alterar os
+handlers: os métodos assíncronos passam pelo caminho assíncrono e os
+síncronos (ex: SharePoint, Azure Boards) pelo caminho síncrono.
+"""
+
+import asyncio
+import functools
+import inspect
+import random
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Iterable, NamedTuple, Optional, Tuple
+
+
+class CircuitoAberto(Exception):
+    """A chamada foi rejeitada porque o disjuntor do serviço está aberto."""
+    def __init__(self, servico: str, reabre_em: float):
+        super().__init__(f"Serviço '{servico}' indisponível (disjuntor aberto durante mais {reabre_em:.0f}s).")
+        self.servico = servico
+
+
+def _status_http(erro: BaseException) -> Optional[int]:
+    """Devolve o status HTTP de um erro de cliente HTTP (requests, httpx, aiohttp, openai...), se houver."""
+    for alvo in (erro, getattr(erro, 'response', None)):
+        for atributo in ('status_code', 'status'):
+            valor = getattr(alvo, atributo, None)
+            if isinstance(valor, int):
+                return valor
+    return None
+
+
+def e_falha_do_servico(erro: BaseException) -> bool:
+    """
+    Indica se o erro mostra que o serviço está em falha (e deve contar para o disjuntor e ser repetido).
+
+    Só os timeouts, os erros de ligação e as respostas 5xx contam; os restantes
+    erros (4xx, dados inválidos...) vêm de um serviço que está a responder.
+    """
+    if isinstance(erro, (TimeoutError, asyncio.TimeoutError, ConnectionError)):
+        return True
+    if type(erro).__name__.endswith(('Timeout', 'TimeoutError', 'ConnectionError')):
+        return True
+    status = _status_http(erro)
+    return status is not None and status >= 500
+
+
+class PoliticaResiliencia(NamedTuple):
+    max_concorrencia: int = 8
+    tentativas: int = 3
+    espera_base: float = 0.2
+    espera_max: float = 2.0
+    limiar_falhas: int = 5
+    tempo_aberto: float = 30.0
+
+
+class Disjuntor:
+    """
+    Disjuntor com três estados: fechado (normal), aberto (rejeita tudo) e
+    meio-aberto (deixa passar uma chamada de teste depois do tempo_aberto).
+    """
+    def __init__(self, limiar_falhas: int, tempo_aberto: float):
+        self._limiar = limiar_falhas
+        self._tempo_aberto = tempo_aberto
+        self._falhas_seguidas = 0
+        self._aberto_desde: Optional[float] = None
+        self._teste_em_curso = False
+        self._lock = threading.Lock()
+        self.aberturas = 0
+
+    @property
+    def estado(self) -> str:
+        with self._lock:
+            if self._aberto_desde is None:
+                return "fechado"
+            if time.monotonic() - self._aberto_desde >= self._tempo_aberto:
+                return "meio-aberto"
+            return "aberto"
+
+    def avaliar(self) -> Tuple[float, bool]:
+        """
+        Decide se uma chamada pode avançar.
+
+        Returns:
+            Tuple[float, bool]: Os segundos até o disjuntor deixar testar de novo (0 se a
+            chamada pode avançar) e se a chamada ficou com o teste do estado meio-aberto.
+        """
+        with self._lock:
+            if self._aberto_desde is None:
+                return 0.0, False
+            restante = self._tempo_aberto - (time.monotonic() - self._aberto_desde)
+            if restante > 0 or self._teste_em_curso:
+                return max(restante, 0.001), False
+            self._teste_em_curso = True
+            return 0.0, True
+
+    def permitir(self) -> float:
+        """Devolve 0 se a chamada pode avançar, ou os segundos até o disjuntor deixar testar de novo."""
+        return self.avaliar()[0]
+
+    def registar_sucesso(self):
+        with self._lock:
+            self._falhas_seguidas = 0
+            self._aberto_desde = None
+            self._teste_em_curso = False
+
+    def libertar_teste(self):
+        """
+        Liberta a chamada de teste sem resultado (ex: cancelada), para que outra possa testar.
+
+        Só deve ser chamado pela chamada a quem o avaliar entregou o teste.
+        """
+        with self._lock:
+            self._teste_em_curso = False
+
+    def registar_falha(self):
+        with self._lock:
+            self._falhas_seguidas += 1
+            # Abre ao atingir o limiar, ou volta a abrir se a chamada de teste (meio-aberto) falhar
+            if self._teste_em_curso or (self._aberto_desde is None and self._falhas_seguidas >= self._limiar):
+                self.aberturas += 1
+                self._aberto_desde = time.monotonic()
+            self._teste_em_curso = False
+
+
+class ClienteResiliente:
+    """
+    Executa as chamadas a um serviço externo com limite de concorrência, novas tentativas e disjuntor.
+    """
+    def __init__(self, nome: str, politica: PoliticaResiliencia = PoliticaResiliencia(), max_latencias: int = 500):
+        """
+        Inicializa o cliente.
+
+        Args:
+            nome (str): O nome do serviço (usado nas métricas e nas mensagens de erro).
+            politica (PoliticaResiliencia): Os limites, tentativas e parâmetros do disjuntor.
+            max_latencias (int): Quantas latências recentes guardar para os percentis.
+        """
+        self.nome = nome
+        self.politica = politica
+        self.disjuntor = Disjuntor(politica.limiar_falhas, politica.tempo_aberto)
+        self._semaforo_async: Optional[asyncio.Semaphore] = None
+        self._semaforo_sync = threading.BoundedSemaphore(politica.max_concorrencia)
+        self._lock = threading.Lock()
+        self._latencias: "deque[float]" = deque(maxlen=max_latencias)
+        self.contadores = {'chamadas': 0, 'sucessos': 0, 'falhas': 0, 'erros': 0, 'novas_tentativas': 0, 'rejeitadas': 0}
+
+    def _contar(self, nome: str, valor: int = 1):
+        with self._lock:
+            self.contadores[nome] += valor
+
+    def _espera(self, tentativa: int) -> float:
+        """Espera exponencial com jitter completo antes da tentativa seguinte."""
+        return random.uniform(0, min(self.politica.espera_max, self.politica.espera_base * (2 ** tentativa)))
+
+    def _verificar_disjuntor(self) -> bool:
+        """Rejeita a chamada se o disjuntor estiver aberto; devolve True se a chamada ficou com o teste."""
+        restante, teste = self.disjuntor.avaliar()
+        if restante:
+            self._contar('rejeitadas')
+            raise CircuitoAberto(self.nome, restante)
+        return teste
+
+    def _registar(self, inicio: float, erro: Optional[Exception]) -> bool:
+        """
+        Regista o resultado de uma chamada.
+
+        Returns:
+            bool: True se o erro for uma falha do serviço (conta para o disjuntor e pode ser repetido).
+        """
+        falha = erro is not None and e_falha_do_servico(erro)
+        with self._lock:
+            self._latencias.append(time.perf_counter() - inicio)
+            self.contadores['falhas' if falha else 'erros' if erro is not None else 'sucessos'] += 1
+        if falha:
+            self.disjuntor.registar_falha()
+        else:
+            self.disjuntor.registar_sucesso()
+        return falha
+
+    async def chamar(self, funcao: Callable[..., Any], *args: Any, idempotente: bool = False, **kwargs: Any) -> Any:
+        """
+        Chama uma função assíncrona do serviço, aplicando a política de resiliência.
+
+        Args:
+            funcao (Callable): A função assíncrona a chamar.
+            idempotente (bool): Se True, a chamada é repetida em caso de falha do serviço.
+
+        Returns:
+            Any: O resultado da função.
+
+        Raises:
+            CircuitoAberto: Se o disjuntor do serviço estiver aberto.
+        """
+        if self._semaforo_async is None:
+            self._semaforo_async = asyncio.Semaphore(self.politica.max_concorrencia)
+        tentativas = self.politica.tentativas if idempotente else 1
+
+        for tentativa in range(tentativas):
+            async with self._semaforo_async:
+                # Verificado já com a vez garantida: o disjuntor pode ter aberto durante a espera
+                teste = self._verificar_disjuntor()
+                self._contar('chamadas')
+                inicio = time.perf_counter()
+                try:
+                    resultado = await funcao(*args, **kwargs)
+                except Exception as e:
+                    if not self._registar(inicio, e) or tentativa + 1 >= tentativas:
+                        raise
+                except BaseException:
+                    # Cancelada (ou interrompida): sem resultado, mas a chamada de teste tem de ser libertada.
+                    # Uma chamada que não ficou com o teste não o pode libertar, senão passariam dois testes
+                    if teste:
+                        self.disjuntor.libertar_teste()
+                    raise
+                else:
+                    self._registar(inicio, None)
+                    return resultado
+            self._contar('novas_tentativas')
+            await asyncio.sleep(self._espera(tentativa))
+
+    def chamar_sync(self, funcao: Callable[..., Any], *args: Any, idempotente: bool = False, **kwargs: Any) -> Any:
+        """Versão síncrona do chamar, para serviços com clientes bloqueantes."""
+        tentativas = self.politica.tentativas if idempotente else 1
+
+        for tentativa in range(tentativas):
+            with self._semaforo_sync:
+                # Verificado já com a vez garantida: o disjuntor pode ter aberto durante a espera
+                teste = self._verificar_disjuntor()
+                self._contar('chamadas')
+                inicio = time.perf_counter()
+                try:
+                    resultado = funcao(*args, **kwargs)
+                except Exception as e:
+                    if not self._registar(inicio, e) or tentativa + 1 >= tentativas:
+                        raise
+                except BaseException:
+                    if teste:
+                        self.disjuntor.libertar_teste()
+                    raise
+                else:
+                    self._registar(inicio, None)
+                    return resultado
+            self._contar('novas_tentativas')
+            time.sleep(self._espera(tentativa))
+
+    def metricas(self) -> Dict[str, Any]:
+        """Devolve os contadores, o estado do disjuntor e os percentis de latência (ms)."""
+        with self._lock:
+            latencias = sorted(self._latencias)
+            contadores = dict(self.contadores)
+
+        def _percentil(p: float) -> float:
+            if not latencias:
+                return 0.0
+            return round(latencias[min(len(latencias) - 1, int(p * len(latencias)))] * 1000, 1)
+
+        return {
+            **contadores,
+            'disjuntor': self.disjuntor.estado,
+            'aberturas_disjuntor': self.disjuntor.aberturas,
+            'latencia_p50_ms': _percentil(0.5),
+            'latencia_p95_ms': _percentil(0.95),
+            'latencia_p99_ms': _percentil(0.99),
+        }
+
+
+class ServicoResiliente:
+    """
+    Envolve uma instância de serviço, fazendo passar todos os seus métodos pelo ClienteResiliente.
+    """
+    def __init__(self, servico: Any, cliente: ClienteResiliente, metodos_idempotentes: Iterable[str] = ()):
+        """
+        Args:
+            servico (Any): A instância original do serviço.
+            cliente (ClienteResiliente): O cliente (partilhado por todas as instâncias do mesmo serviço).
+            metodos_idempotentes (Iterable[str]): Os métodos que podem ser repetidos em caso de falha.
+        """
+        self._servico = servico
+        self._cliente = cliente
+        self._idempotentes = frozenset(metodos_idempotentes)
+
+    def __getattr__(self, nome: str) -> Any:
+        atributo = getattr(self._servico, nome)
+        if not callable(atributo) or nome.startswith('_'):
+            return atributo
+
+        idempotente = nome in self._idempotentes
+        if inspect.iscoroutinefunction(atributo):
+            @functools.wraps(atributo)
+            async def _chamar_async(*args, **kwargs):
+                return await self._cliente.chamar(atributo, *args, idempotente=idempotente, **kwargs)
+            return _chamar_async
+
+        @functools.wraps(atributo)
+        def _chamar_sync(*args, **kwargs):
+            return self._cliente.chamar_sync(atributo, *args, idempotente=idempotente, **kwargs)
+        return _chamar_sync
+
+
+def fabrica_resiliente(classe_servico: Callable[..., Any], cliente: ClienteResiliente, metodos_idempotentes: Iterable[str] = ()) -> Callable[..., ServicoResiliente]:
+    """
+    Devolve uma fábrica que cria instâncias do serviço já envolvidas pelo ServicoResiliente.
+
+    Útil para serviços instanciados por pedido (ex: AzureBoardsService(projeto)).
+    """
+    def _criar(*args, **kwargs) -> ServicoResiliente:
+        return ServicoResiliente(classe_servico(*args, **kwargs), cliente, metodos_idempotentes)
+    return _criar
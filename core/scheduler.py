@@ -0,0 +1,140 @@
+"""
+Este módulo implementa o escalonador por faixas (lanes) usado pelo SofiaBrain.
+
+Cada mensagem, depois de detetada a intenção, entra numa faixa:
+- a faixa rápida (saudações, comandos de administração, pesquisas já em
+  cache...) não tem limite, para que um "oi" nunca fique à espera;
+- as faixas pesadas (boards, perguntas gerais à OpenAI, SharePoint) têm um
+  limite de mensagens em simultâneo, para não se atropelarem umas às outras.
+
+Quando uma faixa está cheia, as mensagens em espera são atendidas por rodízio
+entre usuários: um usuário com muitas mensagens em fila não atrasa os outros
+mais do que uma mensagem de cada vez. O tempo de espera em cada faixa é
+registado nas métricas.
+"""
+
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Deque, Dict
+
+FAIXA_RAPIDA = "rapida"
+
+
+class _Faixa:
+    """Estado de uma faixa: vagas ocupadas, filas por usuário e tempos de espera."""
+    def __init__(self, limite: int, max_esperas: int):
+        self.limite = limite
+        self.ativos = 0
+        self.filas: Dict[str, Deque[asyncio.Future]] = {}
+        self.rodizio: Deque[str] = deque()
+        self.esperas: Deque[float] = deque(maxlen=max_esperas)
+        self.atendidas = 0
+        self.espera_total = 0.0
+
+    @property
+    def em_espera(self) -> int:
+        return sum(sum(not f.done() for f in fila) for fila in self.filas.values())
+
+    def tem_vaga(self) -> bool:
+        return not self.limite or (self.ativos < self.limite and not self.rodizio)
+
+    def libertar(self):
+        """Liberta uma vaga e entrega-a ao próximo usuário do rodízio."""
+        self.ativos -= 1
+        while self.rodizio:
+            user_id = self.rodizio.popleft()
+            fila = self.filas[user_id]
+            futuro = fila.popleft()
+            if fila:
+                self.rodizio.append(user_id)
+            else:
+                del self.filas[user_id]
+            # Mensagens canceladas enquanto esperavam são ignoradas
+            if not futuro.done():
+                self.ativos += 1
+                futuro.set_result(None)
+                return
+
+
+class EscalonadorFaixas:
+    """
+    Limita a concorrência de cada faixa e reparte as vagas de forma justa entre usuários.
+    """
+    def __init__(self, limites: Dict[str, int], max_esperas: int = 1000):
+        """
+        Inicializa o escalonador.
+
+        Args:
+            limites (Dict[str, int]): O número máximo de mensagens em simultâneo de
+                                      cada faixa (0 = sem limite).
+            max_esperas (int): Quantos tempos de espera recentes guardar por faixa, para os percentis.
+        """
+        self._max_esperas = max_esperas
+        self.faixas = {nome: _Faixa(limite, max_esperas) for nome, limite in limites.items()}
+        self.faixas.setdefault(FAIXA_RAPIDA, _Faixa(0, max_esperas))
+
+    def _faixa(self, nome: str) -> _Faixa:
+        if nome not in self.faixas:
+            self.faixas[nome] = _Faixa(0, self._max_esperas)
+        return self.faixas[nome]
+
+    @asynccontextmanager
+    async def vez(self, nome_faixa: str, user_id: str) -> AsyncIterator[None]:
+        """
+        Espera pela vez da mensagem na faixa e ocupa uma vaga enquanto ela é processada.
+
+        Args:
+            nome_faixa (str): A faixa da mensagem (ex: 'rapida', 'boards').
+            user_id (str): O usuário, para o rodízio justo entre usuários.
+        """
+        faixa = self._faixa(nome_faixa)
+        inicio = time.perf_counter()
+        if faixa.tem_vaga():
+            faixa.ativos += 1
+        else:
+            futuro = asyncio.get_running_loop().create_future()
+            if user_id not in faixa.filas:
+                faixa.filas[user_id] = deque()
+                faixa.rodizio.append(user_id)
+            faixa.filas[user_id].append(futuro)
+            try:
+                await futuro
+            except asyncio.CancelledError:
+                # Cancelada depois de receber a vaga: passa-a ao seguinte
+                if futuro.done() and not futuro.cancelled():
+                    faixa.libertar()
+                raise
+
+        espera = time.perf_counter() - inicio
+        faixa.esperas.append(espera)
+        faixa.espera_total += espera
+        faixa.atendidas += 1
+        try:
+            yield
+        finally:
+            faixa.libertar()
+
+    def metricas(self) -> Dict[str, Dict[str, Any]]:
+        """Devolve, por faixa, o limite, as vagas ocupadas, a fila e os tempos de espera (ms)."""
+        resultado = {}
+        for nome, faixa in self.faixas.items():
+            esperas = sorted(faixa.esperas)
+
+            def _percentil(p: float) -> float:
+                if not esperas:
+                    return 0.0
+                return round(esperas[min(len(esperas) - 1, int(p * len(esperas)))] * 1000, 1)
+
+            resultado[nome] = {
+                'limite': faixa.limite,
+                'ativas': faixa.ativos,
+                'em_espera': faixa.em_espera,
+                'atendidas': faixa.atendidas,
+                'espera_media_ms': round(faixa.espera_total / faixa.atendidas * 1000, 1) if faixa.atendidas else 0.0,
+                'espera_p50_ms': _percentil(0.5),
+                'espera_p95_ms': _percentil(0.95),
+                'espera_max_ms': round(esperas[-1] * 1000, 1) if esperas else 0.0,
+            }
+        return resultado
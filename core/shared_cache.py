@@ -0,0 +1,94 @@
+"""
+Este módulo implementa o nível partilhado do cache, guardado em SQLite.
+
+No modo multi-processo, cada worker tem o seu CacheManager em memória, mas
+todos partilham este nível: quando um worker busca um board no Azure Boards
+(ou uma pesquisa no SharePoint), o valor é serializado com pickle e gravado
+aqui, e os outros workers reutilizam-no em vez de o buscar de novo.
+
+O ficheiro usa WAL, para que as leituras dos vários processos não bloqueiem
+enquanto um deles escreve.
+"""
+
+import pickle
+import sqlite3
+import threading
+import time
+from typing import Any, Optional, Tuple
+
+
+class CacheCompartilhado:
+    """
+    Cache chave -> valor com expiração, partilhado entre processos através de um ficheiro SQLite.
+    """
+    def __init__(self, caminho_db: str):
+        """
+        Abre (ou cria) o ficheiro do cache partilhado.
+
+        Args:
+            caminho_db (str): O caminho do ficheiro SQLite (ex: 'shared_cache.db').
+        """
+        self.caminho_db = caminho_db
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(caminho_db, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            " chave TEXT PRIMARY KEY,"
+            " valor BLOB NOT NULL,"
+            " expira_em REAL NOT NULL)"
+        )
+        self._conn.commit()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, chave: str) -> Optional[Tuple[Any, float]]:
+        """
+        Devolve o valor e o instante de expiração (epoch), se a chave existir e não tiver expirado.
+        """
+        with self._lock:
+            linha = self._conn.execute(
+                "SELECT valor, expira_em FROM cache WHERE chave = ? AND expira_em > ?", (chave, time.time())
+            ).fetchone()
+            if linha is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return pickle.loads(linha[0]), linha[1]
+
+    def set(self, chave: str, valor: Any, duracao_segundos: float):
+        """
+        Grava o valor para todos os processos.
+
+        Valores que não podem ser serializados (ex: com ligações abertas) ficam
+        só no cache local do processo.
+        """
+        try:
+            dados = pickle.dumps(valor, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception as e:
+            print(f"⚠️ [Cache partilhado] '{chave}' não pode ser partilhado: {e}")
+            return
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (chave, valor, expira_em) VALUES (?, ?, ?)",
+                (chave, sqlite3.Binary(dados), time.time() + duracao_segundos)
+            )
+            self._conn.commit()
+
+    def remover_expirados(self) -> int:
+        """Apaga as entradas expiradas e devolve quantas foram removidas."""
+        with self._lock:
+            removidas = self._conn.execute("DELETE FROM cache WHERE expira_em <= ?", (time.time(),)).rowcount
+            self._conn.commit()
+        return removidas
+
+    def limpar(self):
+        """Apaga todas as entradas, para todos os processos."""
+        with self._lock:
+            self._conn.execute("DELETE FROM cache")
+            self._conn.commit()
+
+    def fechar(self):
+        with self._lock:
+            self._conn.close()
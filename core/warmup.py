@@ -0,0 +1,100 @@
+"""
+Este módulo executa o aquecimento (warmup) dos dados caros de obter antes de
+a Sofia começar a receber tráfego.
+
+As tarefas de aquecimento correm em paralelo, limitadas por um semáforo, e o
+tempo de cada uma é registado. O EstadoAquecimento indica se a instância já
+está pronta, para que um load balancer só lhe envie pedidos depois do warmup.
+A instância só fica pronta quando pelo menos uma tarefa é bem-sucedida: se
+todas falharem, o readiness continua a recusar tráfego e mostra os erros.
+"""
+
+import asyncio
+import time
+from datetime import datetime
+from typing import Dict, Any, Awaitable, Callable, Optional
+
+
+# Chave do cache partilhado onde o worker que aquece publica o seu estado, para os restantes workers
+CHAVE_ESTADO_PARTILHADO = "aquecimento_estado"
+
+
+class EstadoAquecimento:
+    """
+    Guarda o progresso do aquecimento e a prontidão da instância.
+    """
+    def __init__(self):
+        self.pronto = False
+        self.em_execucao = False
+        self.tempos: Dict[str, float] = {}
+        self.erros: Dict[str, str] = {}
+        self.iniciado_em: Optional[datetime] = None
+        self.concluido_em: Optional[datetime] = None
+
+    def resumo(self) -> Dict[str, Any]:
+        """Devolve o estado atual num formato serializável (ex: para o endpoint de readiness)."""
+        return {
+            'pronto': self.pronto,
+            'em_execucao': self.em_execucao,
+            'tempos_segundos': {k: round(v, 3) for k, v in self.tempos.items()},
+            'erros': dict(self.erros),
+            'iniciado_em': self.iniciado_em.isoformat() if self.iniciado_em else None,
+            'concluido_em': self.concluido_em.isoformat() if self.concluido_em else None,
+        }
+
+    def copiar_resumo(self, resumo: Dict[str, Any]):
+        """Adota o estado de outra instância (ex: o worker que aquece, lido do cache partilhado)."""
+        self.pronto = resumo.get('pronto', False)
+        self.em_execucao = resumo.get('em_execucao', False)
+        self.tempos = dict(resumo.get('tempos_segundos', {}))
+        self.erros = dict(resumo.get('erros', {}))
+        self.iniciado_em = datetime.fromisoformat(resumo['iniciado_em']) if resumo.get('iniciado_em') else None
+        self.concluido_em = datetime.fromisoformat(resumo['concluido_em']) if resumo.get('concluido_em') else None
+
+
+async def executar_aquecimento(
+    tarefas: Dict[str, Callable[[], Awaitable[Any]]],
+    max_concorrencia: int,
+    estado: EstadoAquecimento
+) -> EstadoAquecimento:
+    """
+    Executa as tarefas de aquecimento em paralelo, respeitando um limite de concorrência.
+
+    Args:
+        tarefas (Dict[str, Callable]): Mapa nome -> função assíncrona sem argumentos.
+        max_concorrencia (int): O número máximo de tarefas a correr em simultâneo.
+        estado (EstadoAquecimento): O objeto onde os tempos e a prontidão são registados.
+
+    Returns:
+        EstadoAquecimento: O mesmo objeto de estado, atualizado.
+    """
+    semaforo = asyncio.Semaphore(max(1, max_concorrencia))
+    estado.em_execucao = True
+    estado.iniciado_em = datetime.now()
+
+    async def _executar(nome: str, tarefa: Callable[[], Awaitable[Any]]):
+        async with semaforo:
+            inicio = time.perf_counter()
+            try:
+                resultado = await tarefa()
+                if resultado is None:
+                    estado.erros[nome] = "sem dados"
+                else:
+                    estado.erros.pop(nome, None)
+            except Exception as e:
+                estado.erros[nome] = f"{type(e).__name__}: {e}"
+            finally:
+                estado.tempos[nome] = time.perf_counter() - inicio
+                print(f"🔥 [Warmup] '{nome}' aquecido em {estado.tempos[nome]:.2f}s.")
+
+    await asyncio.gather(*(_executar(nome, tarefa) for nome, tarefa in tarefas.items()))
+
+    estado.em_execucao = False
+    estado.concluido_em = datetime.now()
+    if not tarefas or len(estado.erros) < len(tarefas):
+        estado.pronto = True
+    if estado.erros:
+        print(f"⚠️ [Warmup] Concluído com falhas: {estado.erros}")
+    else:
+        print(f"✅ [Warmup] {len(tarefas)} tarefa(s) aquecida(s).")
+    return estado
@@ -0,0 +1,166 @@
+"""
+Este módulo implementa o modo multi-processo do servidor da Sofia.
+
+Um processo frontal aceita as ligações HTTP e encaminha cada pedido para um
+de N workers, cada um com a sua SofiaBrain num processo próprio (e, portanto,
+num núcleo próprio). As mensagens são encaminhadas pelo hash do user_id, de
+modo que o estado da conversa de cada usuário (modo boards, aprendizado,
+último colaborador...) fica sempre no mesmo worker.
+
+Também contém o HTTP/1.1 mínimo (só biblioteca padrão) usado pela frente e
+pelos workers.
+"""
+
+import asyncio
+import json
+import multiprocessing
+import zlib
+from typing import Any, Callable, Dict, List, Tuple
+
+MOTIVOS_HTTP = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 502: 'Bad Gateway', 503: 'Service Unavailable'}
+
+
+async def ler_pedido(reader: asyncio.StreamReader) -> Tuple[str, str, bytes]:
+    """Lê a linha de pedido, os cabeçalhos e o corpo de um pedido HTTP/1.1."""
+    linha_pedido = (await reader.readline()).decode('latin-1').strip()
+    metodo, caminho, _ = (linha_pedido.split(' ', 2) + ['', ''])[:3]
+
+    cabecalhos: Dict[str, str] = {}
+    while True:
+        linha = (await reader.readline()).decode('latin-1').strip()
+        if not linha:
+            break
+        nome, _, valor = linha.partition(':')
+        cabecalhos[nome.strip().lower()] = valor.strip()
+
+    tamanho = int(cabecalhos.get('content-length', 0) or 0)
+    corpo = await reader.readexactly(tamanho) if tamanho else b''
+    return metodo.upper(), caminho, corpo
+
+
+def resposta_http(status: int, dados: Dict[str, Any]) -> bytes:
+    """Serializa uma resposta JSON em HTTP/1.1."""
+    corpo = json.dumps(dados, ensure_ascii=False).encode('utf-8')
+    cabecalho = (
+        f"HTTP/1.1 {status} {MOTIVOS_HTTP.get(status, 'OK')}\r\n"
+        f"Content-Type: application/json; charset=utf-8\r\n"
+        f"Content-Length: {len(corpo)}\r\n"
+        f"Connection: close\r\n\r\n"
+    )
+    return cabecalho.encode('latin-1') + corpo
+
+
+def escolher_worker(user_id: str, total_workers: int) -> int:
+    """
+    Escolhe o worker de um usuário.
+
+    Usa o CRC32 (e não o hash() do Python, que muda a cada processo), para que
+    o mesmo usuário vá sempre para o mesmo worker.
+    """
+    return zlib.crc32(user_id.encode('utf-8')) % total_workers
+
+
+def iniciar_workers(alvo: Callable[..., Any], total: int, porta_base: int, *args: Any) -> List[multiprocessing.Process]:
+    """
+    Arranca os processos dos workers.
+
+    Args:
+        alvo (Callable): A função de cada worker, chamada como alvo(indice, porta, *args).
+                         Tem de ser uma função de módulo (os processos usam 'spawn').
+        total (int): O número de workers.
+        porta_base (int): A porta do primeiro worker; o worker i ouve em porta_base + i.
+
+    Returns:
+        List[multiprocessing.Process]: Os processos arrancados.
+    """
+    contexto = multiprocessing.get_context('spawn')
+    processos = []
+    for indice in range(total):
+        processo = contexto.Process(target=alvo, args=(indice, porta_base + indice, *args), name=f"sofia-worker-{indice}", daemon=True)
+        processo.start()
+        processos.append(processo)
+    return processos
+
+
+class FrenteWorkers:
+    """
+    Processo frontal: recebe os pedidos HTTP e encaminha-os para os workers.
+    """
+    def __init__(self, portas_workers: List[int], host_workers: str = '127.0.0.1', timeout_segundos: float = 120.0):
+        """
+        Args:
+            portas_workers (List[int]): As portas internas dos workers, pela ordem dos índices.
+            host_workers (str): O endereço onde os workers ouvem.
+            timeout_segundos (float): O tempo máximo de resposta de um worker.
+        """
+        self.portas = portas_workers
+        self.host_workers = host_workers
+        self.timeout = timeout_segundos
+        self.encaminhados = [0] * len(portas_workers)
+
+    async def _encaminhar(self, indice: int, metodo: str, caminho: str, corpo: bytes) -> bytes:
+        """Reenvia o pedido a um worker e devolve a resposta HTTP completa."""
+        reader, writer = await asyncio.open_connection(self.host_workers, self.portas[indice])
+        try:
+            writer.write(
+                f"{metodo} {caminho} HTTP/1.1\r\nContent-Length: {len(corpo)}\r\nConnection: close\r\n\r\n".encode('latin-1') + corpo
+            )
+            await writer.drain()
+            return await asyncio.wait_for(reader.read(), self.timeout)
+        finally:
+            writer.close()
+
+    async def _json_worker(self, indice: int, caminho: str) -> Tuple[int, Dict[str, Any]]:
+        """Faz um GET a um worker e devolve o status e o JSON da resposta."""
+        try:
+            bruto = await self._encaminhar(indice, 'GET', caminho, b'')
+            cabecalho, _, corpo = bruto.partition(b'\r\n\r\n')
+            return int(cabecalho.split(b' ', 2)[1]), json.loads(corpo or b'{}')
+        except Exception as e:
+            return 502, {'erro': f"Worker {indice} indisponível: {e}"}
+
+    async def tratar(self, metodo: str, caminho: str, corpo: bytes) -> bytes:
+        """Responde às rotas agregadas e encaminha as mensagens para o worker do usuário."""
+        if metodo == 'GET' and caminho == '/health/live':
+            return resposta_http(200, {'vivo': True, 'workers': len(self.portas)})
+
+        if metodo == 'GET' and caminho in ('/health/ready', '/metrics'):
+            respostas = await asyncio.gather(*(self._json_worker(i, caminho) for i in range(len(self.portas))))
+            dados: Dict[str, Any] = {'workers': [r[1] for r in respostas]}
+            if caminho == '/metrics':
+                dados['encaminhados'] = list(self.encaminhados)
+                return resposta_http(200, dados)
+            dados['pronto'] = all(status == 200 for status, _ in respostas)
+            return resposta_http(200 if dados['pronto'] else 503, dados)
+
+        if metodo == 'POST' and caminho == '/mensagem':
+            try:
+                user_id = str(json.loads(corpo or b'{}')['user_id'])
+            except (ValueError, KeyError) as e:
+                return resposta_http(400, {'erro': f"Pedido inválido: {e}"})
+            indice = escolher_worker(user_id, len(self.portas))
+            self.encaminhados[indice] += 1
+            try:
+                return await self._encaminhar(indice, metodo, caminho, corpo)
+            except Exception as e:
+                print(f"❌ Erro ao encaminhar para o worker {indice}: {e}")
+                return resposta_http(502, {'erro': f"Worker {indice} indisponível."})
+
+        return resposta_http(404, {'erro': f"Rota não encontrada: {metodo} {caminho}"})
+
+    async def servir(self, host: str, port: int):
+        """Aceita ligações na porta pública até o processo terminar."""
+        async def _ligacao(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+            try:
+                metodo, caminho, corpo = await ler_pedido(reader)
+                writer.write(await self.tratar(metodo, caminho, corpo))
+                await writer.drain()
+            except Exception as e:
+                print(f"❌ Erro ao tratar pedido HTTP na frente: {e}")
+            finally:
+                writer.close()
+
+        servidor = await asyncio.start_server(_ligacao, host, port)
+        print(f"🌐 Frente da Sofia a ouvir em http://{host}:{port} ({len(self.portas)} workers)")
+        async with servidor:
+            await servidor.serve_forever()
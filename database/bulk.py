@@ -0,0 +1,265 @@
+"""
+Este módulo importa e exporta o conhecimento da Sofia em massa (CSV ou JSONL).
+
+Cada ficheiro corresponde a uma tabela. As linhas são gravadas em lotes
+(bulk_insert_mappings / bulk_update_mappings / executemany), numa única
+transação por ficheiro. A importação é idempotente: as linhas cujo nome já
+existe são atualizadas em vez de duplicadas, e as participações repetidas
+são ignoradas.
+
+Cada importação incrementa, na mesma transação, a versão das tabelas tocadas
+(tabela versoes_tabelas). Os processos da Sofia em execução releem essas
+versões periodicamente e descartam os fragmentos do prompt, as respostas em
+cache e o índice das respostas aprendidas afetados, sem precisarem de ser
+reiniciados.
+
+Uso:
+    python -m database.bulk importar funcionarios rh_funcionarios.csv
+    python -m database.bulk importar participacoes participacoes.jsonl
+    python -m database.bulk exportar projetos projetos.csv
+"""
+
+import argparse
+import csv
+import json
+import os
+import time
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from . import models
+from .fragment_cache import incrementar_versao
+from .session import criar_engine
+
+DATABASE_URL = "sqlite:///./sofia.db"
+TAMANHO_LOTE = 1000
+
+
+class TabelaImportavel(NamedTuple):
+    modelo: Any
+    chave: str
+    colunas: Tuple[str, ...]
+
+
+# Tabelas importáveis: a coluna usada como chave do upsert e as restantes colunas do ficheiro
+TABELAS = {
+    'setores': TabelaImportavel(models.Setor, 'nome', ('nome', 'descricao')),
+    'funcionarios': TabelaImportavel(models.Funcionario, 'nome', ('nome', 'cargo', 'setor')),
+    'gerentes': TabelaImportavel(models.Gerente, 'nome', ('nome', 'area')),
+    'projetos': TabelaImportavel(models.Projeto, 'nome', ('nome', 'descricao', 'status')),
+    'conhecimentos': TabelaImportavel(models.ConhecimentoManual, 'pergunta', ('pergunta', 'resposta')),
+    'cerimonias': TabelaImportavel(models.Cerimonia, 'nome', ('nome', 'descricao')),
+}
+COLUNAS_PARTICIPACOES = ('funcionario', 'projeto')
+
+# Tabelas cujos índices (usados pelas consultas dos fragmentos) são garantidos antes de cada importação
+TABELAS_COM_INDICES = (models.Projeto.__table__, models.participacao_projeto_tabela)
+
+
+def criar_indices(engine: Engine):
+    """Cria os índices em falta (também em bases de dados criadas antes de eles existirem)."""
+    for tabela in TABELAS_COM_INDICES:
+        for indice in tabela.indexes:
+            indice.create(bind=engine, checkfirst=True)
+
+
+def _lotes(linhas: List[Dict[str, Any]], tamanho: int = TAMANHO_LOTE) -> Iterator[List[Dict[str, Any]]]:
+    for inicio in range(0, len(linhas), tamanho):
+        yield linhas[inicio:inicio + tamanho]
+
+
+def ler_ficheiro(caminho: str) -> List[Dict[str, Any]]:
+    """Lê as linhas de um ficheiro CSV (com cabeçalho) ou JSONL (um objeto por linha)."""
+    with open(caminho, encoding='utf-8', newline='') as ficheiro:
+        if caminho.lower().endswith('.jsonl'):
+            return [json.loads(linha) for linha in ficheiro if linha.strip()]
+        return list(csv.DictReader(ficheiro))
+
+
+def escrever_ficheiro(caminho: str, colunas: Tuple[str, ...], linhas: Iterable[Dict[str, Any]]) -> int:
+    """Escreve as linhas em CSV ou JSONL, consoante a extensão do ficheiro. Devolve o número de linhas."""
+    total = 0
+    with open(caminho, 'w', encoding='utf-8', newline='') as ficheiro:
+        if caminho.lower().endswith('.jsonl'):
+            for linha in linhas:
+                ficheiro.write(json.dumps(linha, ensure_ascii=False) + "\n")
+                total += 1
+        else:
+            escritor = csv.DictWriter(ficheiro, fieldnames=colunas)
+            escritor.writeheader()
+            for linha in linhas:
+                escritor.writerow(linha)
+                total += 1
+    return total
+
+
+def _limpar(valor: Any) -> Optional[str]:
+    """Converte células vazias em None e tira os espaços à volta dos textos."""
+    if valor is None:
+        return None
+    valor = str(valor).strip()
+    return valor or None
+
+
+def _ids_por_chave(db: Session, modelo: Any, chave: str) -> Dict[str, int]:
+    """Devolve o mapa chave -> id de uma tabela, numa só consulta."""
+    coluna = getattr(modelo, chave)
+    return {valor: id_ for id_, valor in db.execute(select(modelo.id, coluna))}
+
+
+def importar_tabela(db: Session, tabela: str, linhas: List[Dict[str, Any]]) -> Dict[str, int]:
+    """
+    Insere ou atualiza as linhas de uma tabela, em lotes.
+
+    Args:
+        db (Session): A sessão da base de dados (a transação é gerida por quem chama).
+        tabela (str): O nome da tabela (uma chave de TABELAS).
+        linhas (List[Dict[str, Any]]): As linhas lidas do ficheiro.
+
+    Returns:
+        Dict[str, int]: O número de linhas inseridas, atualizadas e ignoradas.
+    """
+    definicao = TABELAS[tabela]
+    existentes = _ids_por_chave(db, definicao.modelo, definicao.chave)
+    setores = _ids_por_chave(db, models.Setor, 'nome') if 'setor' in definicao.colunas else {}
+
+    novas: Dict[str, Dict[str, Any]] = {}
+    atualizadas: Dict[int, Dict[str, Any]] = {}
+    ignoradas = 0
+    for linha in linhas:
+        registo = {coluna: _limpar(linha.get(coluna)) for coluna in definicao.colunas}
+        chave = registo[definicao.chave]
+        if not chave:
+            ignoradas += 1
+            continue
+        if 'setor' in registo:
+            registo['setor_id'] = setores.get(registo.pop('setor'))
+
+        # Colunas ausentes no ficheiro não apagam os valores já guardados
+        registo = {coluna: valor for coluna, valor in registo.items() if valor is not None}
+        if chave in existentes:
+            atualizadas[existentes[chave]] = {'id': existentes[chave], **registo}
+        else:
+            novas[chave] = {**novas.get(chave, {}), **registo}
+
+    for lote in _lotes(list(novas.values())):
+        db.bulk_insert_mappings(definicao.modelo, lote)
+    for lote in _lotes(list(atualizadas.values())):
+        db.bulk_update_mappings(definicao.modelo, lote)
+
+    return {'inseridas': len(novas), 'atualizadas': len(atualizadas), 'ignoradas': ignoradas}
+
+
+def importar_participacoes(db: Session, linhas: List[Dict[str, Any]]) -> Dict[str, int]:
+    """
+    Regista participações (funcionário, projeto) pelo nome, ignorando as que já existem.
+
+    Returns:
+        Dict[str, int]: O número de participações inseridas e de linhas com nomes desconhecidos.
+    """
+    funcionarios = _ids_por_chave(db, models.Funcionario, 'nome')
+    projetos = _ids_por_chave(db, models.Projeto, 'nome')
+
+    pares = set()
+    desconhecidas = 0
+    for linha in linhas:
+        funcionario_id = funcionarios.get(_limpar(linha.get('funcionario')))
+        projeto_id = projetos.get(_limpar(linha.get('projeto')))
+        if funcionario_id is None or projeto_id is None:
+            desconhecidas += 1
+            continue
+        pares.add((funcionario_id, projeto_id))
+
+    tabela = models.participacao_projeto_tabela
+    inseridas = 0
+    instrucao = sqlite_insert(tabela).on_conflict_do_nothing()
+    for lote in _lotes([{'funcionario_id': f, 'projeto_id': p} for f, p in sorted(pares)]):
+        inseridas += db.execute(instrucao, lote).rowcount
+    return {'inseridas': max(inseridas, 0), 'atualizadas': 0, 'ignoradas': desconhecidas}
+
+
+def importar_ficheiro(engine: Engine, tabela: str, caminho: str) -> Dict[str, Any]:
+    """
+    Importa um ficheiro CSV/JSONL para uma tabela, numa única transação.
+
+    Args:
+        engine (Engine): O engine da base de dados.
+        tabela (str): O nome da tabela (uma chave de TABELAS ou 'participacoes').
+        caminho (str): O caminho do ficheiro.
+
+    Returns:
+        Dict[str, Any]: As contagens da importação e a duração, em segundos.
+    """
+    inicio = time.perf_counter()
+    linhas = ler_ficheiro(caminho)
+    criar_indices(engine)
+
+    with sessionmaker(bind=engine)() as db, db.begin():
+        if tabela == 'participacoes':
+            resultado = importar_participacoes(db, linhas)
+            tocadas = (models.participacao_projeto_tabela.name,)
+        else:
+            resultado = importar_tabela(db, tabela, linhas)
+            tocadas = (TABELAS[tabela].modelo.__tablename__,)
+        # As escritas em massa não passam pelo flush da sessão: a versão é gravada na mesma
+        # transação, e os processos da Sofia em execução veem-na no próximo intervalo de leitura
+        incrementar_versao(*tocadas, conexao=db.connection())
+    resultado['segundos'] = round(time.perf_counter() - inicio, 3)
+    return resultado
+
+
+def exportar_ficheiro(engine: Engine, tabela: str, caminho: str) -> int:
+    """
+    Exporta uma tabela para CSV/JSONL, no mesmo formato aceite pela importação.
+
+    Returns:
+        int: O número de linhas exportadas.
+    """
+    with sessionmaker(bind=engine)() as db:
+        if tabela == 'participacoes':
+            funcionarios = {id_: nome for nome, id_ in _ids_por_chave(db, models.Funcionario, 'nome').items()}
+            projetos = {id_: nome for nome, id_ in _ids_por_chave(db, models.Projeto, 'nome').items()}
+            tabela_assoc = models.participacao_projeto_tabela
+            linhas = (
+                {'funcionario': funcionarios.get(f), 'projeto': projetos.get(p)}
+                for f, p in db.execute(select(tabela_assoc.c.funcionario_id, tabela_assoc.c.projeto_id))
+            )
+            return escrever_ficheiro(caminho, COLUNAS_PARTICIPACOES, linhas)
+
+        definicao = TABELAS[tabela]
+        modelo = definicao.modelo
+        colunas_bd = [c for c in definicao.colunas if c != 'setor']
+        consulta = select(*(getattr(modelo, c) for c in colunas_bd))
+        if 'setor' in definicao.colunas:
+            consulta = select(*(getattr(modelo, c) for c in colunas_bd), models.Setor.nome).outerjoin(models.Setor)
+        consulta = consulta.order_by(modelo.id)
+        linhas = (dict(zip(definicao.colunas, valores)) for valores in db.execute(consulta))
+        return escrever_ficheiro(caminho, definicao.colunas, linhas)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Importação/exportação em massa do conhecimento da Sofia.")
+    parser.add_argument("acao", choices=["importar", "exportar"])
+    parser.add_argument("tabela", choices=sorted(TABELAS) + ["participacoes"])
+    parser.add_argument("ficheiro", help="Ficheiro .csv ou .jsonl")
+    parser.add_argument("--db", default=DATABASE_URL, help="URL da base de dados.")
+    args = parser.parse_args()
+
+    engine = criar_engine(args.db)
+    models.Base.metadata.create_all(bind=engine)
+    if args.acao == "importar":
+        if not os.path.exists(args.ficheiro):
+            parser.error(f"Ficheiro não encontrado: {args.ficheiro}")
+        resultado = importar_ficheiro(engine, args.tabela, args.ficheiro)
+        print(
+            f"✅ {args.tabela}: {resultado['inseridas']} inserida(s), {resultado['atualizadas']} atualizada(s), "
+            f"{resultado['ignoradas']} ignorada(s) em {resultado['segundos']}s."
+        )
+    else:
+        total = exportar_ficheiro(engine, args.tabela, args.ficheiro)
+        print(f"✅ {args.tabela}: {total} linha(s) exportada(s) para {args.ficheiro}.")
+    engine.dispose()
@@ -0,0 +1,264 @@
+"""
+Este módulo mantém em memória os fragmentos de texto gerados a partir da base
+de dados, versionados pelas tabelas de onde vêm.
+
+Cada tabela tem um contador de versão, guardado na própria base de dados
+(tabela versoes_tabelas), que é incrementado na mesma transação sempre que
+uma sessão SQLAlchemy grava alterações nela. Assim, as escritas de outros
+processos (os outros workers, a importação em massa) também invalidam os
+fragmentos deste processo.
+
+As leituras das versões (versao, versoes) são feitas só em memória, para não
+bloquear o event loop. A cópia em memória é atualizada de duas formas: os
+commits deste processo somam logo os seus incrementos, e atualizar_versoes
+(ou atualizar_versoes_async, numa thread) relê a tabela da base de dados, no
+máximo uma vez por intervalo, para ver as escritas dos outros processos.
+
+Um fragmento só é regenerado quando a versão de alguma das suas tabelas muda;
+caso contrário, é servido do cache sem ir à base de dados.
+"""
+
+import asyncio
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Tuple
+from sqlalchemy import event, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from . import models
+
+# Tabelas de onde cada fragmento é gerado
+TABELAS_POR_FRAGMENTO: Dict[str, Tuple[str, ...]] = {
+    'persona': ('persona',),
+    'empresa': ('empresa',),
+    'setores': ('setores',),
+    'funcionarios': ('funcionarios',),
+    'gerentes': ('gerentes',),
+    'projetos': ('projetos',),
+    'participacoes': ('projetos', 'funcionarios', 'participacao_projeto'),
+    'conhecimentos': ('conhecimentos_manuais',),
+    'cerimonias': ('cerimonias',),
+}
+# O snapshot completo do conhecimento depende de todas as tabelas
+TABELAS_POR_FRAGMENTO['conhecimento'] = tuple(sorted({t for ts in TABELAS_POR_FRAGMENTO.values() for t in ts}))
+TABELAS_POR_FRAGMENTO['indice_conhecimento'] = TABELAS_POR_FRAGMENTO['conhecimento']
+
+SQL_CRIAR_TABELA_VERSOES = (
+    "CREATE TABLE IF NOT EXISTS versoes_tabelas ("
+    " tabela TEXT PRIMARY KEY,"
+    " versao INTEGER NOT NULL)"
+)
+SQL_INCREMENTAR_VERSAO = (
+    "INSERT INTO versoes_tabelas (tabela, versao) VALUES (:tabela, 1)"
+    " ON CONFLICT(tabela) DO UPDATE SET versao = versao + 1"
+)
+
+# Versões lidas da base de dados (mais os commits deste processo) e incrementos sem ligação
+_persistidas: Dict[str, int] = {}
+_locais: Dict[str, int] = {}
+_engine: Optional[Engine] = None
+_intervalo_leitura = 1.0
+_lidas_em = float('-inf')
+_lock = threading.Lock()
+# Chave, em Connection.info, dos incrementos da transação ainda por confirmar
+_CHAVE_PENDENTES = 'versoes_pendentes'
+
+
+def configurar(engine: Engine, intervalo_segundos: float = 1.0):
+    """
+    Indica a base de dados de onde as versões das tabelas são lidas.
+
+    Args:
+        engine (Engine): O engine da base de dados do conhecimento (pode ser só de leitura).
+        intervalo_segundos (float): O tempo máximo durante o qual uma escrita de outro
+                                    processo pode passar despercebida.
+    """
+    global _engine, _intervalo_leitura, _lidas_em
+    with _lock:
+        _engine = engine
+        _intervalo_leitura = intervalo_segundos
+        _lidas_em = float('-inf')
+
+
+def _releitura_pendente() -> bool:
+    return _engine is not None and time.monotonic() - _lidas_em >= _intervalo_leitura
+
+
+def atualizar_versoes():
+    """
+    Relê as versões persistidas, se o intervalo de leitura já tiver passado.
+
+    Faz uma consulta síncrona à base de dados: no event loop, use atualizar_versoes_async.
+    """
+    global _persistidas, _lidas_em
+    if not _releitura_pendente():
+        return
+    with _lock:
+        if not _releitura_pendente():
+            return
+        try:
+            with _engine.connect() as conexao:
+                lidas = dict(conexao.execute(text("SELECT tabela, versao FROM versoes_tabelas")).all())
+        except OperationalError:
+            # A tabela só é criada na primeira escrita
+            lidas = {}
+        # As versões só crescem: fica o maior valor entre o lido e o já conhecido
+        atualizadas = dict(_persistidas)
+        for tabela, versao_lida in lidas.items():
+            atualizadas[tabela] = max(versao_lida, atualizadas.get(tabela, 0))
+        _persistidas = atualizadas
+        _lidas_em = time.monotonic()
+
+
+async def atualizar_versoes_async():
+    """Relê as versões persistidas numa thread, sem bloquear o event loop (só se o intervalo já tiver passado)."""
+    if _releitura_pendente():
+        await asyncio.to_thread(atualizar_versoes)
+
+
+def versao(tabela: str) -> int:
+    """Devolve a versão atual dos dados de uma tabela (lida da cópia em memória)."""
+    return _persistidas.get(tabela, 0) + _locais.get(tabela, 0)
+
+
+def versoes(tabelas: Iterable[str]) -> Tuple[int, ...]:
+    """Devolve as versões atuais de várias tabelas, pela ordem indicada (lidas da cópia em memória)."""
+    return tuple(_persistidas.get(t, 0) + _locais.get(t, 0) for t in tabelas)
+
+
+def versao_conhecimento() -> Tuple[int, ...]:
+    """Devolve a versão de todas as tabelas de conhecimento (muda a cada escrita em qualquer uma)."""
+    return versoes(TABELAS_POR_FRAGMENTO['conhecimento'])
+
+
+def incrementar_versao(*tabelas: str, conexao: Optional[Connection] = None):
+    """
+    Marca os dados das tabelas como alterados, invalidando os fragmentos que delas dependem.
+
+    Deve ser chamada manualmente por escritas que não passam pelo flush da
+    sessão (ex: inserções em massa com Core).
+
+    Args:
+        *tabelas (str): Os nomes das tabelas alteradas.
+        conexao (Optional[Connection]): A ligação da transação que fez as escritas. A versão
+                                        é então gravada na base de dados (e vista por todos os
+                                        processos) quando essa transação for confirmada. Sem
+                                        ligação, a versão só muda neste processo.
+    """
+    if conexao is None:
+        with _lock:
+            for tabela in tabelas:
+                _locais[tabela] = _locais.get(tabela, 0) + 1
+        return
+
+    conexao.execute(text(SQL_CRIAR_TABELA_VERSOES))
+    pendentes = conexao.info.setdefault(_CHAVE_PENDENTES, {})
+    for tabela in tabelas:
+        conexao.execute(text(SQL_INCREMENTAR_VERSAO), {'tabela': tabela})
+        pendentes[tabela] = pendentes.get(tabela, 0) + 1
+
+
+@event.listens_for(Session, "after_flush")
+def _registar_alteracoes(session: Session, flush_context):
+    """Incrementa, na mesma transação, a versão das tabelas tocadas por cada flush de qualquer sessão."""
+    tabelas = set()
+    for objeto in list(session.new) + list(session.dirty) + list(session.deleted):
+        tabela = getattr(objeto, '__tablename__', None)
+        if tabela:
+            tabelas.add(tabela)
+        if isinstance(objeto, (models.Funcionario, models.Projeto)):
+            tabelas.add(models.participacao_projeto_tabela.name)
+    if tabelas:
+        incrementar_versao(*sorted(tabelas), conexao=session.connection())
+
+
+@event.listens_for(Engine, "commit")
+def _depois_do_commit(conexao: Connection):
+    """As escritas deste processo ficam visíveis logo após o commit, sem reler a base de dados."""
+    pendentes = conexao.info.pop(_CHAVE_PENDENTES, None)
+    if pendentes:
+        with _lock:
+            for tabela, incremento in pendentes.items():
+                _persistidas[tabela] = _persistidas.get(tabela, 0) + incremento
+
+
+@event.listens_for(Engine, "rollback")
+def _depois_do_rollback(conexao: Connection):
+    """Os incrementos de uma transação desfeita não chegam à cópia em memória."""
+    conexao.info.pop(_CHAVE_PENDENTES, None)
+
+
+class CacheFragmentos:
+    """
+    Guarda o texto de cada fragmento junto com as versões das tabelas usadas para o gerar.
+    """
+    def __init__(self):
+        self._fragmentos: Dict[str, Tuple[Tuple[int, ...], Any]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def obter(self, nome: str, gerar: Callable[[], Any]) -> Any:
+        """
+        Devolve o fragmento do cache, ou gera-o se alguma das suas tabelas mudou.
+
+        Relê antes as versões da base de dados (se o intervalo tiver passado): é a
+        versão para código síncrono, fora do event loop.
+
+        Args:
+            nome (str): O nome do fragmento (uma chave de TABELAS_POR_FRAGMENTO).
+            gerar (Callable[[], Any]): A função que gera o fragmento a partir da base de dados.
+
+        Returns:
+            Any: O texto do fragmento (ou o ConhecimentoSnapshot, para 'conhecimento').
+        """
+        atualizar_versoes()
+        versoes_atuais = versoes(TABELAS_POR_FRAGMENTO.get(nome, (nome,)))
+        with self._lock:
+            guardado = self._fragmentos.get(nome)
+            if guardado and guardado[0] == versoes_atuais:
+                self.hits += 1
+                return guardado[1]
+
+        texto = gerar()
+        with self._lock:
+            self._fragmentos[nome] = (versoes_atuais, texto)
+            self.misses += 1
+        return texto
+
+    async def obter_async(self, nome: str, gerar: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Versão assíncrona do obter, para fragmentos gerados por corrotinas.
+
+        Usa só as versões em memória; a releitura da base de dados é feita por
+        atualizar_versoes_async (o SofiaBrain chama-a a cada mensagem).
+
+        Args:
+            nome (str): O nome do fragmento (uma chave de TABELAS_POR_FRAGMENTO).
+            gerar (Callable[[], Awaitable[Any]]): A corrotina que gera o fragmento.
+
+        Returns:
+            Any: O texto do fragmento (ou o ConhecimentoSnapshot, para 'conhecimento').
+        """
+        versoes_atuais = versoes(TABELAS_POR_FRAGMENTO.get(nome, (nome,)))
+        with self._lock:
+            guardado = self._fragmentos.get(nome)
+            if guardado and guardado[0] == versoes_atuais:
+                self.hits += 1
+                return guardado[1]
+
+        texto = await gerar()
+        with self._lock:
+            self._fragmentos[nome] = (versoes_atuais, texto)
+            self.misses += 1
+        return texto
+
+    def limpar(self):
+        """Remove todos os fragmentos guardados."""
+        with self._lock:
+            self._fragmentos.clear()
+
+
+cache_fragmentos = CacheFragmentos()
@@ -0,0 +1,170 @@
+"""
+Este módulo carrega todo o conhecimento da Sofia da base de dados de uma só vez.
+
+Em vez de cada fragmento fazer as suas próprias consultas (e de as
+participações em projetos serem carregadas projeto a projeto), o
+carregar_conhecimento faz um número mínimo de consultas, com os participantes
+carregados em bloco via selectinload, e devolve um ConhecimentoSnapshot
+imutável, lido por todos os geradores de fragmentos. O
+carregar_conhecimento_async faz as mesmas consultas em paralelo, fora do
+event loop.
+"""
+
+import asyncio
+from typing import Any, Callable, Dict, NamedTuple, Optional, Tuple
+from sqlalchemy.orm import Session, selectinload
+
+from . import models
+
+
+class EmpresaInfo(NamedTuple):
+    nome: str
+    descricao: str
+
+
+class SetorInfo(NamedTuple):
+    nome: str
+    descricao: str
+
+
+class FuncionarioInfo(NamedTuple):
+    nome: str
+    cargo: str
+
+
+class GerenteInfo(NamedTuple):
+    nome: str
+    area: str
+
+
+class ProjetoInfo(NamedTuple):
+    nome: str
+    descricao: str
+    status: str
+    participantes: Tuple[str, ...]
+
+
+class ConhecimentoInfo(NamedTuple):
+    pergunta: str
+    resposta: str
+
+
+class CerimoniaInfo(NamedTuple):
+    nome: str
+    descricao: str
+
+
+class ConhecimentoSnapshot(NamedTuple):
+    """Fotografia imutável de todo o conhecimento guardado na base de dados."""
+    persona: Optional[str]
+    empresa: Optional[EmpresaInfo]
+    setores: Tuple[SetorInfo, ...]
+    funcionarios: Tuple[FuncionarioInfo, ...]
+    gerentes: Tuple[GerenteInfo, ...]
+    projetos: Tuple[ProjetoInfo, ...]
+    conhecimentos: Tuple[ConhecimentoInfo, ...]
+    cerimonias: Tuple[CerimoniaInfo, ...]
+
+
+def _carregar_persona(db: Session) -> Optional[str]:
+    persona = db.query(models.Persona.descricao).order_by(models.Persona.id).first()
+    return persona.descricao if persona else None
+
+
+def _carregar_empresa(db: Session) -> Optional[EmpresaInfo]:
+    empresa = db.query(models.Empresa.nome, models.Empresa.descricao).order_by(models.Empresa.id).first()
+    return EmpresaInfo(empresa.nome, empresa.descricao or "") if empresa else None
+
+
+def _carregar_setores(db: Session) -> Tuple[SetorInfo, ...]:
+    return tuple(
+        SetorInfo(nome, descricao or "")
+        for nome, descricao in db.query(models.Setor.nome, models.Setor.descricao).order_by(models.Setor.id)
+    )
+
+
+def _carregar_funcionarios(db: Session) -> Tuple[FuncionarioInfo, ...]:
+    return tuple(
+        FuncionarioInfo(nome, cargo or "")
+        for nome, cargo in db.query(models.Funcionario.nome, models.Funcionario.cargo).order_by(models.Funcionario.id)
+    )
+
+
+def _carregar_gerentes(db: Session) -> Tuple[GerenteInfo, ...]:
+    return tuple(
+        GerenteInfo(nome, area or "")
+        for nome, area in db.query(models.Gerente.nome, models.Gerente.area).order_by(models.Gerente.id)
+    )
+
+
+def _carregar_projetos(db: Session) -> Tuple[ProjetoInfo, ...]:
+    projetos = (
+        db.query(models.Projeto)
+        .options(selectinload(models.Projeto.participantes))
+        .order_by(models.Projeto.id)
+        .all()
+    )
+    return tuple(
+        ProjetoInfo(p.nome, p.descricao or "", p.status or "", tuple(f.nome for f in p.participantes))
+        for p in projetos
+    )
+
+
+def _carregar_conhecimentos(db: Session) -> Tuple[ConhecimentoInfo, ...]:
+    return tuple(
+        ConhecimentoInfo(pergunta, resposta)
+        for pergunta, resposta in db.query(models.ConhecimentoManual.pergunta, models.ConhecimentoManual.resposta).order_by(models.ConhecimentoManual.id)
+    )
+
+
+def _carregar_cerimonias(db: Session) -> Tuple[CerimoniaInfo, ...]:
+    return tuple(
+        CerimoniaInfo(nome, descricao or "")
+        for nome, descricao in db.query(models.Cerimonia.nome, models.Cerimonia.descricao).order_by(models.Cerimonia.id)
+    )
+
+
+# Cada campo do ConhecimentoSnapshot é carregado por uma função independente
+CARREGADORES_CONHECIMENTO: Dict[str, Callable[[Session], Any]] = {
+    'persona': _carregar_persona,
+    'empresa': _carregar_empresa,
+    'setores': _carregar_setores,
+    'funcionarios': _carregar_funcionarios,
+    'gerentes': _carregar_gerentes,
+    'projetos': _carregar_projetos,
+    'conhecimentos': _carregar_conhecimentos,
+    'cerimonias': _carregar_cerimonias,
+}
+
+
+def carregar_conhecimento(db: Session) -> ConhecimentoSnapshot:
+    """
+    Carrega persona, empresa, setores, funcionários, gerentes, projetos (com
+    participantes), conhecimentos e cerimónias num número mínimo de consultas.
+
+    Args:
+        db (Session): A sessão da base de dados.
+
+    Returns:
+        ConhecimentoSnapshot: O conhecimento completo, desligado da sessão.
+    """
+    return ConhecimentoSnapshot(**{campo: carregar(db) for campo, carregar in CARREGADORES_CONHECIMENTO.items()})
+
+
+async def carregar_conhecimento_async(executor_bd: Any) -> ConhecimentoSnapshot:
+    """
+    Versão assíncrona do carregar_conhecimento.
+
+    As consultas de cada campo são independentes e correm em paralelo nas
+    threads do ExecutorBD, cada uma com a sua sessão de leitura, sem bloquear
+    o event loop.
+
+    Args:
+        executor_bd (ExecutorBD): O executor das consultas à base de dados.
+
+    Returns:
+        ConhecimentoSnapshot: O conhecimento completo, desligado da sessão.
+    """
+    campos = list(CARREGADORES_CONHECIMENTO)
+    valores = await asyncio.gather(*(executor_bd.executar(CARREGADORES_CONHECIMENTO[c]) for c in campos))
+    return ConhecimentoSnapshot(**dict(zip(campos, valores)))
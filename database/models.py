@@ -4,7 +4,7 @@ Cada classe aqui representa uma tabela na base de dados que armazena o
 conhecimento de longo prazo da Sofia.
 """
 
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, Table
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, Table, Index
 from sqlalchemy.orm import relationship, declarative_base
 
 # Base declarativa que será usada por todos os modelos
@@ -13,7 +13,9 @@ Base = declarative_base()
 # Tabela de Associação para a relação Muitos-para-Muitos entre Funcionários e Projetos
 participacao_projeto_tabela = Table('participacao_projeto', Base.metadata,
     Column('funcionario_id', Integer, ForeignKey('funcionarios.id'), primary_key=True),
-    Column('projeto_id', Integer, ForeignKey('projetos.id'), primary_key=True)
+    Column('projeto_id', Integer, ForeignKey('projetos.id'), primary_key=True),
+    # A chave primária (funcionario_id, projeto_id) já serve as procuras por funcionário
+    Index('ix_participacao_projeto_projeto_id', 'projeto_id')
 )
 
 class Persona(Base):
@@ -56,7 +58,7 @@ class Projeto(Base):
     id = Column(Integer, primary_key=True)
     nome = Column(String(150), unique=True, nullable=False)
     descricao = Column(Text)
-    status = Column(String(50), default="Ativo")
+    status = Column(String(50), default="Ativo", index=True)
     # Relação com funcionários
     participantes = relationship("Funcionario",
                                  secondary=participacao_projeto_tabela,
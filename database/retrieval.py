@@ -0,0 +1,137 @@
+"""
+Este módulo seleciona, para cada pergunta, apenas o conhecimento relevante da
+base de dados, em vez de colar todos os setores, funcionários, projetos e
+cerimónias em todos os prompts.
+
+Cada linha do ConhecimentoSnapshot (um setor, um funcionário, um projeto...)
+torna-se um documento de um índice BM25 local, em Python puro. Para cada
+mensagem são escolhidos os k documentos com maior pontuação, dentro de um
+orçamento de tokens, e agrupados pela secão de onde vêm.
+"""
+
+import math
+from collections import Counter
+from typing import Dict, List, NamedTuple, Tuple
+
+from utils import helpers
+from .knowledge import ConhecimentoSnapshot
+
+PALAVRAS_IGNORADAS = {
+    "a", "o", "as", "os", "um", "uma", "de", "da", "do", "das", "dos", "e", "em", "no", "na",
+    "nos", "nas", "para", "por", "com", "que", "qual", "quais", "quem", "como", "me", "se",
+    "sao", "ser", "voce", "sofia", "sobre",
+}
+
+
+class Documento(NamedTuple):
+    secao: str
+    texto: str
+
+
+def estimar_tokens(texto: str) -> int:
+    """Estimativa rápida do número de tokens de um texto (~4 caracteres por token)."""
+    return max(1, len(texto) // 4)
+
+
+def _termos(texto: str) -> List[str]:
+    """Divide um texto nos termos indexáveis (normalizados e sem palavras de ligação)."""
+    return [t for t in helpers.tokenizar(texto) if t not in PALAVRAS_IGNORADAS]
+
+
+def documentos_do_conhecimento(conhecimento: ConhecimentoSnapshot) -> List[Documento]:
+    """Converte cada linha do conhecimento num documento pesquisável."""
+    documentos = []
+    documentos += [Documento("Setores da Empresa", f"- **{s.nome}**: {s.descricao}") for s in conhecimento.setores]
+    documentos += [
+        Documento("Membros da Equipa", f"- {f.nome}" + (f" ({f.cargo})" if f.cargo else ""))
+        for f in conhecimento.funcionarios
+    ]
+    documentos += [Documento("Liderança", f"- {g.nome} (Líder de {g.area})") for g in conhecimento.gerentes]
+    for projeto in conhecimento.projetos:
+        if projeto.status == "Ativo":
+            documentos.append(Documento("Principais Projetos Atuais", f"- **{projeto.nome}**: {projeto.descricao}"))
+        if projeto.participantes:
+            documentos.append(Documento(
+                "Participação em Projetos",
+                f"- No projeto **{projeto.nome}** participam: {', '.join(projeto.participantes)}."
+            ))
+    documentos += [
+        Documento("Base de Conhecimento Rápido", f"- Se perguntarem '{c.pergunta}', a resposta é '{c.resposta}'")
+        for c in conhecimento.conhecimentos
+    ]
+    documentos += [Documento("Rituais e Cerimónias", f"- **{c.nome}**: {c.descricao}") for c in conhecimento.cerimonias]
+    return documentos
+
+
+class IndiceBM25:
+    """
+    Índice BM25 em memória sobre uma lista de documentos.
+    """
+    def __init__(self, documentos: List[Documento], k1: float = 1.5, b: float = 0.75):
+        self.documentos = documentos
+        self._k1 = k1
+        self._b = b
+        # A secção entra nos termos para que perguntas como "quais são os setores?" encontrem os documentos
+        self._frequencias = [Counter(_termos(f"{d.secao} {d.texto}")) for d in documentos]
+        self._tamanhos = [sum(f.values()) for f in self._frequencias]
+        self._tamanho_medio = (sum(self._tamanhos) / len(self._tamanhos)) if self._tamanhos else 0.0
+
+        self._postings: Dict[str, List[int]] = {}
+        for posicao, frequencias in enumerate(self._frequencias):
+            for termo in frequencias:
+                self._postings.setdefault(termo, []).append(posicao)
+
+        total = len(documentos)
+        self._idf = {
+            termo: math.log(1 + (total - len(posicoes) + 0.5) / (len(posicoes) + 0.5))
+            for termo, posicoes in self._postings.items()
+        }
+
+    def procurar(self, consulta: str, k: int) -> List[Tuple[float, Documento]]:
+        """
+        Devolve os k documentos mais relevantes para a consulta, por ordem de pontuação.
+
+        Args:
+            consulta (str): A mensagem do usuário.
+            k (int): O número máximo de documentos a devolver.
+
+        Returns:
+            List[Tuple[float, Documento]]: Os pares (pontuação, documento) com pontuação positiva.
+        """
+        pontuacoes: Dict[int, float] = {}
+        for termo in set(_termos(consulta)):
+            idf = self._idf.get(termo)
+            if idf is None:
+                continue
+            for posicao in self._postings[termo]:
+                frequencia = self._frequencias[posicao][termo]
+                normalizacao = self._k1 * (1 - self._b + self._b * self._tamanhos[posicao] / (self._tamanho_medio or 1))
+                pontuacoes[posicao] = pontuacoes.get(posicao, 0.0) + idf * frequencia * (self._k1 + 1) / (frequencia + normalizacao)
+
+        melhores = sorted(pontuacoes.items(), key=lambda item: item[1], reverse=True)[:k]
+        return [(pontuacao, self.documentos[posicao]) for posicao, pontuacao in melhores]
+
+
+def selecionar_contexto(indice: IndiceBM25, mensagem: str, top_k: int, orcamento_tokens: int) -> List[Tuple[str, str]]:
+    """
+    Escolhe o conhecimento relevante para a mensagem, dentro de um orçamento de tokens.
+
+    Args:
+        indice (IndiceBM25): O índice construído a partir do conhecimento.
+        mensagem (str): A pergunta do usuário.
+        top_k (int): O número máximo de documentos a incluir.
+        orcamento_tokens (int): O número máximo (estimado) de tokens de contexto.
+
+    Returns:
+        List[Tuple[str, str]]: Os pares (secção, fragmento) a incluir no prompt, um por secção.
+    """
+    por_secao: Dict[str, List[str]] = {}
+    usados = 0
+    for _, documento in indice.procurar(mensagem, top_k):
+        custo = estimar_tokens(documento.texto)
+        if usados + custo > orcamento_tokens:
+            continue
+        usados += custo
+        por_secao.setdefault(documento.secao, []).append(documento.texto)
+
+    return [(secao, f"### {secao}\n" + "\n".join(linhas)) for secao, linhas in por_secao.items()]
@@ -0,0 +1,188 @@
+"""
+Este módulo centraliza o acesso à base de dados SQLite do conhecimento.
+
+O criar_engine aplica, em cada nova ligação, as configurações de desempenho
+do SQLite (WAL, mmap, cache de páginas, synchronous=NORMAL), de forma que
+leitores concorrentes nunca fiquem bloqueados pelo ficheiro. O
+PoolSessoesLeitura reutiliza sessões só de leitura entre pedidos, em vez de
+abrir uma sessão nova a cada pergunta, e expõe métricas de utilização. O
+ExecutorBD corre as consultas em threads dedicadas, para que os handlers
+assíncronos não bloqueiem o event loop enquanto esperam pelo SQLite.
+"""
+
+import asyncio
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Dict, Any, Callable, Iterator
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
+
+# Parâmetros padrão do SQLite
+MMAP_SIZE_BYTES = 256 * 1024 * 1024
+CACHE_SIZE_KB = 64 * 1024
+BUSY_TIMEOUT_MS = 5000
+STATEMENT_CACHE_SIZE = 256
+
+
+def criar_engine(
+    database_url: str,
+    somente_leitura: bool = False,
+    mmap_size: int = MMAP_SIZE_BYTES,
+    cache_size_kb: int = CACHE_SIZE_KB,
+    pool_size: int = 8
+) -> Engine:
+    """
+    Cria um engine SQLAlchemy para SQLite com as PRAGMAs de desempenho.
+
+    Args:
+        database_url (str): A URL da base de dados (ex: 'sqlite:///./sofia.db').
+        somente_leitura (bool): Se True, as ligações recusam escritas (PRAGMA query_only).
+        mmap_size (int): O tamanho, em bytes, da região de memory-map.
+        cache_size_kb (int): O tamanho, em KB, da cache de páginas de cada ligação.
+        pool_size (int): O número de ligações mantidas abertas no pool.
+
+    Returns:
+        Engine: O engine configurado.
+    """
+    engine = create_engine(
+        database_url,
+        connect_args={"check_same_thread": False, "cached_statements": STATEMENT_CACHE_SIZE},
+        pool_size=pool_size,
+        max_overflow=pool_size,
+        pool_pre_ping=False,
+        query_cache_size=1200,
+    )
+
+    @event.listens_for(engine, "connect")
+    def _configurar_ligacao(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute(f"PRAGMA mmap_size={int(mmap_size)}")
+        cursor.execute(f"PRAGMA cache_size=-{int(cache_size_kb)}")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+        if somente_leitura:
+            cursor.execute("PRAGMA query_only=ON")
+        cursor.close()
+
+    return engine
+
+
+class PoolSessoesLeitura:
+    """
+    Reutiliza sessões só de leitura entre pedidos e regista métricas de uso.
+    """
+    def __init__(self, engine: Engine, tamanho_maximo: int = 8):
+        """
+        Inicializa o pool.
+
+        Args:
+            engine (Engine): O engine (de preferência só de leitura) usado pelas sessões.
+            tamanho_maximo (int): O número máximo de sessões livres guardadas para reutilização.
+        """
+        self.engine = engine
+        self._fabrica = sessionmaker(bind=engine, autocommit=False, autoflush=False, expire_on_commit=False)
+        self._livres: "queue.LifoQueue[Session]" = queue.LifoQueue(maxsize=tamanho_maximo)
+        self._lock = threading.Lock()
+        self._criadas = 0
+        self._reutilizadas = 0
+        self._em_uso = 0
+        self._max_em_uso = 0
+
+    @contextmanager
+    def sessao(self) -> Iterator[Session]:
+        """
+        Empresta uma sessão de leitura e devolve-a ao pool no fim.
+
+        A transação de leitura é sempre terminada (rollback) antes de a sessão
+        voltar ao pool, para que não fique presa a um snapshot antigo do WAL.
+        """
+        try:
+            db = self._livres.get_nowait()
+            reutilizada = True
+        except queue.Empty:
+            db = self._fabrica()
+            reutilizada = False
+
+        with self._lock:
+            if reutilizada:
+                self._reutilizadas += 1
+            else:
+                self._criadas += 1
+            self._em_uso += 1
+            self._max_em_uso = max(self._max_em_uso, self._em_uso)
+
+        try:
+            yield db
+        finally:
+            db.rollback()
+            with self._lock:
+                self._em_uso -= 1
+            try:
+                self._livres.put_nowait(db)
+            except queue.Full:
+                db.close()
+
+    def metricas(self) -> Dict[str, Any]:
+        """Devolve as métricas do pool de sessões e do pool de ligações do engine."""
+        with self._lock:
+            return {
+                'sessoes_criadas': self._criadas,
+                'sessoes_reutilizadas': self._reutilizadas,
+                'sessoes_em_uso': self._em_uso,
+                'max_sessoes_em_uso': self._max_em_uso,
+                'sessoes_livres': self._livres.qsize(),
+                'ligacoes': self.engine.pool.status(),
+            }
+
+    def fechar(self):
+        """Fecha todas as sessões livres e as ligações do engine."""
+        while True:
+            try:
+                self._livres.get_nowait().close()
+            except queue.Empty:
+                break
+        self.engine.dispose()
+
+
+class ExecutorBD:
+    """
+    Executa consultas à base de dados em threads dedicadas, a partir de código assíncrono.
+    """
+    def __init__(self, sessoes: PoolSessoesLeitura, max_threads: int = 4):
+        """
+        Inicializa o executor.
+
+        Args:
+            sessoes (PoolSessoesLeitura): O pool de onde cada consulta recebe a sua sessão.
+            max_threads (int): O número de threads dedicadas à base de dados.
+        """
+        self.sessoes = sessoes
+        self._executor = ThreadPoolExecutor(max_workers=max_threads, thread_name_prefix="sofia-bd")
+
+    def _executar_com_sessao(self, funcao: Callable[..., Any], args: tuple) -> Any:
+        with self.sessoes.sessao() as db:
+            return funcao(db, *args)
+
+    async def executar(self, funcao: Callable[..., Any], *args: Any) -> Any:
+        """
+        Corre funcao(db, *args) numa thread da base de dados e aguarda o resultado.
+
+        Args:
+            funcao (Callable): A função de consulta; recebe a sessão como primeiro argumento.
+            *args: Argumentos adicionais da função.
+
+        Returns:
+            Any: O resultado da função. Não deve conter objetos ORM ligados à sessão.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._executar_com_sessao, funcao, args)
+
+    def fechar(self):
+        """Espera pelas consultas em curso e termina as threads."""
+        self._executor.shutdown(wait=True)
@@ -1,12 +1,13 @@
 # database/setup.py
-from sqlalchemy import create_engine
+# Executar a partir da raiz do projeto: python -m database.setup
 from sqlalchemy.orm import sessionmaker
-from models import Base, Persona, Empresa, Setor, Funcionario, Gerente, Projeto, ConhecimentoManual, Cerimonia
+from database.session import criar_engine
+from database.models import Base, Persona, Empresa, Setor, Funcionario, Gerente, Projeto, ConhecimentoManual, Cerimonia
 
 # Define o caminho da base de dados
 DATABASE_URL = "sqlite:///./sofia.db"
 
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+engine = criar_engine(DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 def create_database():
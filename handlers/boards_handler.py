@@ -5,12 +5,13 @@ processa as perguntas dos usuários para extrair insights e formata
 as respostas de maneira estruturada.
 """
 
-from datetime import datetime
-from typing import Dict, Any, List, Optional
-import pandas as pd
-from core.cache import CacheManager
-from config import prompts
-from utils import helpers
+import asyncio
+from typing import Dict, Any, Optional
+from core.board_snapshot import BoardSnapshot
+from core import board_storage, board_query
+from core.board_history import responder_pergunta_historico
+from core.warmup import EstadoAquecimento, executar_aquecimento
+from core.message_analysis import MessageAnalysis
 
 
 
@@ -22,80 +23,147 @@ def _detect_board_project(pergunta_lower: str, user_id: str, user_states: Dict,
     return user_states.get('ultimo_board_por_usuario', {}).get(user_id)
 
 
-async def _get_boards_data(projeto: str, cache_manager: Any, buscar_epicos: bool, AzureBoardsService: Any, processing_module: Any) -> Optional[pd.DataFrame]:
-    """Busca os dados do Azure Boards, utilizando o cache para otimizar."""
-    cache_key = f"boards_{projeto}" + ("_epicos" if buscar_epicos else "")
+def resposta_sem_busca(user_id: str, analise: MessageAnalysis, user_states: Dict, cache_manager: Any, constants: Dict) -> bool:
+    """
+    Indica se a pergunta sobre boards pode ser respondida sem buscar o board no Azure Boards.
+
+    É o caso dos comandos de saída e de ajuda, da pergunta sem projeto (que pede
+    a seleção do board) e dos boards que já estão no cache.
+    """
+    if analise.tem('EXIT_COMMANDS') or analise.tem('HELP_COMMANDS'):
+        return True
+    projeto = _detect_board_project(analise.lower, user_id, user_states, constants.get('BOARD_PROJECTS', {}))
+    return not projeto or cache_manager.contem(f"boards_{projeto}")
+
+
+async def _get_boards_data(projeto: str, cache_manager: Any, AzureBoardsService: Any, processing_module: Any, constants: Dict, forcar_atualizacao: bool = False, historico_boards: Any = None) -> Optional[BoardSnapshot]:
+    """
+    Busca os dados do Azure Boards e constrói o snapshot, utilizando o cache para otimizar.
+
+    Os work items são sempre processados com os épicos (a vista mais rica), e a
+    vista sem épicos é derivada do mesmo snapshot. Assim, cada projeto é buscado
+    e guardado em memória uma única vez. Cada atualização é também registada
+    no histórico de agregados, quando este estiver disponível.
+    """
+    cache_key = f"boards_{projeto}"
     
-    cached_df = cache_manager.get(cache_key)
-    if cached_df is not None:
-        return cached_df
+    cached_snapshot = None if forcar_atualizacao else cache_manager.get(cache_key)
+    if cached_snapshot is not None:
+        return cached_snapshot
+
+    snapshot_dir = constants.get('BOARDS_SNAPSHOT_DIR')
+    df_persistido = None if forcar_atualizacao else board_storage.carregar_snapshot(snapshot_dir, cache_key, constants.get('CACHE_DURATION', 600))
+    if df_persistido is not None:
+        snapshot = BoardSnapshot(projeto, df_persistido, constants)
+        cache_manager.set(cache_key, snapshot, duration_seconds=600)
+        return snapshot
 
     try:
         azure_service = AzureBoardsService(projeto)
-        work_items = azure_service.buscar_work_items(batch_size=200)
+        work_items = await asyncio.to_thread(azure_service.buscar_work_items, batch_size=200)
         
         if not work_items:
             return None
         
-        df = await processing_module.processar_work_items_df(work_items, projeto=projeto, buscar_epicos=buscar_epicos)
+        df = await processing_module.processar_work_items_df(work_items, projeto=projeto, buscar_epicos=True)
+        df, estatisticas = board_storage.compactar_board_df(df, constants)
+        print(board_storage.formatar_relatorio_memoria(projeto, estatisticas))
+        board_storage.salvar_snapshot(df, snapshot_dir, cache_key)
+        snapshot = BoardSnapshot(projeto, df, constants, memoria=estatisticas)
+        if historico_boards is not None:
+            await asyncio.to_thread(historico_boards.registar, snapshot)
         
-        cache_manager.set(cache_key, df, duration_seconds=600)
-        return df
+        cache_manager.set(cache_key, snapshot, duration_seconds=600)
+        return snapshot
         
     except Exception as e:
         print(f"❌ Erro ao buscar dados do Azure Boards para o projeto '{projeto}': {e}")
         return None
 
 
-def _detect_collaborator(pergunta_lower: str, user_id: str, df: pd.DataFrame, user_states: Dict, collab_refs: List) -> Optional[str]:
-    """Detecta se um colaborador é o foco da pergunta."""
-    if any(termo in pergunta_lower for termo in collab_refs):
-        return user_states.get('ultimo_colaborador_consultado', {}).get(user_id)
+def _detect_collaborator(analise: MessageAnalysis, user_id: str, snapshot: BoardSnapshot, user_states: Dict) -> Optional[str]:
+    """Detecta se um colaborador é o foco da pergunta, usando o índice de nomes do snapshot."""
+    ultimo_colaborador = user_states.get('ultimo_colaborador_consultado', {}).get(user_id)
+    if analise.tem('COLLABORATOR_REFERENCES'):
+        return ultimo_colaborador
     
-    tokens_pergunta = set(pergunta_lower.split())
-    for responsavel in df['responsavel'].dropna().unique():
-        partes_nome = set(responsavel.lower().split())
-        if tokens_pergunta & partes_nome: 
-        
-            if 'ultimo_colaborador_consultado' not in user_states:
-                user_states['ultimo_colaborador_consultado'] = {}
-            user_states['ultimo_colaborador_consultado'][user_id] = responsavel
-            return responsavel
+    responsavel = snapshot.identificar_responsavel(analise.conjunto_tokens, preferido=ultimo_colaborador)
+    if responsavel:
+        if 'ultimo_colaborador_consultado' not in user_states:
+            user_states['ultimo_colaborador_consultado'] = {}
+        user_states['ultimo_colaborador_consultado'][user_id] = responsavel
             
-    return None
+    return responsavel
 
-def _process_collaborator_query(pergunta_lower: str, df: pd.DataFrame, nome_colaborador: str, processing_module: Any, constants: Dict) -> str:
+def _process_collaborator_query(analise: MessageAnalysis, snapshot: BoardSnapshot, nome_colaborador: str, processing_module: Any, constants: Dict, com_epicos: bool) -> str:
     """Processa uma pergunta específica sobre um colaborador."""
-    if any(t in pergunta_lower for t in constants.get('PROGRESS_KEYWORDS', [])):
-        tarefas = processing_module.extrair_tarefas_por_colaborador_e_estado(df, nome_colaborador, "em andamento")
+    if analise.tem('PROGRESS_KEYWORDS'):
+        tarefas = snapshot.tarefas(responsavel=nome_colaborador, grupo_estado="em andamento", com_epicos=com_epicos)
         return processing_module.formatar_lista_tarefas(tarefas, f"Tarefas em andamento de {nome_colaborador}")
         
-    elif any(t in pergunta_lower for t in constants.get('TODO_KEYWORDS', [])):
-        tarefas = processing_module.extrair_tarefas_por_colaborador_e_estado(df, nome_colaborador, "a fazer")
+    elif analise.tem('TODO_KEYWORDS'):
+        tarefas = snapshot.tarefas(responsavel=nome_colaborador, grupo_estado="a fazer", com_epicos=com_epicos)
         return processing_module.formatar_lista_tarefas(tarefas, f"Tarefas a fazer de {nome_colaborador}")
         
-    tarefas = processing_module.extrair_tarefas_por_colaborador(df, nome_colaborador)
+    tarefas = snapshot.tarefas(responsavel=nome_colaborador, com_epicos=com_epicos)
     return processing_module.formatar_lista_tarefas(tarefas, f"Todas as tarefas de {nome_colaborador}")
 
 
-def _process_general_query(pergunta_lower: str, df: pd.DataFrame, nome_amigavel: str, processing_module: Any, constants: Dict) -> str:
+def _process_general_query(analise: MessageAnalysis, snapshot: BoardSnapshot, nome_amigavel: str, processing_module: Any, constants: Dict, com_epicos: bool) -> str:
     """Processa uma pergunta geral sobre o estado do board."""
     mapa_tipos = constants.get('MAPA_TIPOS_ITENS', {})
     
     for chave, tipo in mapa_tipos.items():
-        if f"quantos {chave}" in pergunta_lower or f"quantas {chave}" in pergunta_lower:
-            total = len(df[df["tipo"].str.lower() == tipo])
+        if f"quantos {chave}" in analise.lower or f"quantas {chave}" in analise.lower:
+            total = snapshot.contar_tipo(tipo)
             return f"🔢 Existem **{total}** item(ns) do tipo **{tipo.title()}** no board {nome_amigavel}."
 
-    if any(t in pergunta_lower for t in constants.get('PROGRESS_KEYWORDS', [])):
-        tarefas = processing_module.tarefas_em_andamento(df)
+    if analise.tem('PROGRESS_KEYWORDS'):
+        tarefas = snapshot.tarefas(grupo_estado="em andamento", com_epicos=com_epicos)
         return processing_module.formatar_lista_tarefas(tarefas, f"Tarefas em andamento do board {nome_amigavel}")
 
-    if any(t in pergunta_lower for t in constants.get('TASK_COUNT_KEYWORDS', [])):
-        responsavel, quantidade = processing_module.obter_responsavel_com_mais_tarefas(df)
+    if analise.tem('TASK_COUNT_KEYWORDS'):
+        responsavel, quantidade = snapshot.responsavel_com_mais_tarefas
         return f"O colaborador com mais tarefas no total é **{responsavel}**, com **{quantidade}** tarefas."
 
-    return processing_module.formatar_visao_geral(df, f"Visão Geral do Board {nome_amigavel}")
+    return processing_module.formatar_visao_geral(snapshot.visao(com_epicos), f"Visão Geral do Board {nome_amigavel}")
+
+
+def _process_client_query(snapshot: BoardSnapshot, nome_amigavel: str, processing_module: Any, com_epicos: bool = True) -> str:
+    """Responde qual cliente concentra mais atividades, com o formato do processing_module."""
+    return processing_module.cliente_com_mais_atividades(snapshot.visao(com_epicos), projeto=nome_amigavel)
+
+
+async def aquecer_boards(
+    cache_manager: Any,
+    constants: Dict,
+    AzureBoardsService: Any,
+    processing_module: Any,
+    estado: EstadoAquecimento,
+    forcar_atualizacao: bool = False,
+    historico_boards: Any = None
+) -> EstadoAquecimento:
+    """
+    Busca e processa em paralelo todos os projetos de BOARD_PROJECTS, deixando-os no cache.
+
+    Args:
+        cache_manager: A instância do gerenciador de cache.
+        constants: Dicionário com BOARD_PROJECTS e BOARDS_WARMUP_CONCURRENCY.
+        AzureBoardsService: A classe do serviço do Azure Boards.
+        processing_module: O módulo de processamento dos work items.
+        estado: O objeto onde os tempos por projeto e a prontidão são registados.
+        forcar_atualizacao: Se True, ignora o cache e volta a buscar os dados (usado no agendamento).
+        historico_boards: O histórico onde cada atualização é registada (opcional).
+
+    Returns:
+        O estado do aquecimento, atualizado.
+    """
+    projetos = sorted(set(constants.get('BOARD_PROJECTS', {}).values()))
+    tarefas = {
+        projeto: (lambda p=projeto: _get_boards_data(p, cache_manager, AzureBoardsService, processing_module, constants, forcar_atualizacao, historico_boards))
+        for projeto in projetos
+    }
+    return await executar_aquecimento(tarefas, constants.get('BOARDS_WARMUP_CONCURRENCY', 2), estado)
 
 
 # --- Função Principal do Handler ---
@@ -107,19 +175,26 @@ async def handle_boards_analysis(
     cache_manager: Any,
     constants: Dict,
     AzureBoardsService: Any, 
-    processing_module: Any   
+    processing_module: Any,
+    historico_boards: Any = None,
+    analise: Optional[MessageAnalysis] = None
 ) -> str:
     """
     Ponto de entrada para analisar e responder perguntas sobre o Azure Boards.
+
+    Perguntas de tendência, velocidade ou burndown são respondidas a partir do
+    histórico de agregados, sem buscar os dados no Azure Boards. A análise da
+    mensagem feita pelo SofiaBrain é reutilizada quando é passada.
     """
-    pergunta_lower = message.lower()
+    analise = analise or MessageAnalysis(message, constants)
+    pergunta_lower = analise.lower
 
-    if any(cmd in pergunta_lower for cmd in constants.get('EXIT_COMMANDS', [])):
+    if analise.tem('EXIT_COMMANDS'):
         if user_id in user_states.get('modo_analise_boards', {}):
             del user_states['modo_analise_boards'][user_id]
         return constants.get('BOARDS_EXIT_MESSAGE')
 
-    if any(cmd in pergunta_lower for cmd in constants.get('HELP_COMMANDS', [])):
+    if analise.tem('HELP_COMMANDS'):
         return constants.get('BOARDS_HELP_MESSAGE')
 
     projeto = _detect_board_project(pergunta_lower, user_id, user_states, constants.get('BOARD_PROJECTS', {}))
@@ -131,17 +206,31 @@ async def handle_boards_analysis(
     user_states['ultimo_board_por_usuario'][user_id] = projeto
     nome_amigavel = "Operações" if projeto == "Sonar" else projeto
 
-    buscar_epicos = any(termo in pergunta_lower for termo in constants.get('CLIENT_SEARCH_KEYWORDS', []))
-    df = await _get_boards_data(projeto, cache_manager, buscar_epicos, AzureBoardsService, processing_module)
+    resposta_historico = None
+    if historico_boards is not None:
+        # O histórico é lido do SQLite: a consulta corre numa thread para não bloquear o event loop
+        resposta_historico = await asyncio.to_thread(
+            responder_pergunta_historico, historico_boards, pergunta_lower, projeto, nome_amigavel, constants
+        )
+    if resposta_historico:
+        return resposta_historico
+
+    com_epicos = analise.tem('CLIENT_SEARCH_KEYWORDS')
+    snapshot = await _get_boards_data(projeto, cache_manager, AzureBoardsService, processing_module, constants, historico_boards=historico_boards)
 
-    if df is None or df.empty:
+    if snapshot is None or snapshot.total == 0:
         return f"Desculpe, não consegui obter os dados do board '{nome_amigavel}' no momento."
 
-    if any(w in pergunta_lower for w in constants.get('CLIENT_KEYWORDS', [])):
-        return processing_module.cliente_com_mais_atividades(df, projeto=nome_amigavel)
+    nome_colaborador = _detect_collaborator(analise, user_id, snapshot, user_states)
+
+    consulta = board_query.interpretar_pergunta(pergunta_lower, snapshot, constants, nome_colaborador)
+    if consulta.composta:
+        return board_query.responder_consulta(snapshot, consulta, nome_amigavel, processing_module, com_epicos)
+
+    if analise.tem('CLIENT_KEYWORDS'):
+        return _process_client_query(snapshot, nome_amigavel, processing_module, com_epicos)
 
-    nome_colaborador = _detect_collaborator(pergunta_lower, user_id, df, user_states, constants.get('COLLABORATOR_REFERENCES', []))
     if nome_colaborador:
-        return _process_collaborator_query(pergunta_lower, df, nome_colaborador, processing_module, constants)
+        return _process_collaborator_query(analise, snapshot, nome_colaborador, processing_module, constants, com_epicos)
 
-    return _process_general_query(pergunta_lower, df, nome_amigavel, processing_module, constants)
+    return _process_general_query(analise, snapshot, nome_amigavel, processing_module, constants, com_epicos)
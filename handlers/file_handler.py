@@ -3,29 +3,32 @@ Este handler é responsável por todas as interações relacionadas a arquivos.
 Ele se comunica com o SharePointService para buscar e listar documentos,
 utiliza o CacheManager para otimizar as buscas e formata as respostas
 de forma clara para o usuário.
+
+As buscas são guardadas no cache como listas de itens do catálogo de arquivos
+(chaveadas pelo termo normalizado, sem acentos) e só são formatadas na leitura.
 """
 
 from datetime import datetime
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Sequence
 from core.cache import CacheManager
+from core.file_catalog import CatalogoArquivos, ItemArquivo, catalogo_arquivos
 from config import prompts
 from utils import helpers
 
-def _formatar_resultados_busca(termo_busca: str, arquivos: List[Dict], constants: Dict, helpers: Any) -> str:
+def _formatar_linha(indice: int, item: ItemArquivo, constants: Dict, helpers: Any) -> str:
+    """Formata um arquivo como uma linha numerada da resposta."""
+    return f"{indice}. **[{item.nome}]({item.url(constants, helpers)})** 📄 {item.data_modificacao(helpers)}"
+
+
+def _formatar_resultados_busca(termo_busca: str, itens: Sequence[ItemArquivo], constants: Dict, helpers: Any) -> str:
     """Formata a lista de arquivos encontrados em uma string de resposta."""
-    if not arquivos:
+    if not itens:
         return constants.get('FILE_SEARCH_NO_RESULTS', "Nenhum arquivo encontrado para '{}'").format(termo_busca)
 
-    total_arquivos = len(arquivos)
+    total_arquivos = len(itens)
     header = f"📂 Encontrei **{total_arquivos}** arquivo(s) para '**{termo_busca}**':\n\n"
     
-    resultados_formatados = []
-    for i, arquivo in enumerate(arquivos, 1):
-        nome = arquivo.get('name', 'Sem nome')
-        url = helpers.obter_url_valida(arquivo, constants.get('URL_FIELDS'), constants.get('URL_VALIDATION_PATTERNS'), constants.get('INVALID_URL_PATTERNS'))
-        data_modificacao = helpers.formatar_data_com_hora(arquivo.get("lastModifiedDateTime"))
-        
-        resultados_formatados.append(f"{i}. **[{nome}]({url})** 📄 {data_modificacao}")
+    resultados_formatados = [_formatar_linha(i, item, constants, helpers) for i, item in enumerate(itens, 1)]
 
     instrucao = constants.get('MULTIPLE_FILES_CLICK_INSTRUCTION') if total_arquivos > 1 else constants.get('SINGLE_FILE_CLICK_INSTRUCTION')
     
@@ -59,7 +62,17 @@ def _search_with_variations(termo_busca: str, sharepoint_service: Any) -> Option
             continue
     return None
 
-async def listar_arquivos_recentes(sharepoint_service: Any, constants: Dict, helpers: Any, quantidade: int) -> str:
+def chave_cache_busca(termo_busca: str) -> str:
+    """
+    Devolve a chave do cache dos resultados de uma busca.
+
+    O termo é normalizado (minúsculas, sem acentos e com os espaços colapsados),
+    para que 'Relatório Mensal' e 'relatorio  mensal' partilhem a mesma entrada.
+    """
+    return "search_" + "_".join(helpers.normalizar_texto(termo_busca).split())
+
+
+async def listar_arquivos_recentes(sharepoint_service: Any, constants: Dict, helpers: Any, quantidade: int, catalogo: Optional[CatalogoArquivos] = None) -> str:
     """
     Busca os arquivos mais recentes no SharePoint e formata a resposta.
 
@@ -68,6 +81,7 @@ async def listar_arquivos_recentes(sharepoint_service: Any, constants: Dict, hel
         constants: Dicionário com constantes de prompts e configurações.
         helpers: Módulo com funções utilitárias.
         quantidade: O número de arquivos a serem listados.
+        catalogo: O catálogo de arquivos partilhado com as buscas (por padrão, o global).
 
     Returns:
         Uma string com a lista de arquivos formatada ou uma mensagem de erro.
@@ -77,14 +91,10 @@ async def listar_arquivos_recentes(sharepoint_service: Any, constants: Dict, hel
         if not arquivos:
             return constants.get('NO_FILES_MESSAGE')
 
-        header = f"📂 Aqui estão os **{len(arquivos)}** arquivos mais recentes que encontrei:\n\n"
+        itens = (catalogo if catalogo is not None else catalogo_arquivos).registar(arquivos)
+        header = f"📂 Aqui estão os **{len(itens)}** arquivos mais recentes que encontrei:\n\n"
         
-        resultados_formatados = []
-        for i, arquivo in enumerate(arquivos, 1):
-            nome = arquivo.get('name', 'Sem nome')
-            url = helpers.obter_url_valida(arquivo, constants.get('URL_FIELDS'), constants.get('URL_VALIDATION_PATTERNS'), constants.get('INVALID_URL_PATTERNS'))
-            data_modificacao = helpers.formatar_data_com_hora(arquivo.get("lastModifiedDateTime"))
-            resultados_formatados.append(f"{i}. **[{nome}]({url})** 📄 {data_modificacao}")
+        resultados_formatados = [_formatar_linha(i, item, constants, helpers) for i, item in enumerate(itens, 1)]
 
         return header + "\n".join(resultados_formatados) + f"\n\n{constants.get('FILE_LIST_INSTRUCTIONS')}"
 
@@ -99,7 +109,8 @@ async def buscar_arquivo_por_termo(
     sharepoint_service: Any, 
     openai_service: Any,
     constants: Dict,
-    helpers: Any
+    helpers: Any,
+    catalogo: Optional[CatalogoArquivos] = None
 ) -> str:
     """
     Orquestra a busca por um arquivo usando múltiplas estratégias em cascata.
@@ -111,6 +122,7 @@ async def buscar_arquivo_por_termo(
         openai_service: A instância do serviço da OpenAI.
         constants: Dicionário com constantes.
         helpers: Módulo com funções utilitárias.
+        catalogo: O catálogo de arquivos partilhado com as listagens (por padrão, o global).
 
     Returns:
         Uma string com os resultados da busca formatados.
@@ -118,10 +130,12 @@ async def buscar_arquivo_por_termo(
     if not termo_busca.strip():
         return constants.get('FILE_NOT_FOUND_MESSAGE')
 
-    cache_key = f"search_{termo_busca.lower().replace(' ', '_')}"
+    catalogo = catalogo if catalogo is not None else catalogo_arquivos
+    cache_key = chave_cache_busca(termo_busca)
     cached_result = cache_manager.get(cache_key)
-    if cached_result:
-        return cached_result
+    if cached_result is not None:
+        # Os itens vindos do cache partilhado entre processos passam a ser os do catálogo local
+        return _formatar_resultados_busca(termo_busca, catalogo.registar(cached_result), constants, helpers)
 
     arquivos_encontrados = None
     
@@ -136,8 +150,7 @@ async def buscar_arquivo_por_termo(
     if not arquivos_encontrados:
         arquivos_encontrados = _search_with_variations(termo_busca, sharepoint_service)
 
-    resultado_final = _formatar_resultados_busca(termo_busca, arquivos_encontrados or [], constants, helpers)
-    
-    cache_manager.set(cache_key, resultado_final, duration_seconds=300)
+    itens = catalogo.registar(arquivos_encontrados or [])
+    cache_manager.set(cache_key, itens, duration_seconds=300)
     
-    return resultado_final
+    return _formatar_resultados_busca(termo_busca, itens, constants, helpers)
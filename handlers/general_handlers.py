@@ -5,32 +5,38 @@ o fluxo de aprendizado manual e o fallback para o serviço da OpenAI para
 perguntas gerais.
 """
 
-from typing import Dict, Any
+import asyncio
+from typing import Dict, Any, Optional
 from sqlalchemy.orm import Session
 
 from config import prompts
+from core.message_analysis import MessageAnalysis
+from database.models import ConhecimentoManual
+from database.fragment_cache import versao, versao_conhecimento
+from utils import helpers
 
-def handle_greetings(message: str, constants: Dict[str, Any]) -> str:
+def handle_greetings(message: str, constants: Dict[str, Any], analise: Optional[MessageAnalysis] = None) -> str:
     """
     Processa e responde a saudações.
 
     Args:
         message (str): A mensagem do usuário.
         constants (Dict[str, Any]): Dicionário com constantes, incluindo GREETING_WORDS.
+        analise (Optional[MessageAnalysis]): A análise da mensagem já feita pelo SofiaBrain.
 
     Returns:
         str: Uma resposta de saudação apropriada.
     """
-    message_lower = message.lower()
+    analise = analise or MessageAnalysis(message, constants)
     
     # Utiliza as constantes do arquivo de prompts
-    if any(phrase in message_lower for phrase in constants.get('WELLBEING_PHRASES', [])):
+    if analise.tem('WELLBEING_PHRASES'):
         return constants.get('GREETING_WELLBEING', "Olá! Tudo bem?")
         
     return constants.get('GREETING_DEFAULT', "Olá! Como posso ajudar?")
 
 
-async def handle_admin_commands(user_id: str, message: str, sharepoint_service: Any) -> str:
+async def handle_admin_commands(user_id: str, message: str, sharepoint_service: Any, contabilidade_memoria: Any = None) -> str:
     """
     Processa comandos administrativos, como diagnósticos.
 
@@ -38,28 +44,73 @@ async def handle_admin_commands(user_id: str, message: str, sharepoint_service:
         user_id (str): A ID do usuário.
         message (str): A mensagem do usuário.
         sharepoint_service (Any): A instância do serviço do SharePoint.
+        contabilidade_memoria (Any): A ContabilidadeMemoria, para o comando 'relatório de memória'.
 
     Returns:
         str: O resultado do comando administrativo.
     """
     message_lower = message.lower()
     
-    .
     if message_lower == "diagnosticar sharepoint":
          return await diagnosticar_sharepoint_completo(sharepoint_service)
+
+    if contabilidade_memoria is not None and "relatorio de memoria" in helpers.normalizar_texto(message):
+        relatorio = await asyncio.to_thread(contabilidade_memoria.relatorio)
+        return contabilidade_memoria.formatar(relatorio)
         
     return "Comando administrativo não reconhecido."
 
 
-def handle_learning(user_id: str, message: str, user_states: Dict[str, Any], constants: Dict[str, Any]) -> str:
+def _extrair_pergunta_ensinada(message: str, learning_triggers: list) -> str:
+    """Remove o gatilho de aprendizado (ex: 'quero te ensinar:') do início da pergunta."""
+    pergunta = message.strip()
+    pergunta_lower = pergunta.lower()
+    for trigger in learning_triggers:
+        if pergunta_lower.startswith(trigger):
+            pergunta = pergunta[len(trigger):].lstrip(" :,-")
+            break
+    return pergunta or message.strip()
+
+
+def _salvar_aprendizado(session_factory: Any, pergunta: str, resposta: str):
+    """Grava (ou atualiza) o par pergunta/resposta na tabela conhecimentos_manuais."""
+    db = session_factory()
+    try:
+        conhecimento = db.query(ConhecimentoManual).filter_by(pergunta=pergunta).first()
+        if conhecimento:
+            conhecimento.resposta = resposta
+        else:
+            db.add(ConhecimentoManual(pergunta=pergunta, resposta=resposta))
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+async def handle_learning(
+    user_id: str,
+    message: str,
+    user_states: Dict[str, Any],
+    constants: Dict[str, Any],
+    session_factory: Any = None,
+    indice_respostas: Any = None
+) -> str:
     """
     Gerencia o fluxo de aprendizado manual em múltiplos passos.
 
+    A gravação é feita numa thread, sem bloquear o event loop. O estado do
+    aprendizado só é limpo depois de a resposta ser gravada: se a gravação
+    falhar, a próxima mensagem do usuário volta a ser tratada como a resposta.
+
     Args:
         user_id (str): A ID do usuário.
         message (str): A mensagem do usuário.
         user_states (Dict[str, Any]): O dicionário de estados para rastrear o progresso.
         constants (Dict[str, Any]): Dicionário com constantes (LEARNING_STEPS, etc).
+        session_factory (Any): A fábrica de sessões usada para gravar o aprendizado.
+        indice_respostas (Any): O índice em memória das respostas aprendidas.
 
     Returns:
         str: A resposta apropriada para a etapa atual do aprendizado.
@@ -70,7 +121,7 @@ def handle_learning(user_id: str, message: str, user_states: Dict[str, Any], con
 
     # Inicia o fluxo de aprendizado
     if not aprendizado_ativo.get(user_id):
-        aprendizado_ativo[user_id] = {"pergunta": message}
+        aprendizado_ativo[user_id] = {"pergunta": _extrair_pergunta_ensinada(message, constants.get('LEARNING_TRIGGERS', []))}
         etapa_aprendizado[user_id] = learning_steps.get('resposta', 2)
         return constants.get('LEARNING_QUESTION_PROMPT', "Qual é a resposta?")
 
@@ -79,11 +130,25 @@ def handle_learning(user_id: str, message: str, user_states: Dict[str, Any], con
     if etapa_atual == learning_steps.get('resposta', 2):
         pergunta = aprendizado_ativo[user_id]["pergunta"]
         resposta_usuario = message
-        
-        mensagem_salva = f"Aprendido! Quando me perguntarem sobre '{pergunta}', responderei com '{resposta_usuario}'."
-        
+
+        try:
+            versao_antes = versao(ConhecimentoManual.__tablename__)
+            if session_factory:
+                await asyncio.to_thread(_salvar_aprendizado, session_factory, pergunta, resposta_usuario)
+            if indice_respostas is not None:
+                indice_respostas.adicionar(pergunta, resposta_usuario)
+                # O índice já tem esta resposta: se foi a única escrita desde que ele foi
+                # carregado, avança a sua versão em vez de o obrigar a recarregar
+                if indice_respostas.versao == versao_antes and versao(ConhecimentoManual.__tablename__) == versao_antes + 1:
+                    indice_respostas.versao = versao_antes + 1
+        except Exception as e:
+            print(f"❌ Erro ao gravar o aprendizado manual: {e}")
+            return constants.get('LEARNING_ERROR_RETRY', "Algo deu errado. Vamos tentar de novo.")
+
         del aprendizado_ativo[user_id]
         del etapa_aprendizado[user_id]
+
+        mensagem_salva = f"Aprendido! Quando me perguntarem sobre '{pergunta}', responderei com '{resposta_usuario}'."
         
         return mensagem_salva
         
@@ -97,23 +162,62 @@ async def handle_general_question(
     db_session: Any, 
     openai_service: Any, 
     conversation_history: Any,
-    constants: Dict[str, Any]
+    constants: Dict[str, Any],
+    indice_respostas: Any = None,
+    executor_bd: Any = None,
+    cache_respostas: Any = None
 ) -> str:
     """
     Lida com perguntas gerais, usando o conhecimento manual e, como fallback, a OpenAI.
+
+    A classificação do tom, o histórico e os fragmentos do prompt são preparados
+    em paralelo. Quando o executor_bd é indicado, o conhecimento do prompt é lido
+    da base de dados nas suas threads; caso contrário, usa o db_session numa
+    thread, sem bloquear o event loop.
+    Com o cache_respostas, perguntas iguais ou parecidas já respondidas (com o
+    mesmo tom e os mesmos dados) não voltam a chamar a OpenAI: o cache é
+    consultado assim que o tom chega, e a preparação do prompt ainda em curso
+    é cancelada.
     """
     # 1. Verifica se é uma pergunta já aprendida manualmente
-    resposta_manual = responder_com_aprendizados_manuais(message)
-    if resposta_manual:
-         return resposta_manual
+    if indice_respostas is not None:
+        resposta_manual = indice_respostas.procurar(message)
+        if resposta_manual:
+            return resposta_manual[0]
 
     # 2. Se não, processa com a OpenAI
     try:
-        tom = await openai_service.classificar_tom_mensagem(message)
-        
-        historico = conversation_history.format_for_prompt(user_id)
-  
-        system_prompt = prompts.gerar_system_prompt(db_session, historico, tom)
+        versao = versao_conhecimento()
+
+        async def _historico() -> str:
+            return conversation_history.format_for_prompt(user_id)
+
+        async def _fragmentos() -> list:
+            if executor_bd is not None:
+                return await prompts.gerar_fragmentos_async(executor_bd, message)
+            return await asyncio.to_thread(prompts.gerar_fragmentos, db_session, message)
+
+        # O tom, o histórico e os fragmentos do conhecimento são independentes: prepara-os em paralelo.
+        # O cache só precisa do tom; se ele já tiver a resposta, a preparação do prompt é cancelada.
+        preparacao = [asyncio.ensure_future(_historico()), asyncio.ensure_future(_fragmentos())]
+        try:
+            tom = await openai_service.classificar_tom_mensagem(message)
+            if cache_respostas is not None:
+                resposta_guardada = cache_respostas.procurar(message, tom, versao)
+                if resposta_guardada:
+                    print(f"♻️ Resposta reutilizada do cache (semelhança {resposta_guardada[1]:.2f}).")
+                    return resposta_guardada[0]
+            historico, fragmentos = await asyncio.gather(*preparacao)
+        finally:
+            for tarefa in preparacao:
+                if not tarefa.done():
+                    tarefa.cancel()
+                elif not tarefa.cancelled():
+                    # Lê o erro de uma preparação que já não é usada, para não ficar por tratar
+                    tarefa.exception()
+
+        # Só o sufixo (data, tom e histórico) depende do tom
+        system_prompt = prompts.completar_system_prompt(fragmentos, historico, tom)
 
         resposta_openai = await openai_service.gerar_resposta_geral(
             user_message=message,
@@ -122,6 +226,8 @@ async def handle_general_question(
             tom=tom
         )
         
+        if resposta_openai and cache_respostas is not None:
+            cache_respostas.guardar(message, tom, versao, resposta_openai)
         return resposta_openai or constants.get('OPENAI_FALLBACK_MESSAGE')
 
     except Exception as e:
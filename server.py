@@ -0,0 +1,153 @@
+"""
+Ponto de entrada da Sofia em modo servidor.
+
+Expõe um pequeno servidor HTTP (apenas biblioteca padrão) com:
+- POST /mensagem: recebe {"user_id", "mensagem", "nome_usuario"} e devolve {"resposta"}.
+- GET /health/live: indica que o processo está vivo.
+- GET /health/ready: devolve 200 só depois do aquecimento dos boards (503 antes),
+  para que o load balancer só encaminhe tráfego para instâncias prontas.
+- GET /metrics: métricas internas (pool de sessões da base de dados, tamanho dos prompts, cache de respostas, serviços externos, espera em cada faixa).
+
+Com --workers N (ou SERVER_WORKERS) > 1, o processo principal passa a ser
+apenas a frente: os pedidos são encaminhados pelo hash do user_id para N
+processos worker, que partilham o cache (boards, pesquisas) através do
+ficheiro SQLite SHARED_CACHE_DB. Só o primeiro worker aquece os boards.
+
+Com MEMORY_REPORT_INTERVAL > 0, um relatório de memória por componente é
+acrescentado periodicamente ao ficheiro MEMORY_REPORT_PATH (JSONL).
+"""
+
+import argparse
+import asyncio
+import json
+from typing import Dict, Any, Optional, Tuple
+
+from brain import SofiaBrain
+from config import constants, prompts
+from core.worker_pool import FrenteWorkers, iniciar_workers, ler_pedido, resposta_http
+
+
+async def _tratar_pedido(sofia: SofiaBrain, metodo: str, caminho: str, corpo: bytes) -> Tuple[int, Dict[str, Any]]:
+    """Encaminha o pedido HTTP para a rota correspondente."""
+    if metodo == 'GET' and caminho == '/health/live':
+        return 200, {'vivo': True}
+
+    if metodo == 'GET' and caminho == '/health/ready':
+        resumo = sofia.estado_aquecimento.resumo()
+        return (200 if resumo['pronto'] else 503), resumo
+
+    if metodo == 'GET' and caminho == '/metrics':
+        return 200, {
+            'sessoes_leitura': sofia.sessoes_leitura.metricas(),
+            'prompts': prompts.montador_prompt.metricas(),
+            'cache_respostas': sofia.cache_respostas.metricas(),
+            'servicos_externos': {nome: cliente.metricas() for nome, cliente in sofia.clientes_externos.items()},
+            'faixas': sofia.escalonador.metricas(),
+        }
+
+    if metodo == 'POST' and caminho == '/mensagem':
+        try:
+            dados = json.loads(corpo or b'{}')
+            user_id = str(dados['user_id'])
+            mensagem = str(dados['mensagem'])
+        except (ValueError, KeyError) as e:
+            return 400, {'erro': f"Pedido inválido: {e}"}
+        resposta = await sofia.responder(user_id, mensagem, dados.get('nome_usuario', "Usuário"))
+        return 200, {'resposta': resposta}
+
+    return 404, {'erro': f"Rota não encontrada: {metodo} {caminho}"}
+
+
+def _iniciar_tarefa(sofia: SofiaBrain, corrotina: Any, nome: str) -> asyncio.Task:
+    """Cria uma tarefa de fundo guardada na Sofia (para não ser recolhida) e regista as suas falhas."""
+    tarefa = asyncio.create_task(corrotina, name=nome)
+    sofia.tarefas_fundo.append(tarefa)
+
+    def _terminada(t: asyncio.Task):
+        if not t.cancelled() and t.exception() is not None:
+            print(f"❌ Tarefa de fundo '{nome}' terminou com erro: {t.exception()!r}")
+    tarefa.add_done_callback(_terminada)
+    return tarefa
+
+
+async def _cancelar_tarefas(sofia: SofiaBrain):
+    """Cancela as tarefas de fundo e espera que terminem."""
+    for tarefa in sofia.tarefas_fundo:
+        tarefa.cancel()
+    await asyncio.gather(*sofia.tarefas_fundo, return_exceptions=True)
+    sofia.tarefas_fundo.clear()
+
+
+async def iniciar_servidor(host: str, port: int, aquecer: bool, app_constants: Optional[Dict[str, Any]] = None, acompanhar_aquecimento: bool = False):
+    """
+    Cria a Sofia, inicia o aquecimento em segundo plano e começa a aceitar ligações.
+
+    Com acompanhar_aquecimento, a Sofia não aquece; fica pronta quando o aquecimento
+    feito por outro worker (publicado no cache partilhado) ficar pronto.
+    """
+    sofia = SofiaBrain(app_constants=app_constants or vars(constants))
+
+    if aquecer:
+        _iniciar_tarefa(sofia, sofia.aquecer(), 'aquecimento')
+        intervalo = sofia.constants.get('BOARDS_WARMUP_INTERVAL', 0)
+        if intervalo:
+            _iniciar_tarefa(sofia, sofia.manter_aquecido(intervalo), 'reaquecimento')
+    elif acompanhar_aquecimento:
+        _iniciar_tarefa(sofia, sofia.acompanhar_aquecimento(), 'acompanhar_aquecimento')
+    else:
+        sofia.estado_aquecimento.pronto = True
+
+    intervalo_memoria = sofia.constants.get('MEMORY_REPORT_INTERVAL', 0)
+    if intervalo_memoria:
+        _iniciar_tarefa(sofia, sofia.memoria.registar_periodicamente(sofia.constants.get('MEMORY_REPORT_PATH', 'memory_usage.jsonl'), intervalo_memoria), 'relatorio_memoria')
+
+    async def _ligacao(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            metodo, caminho, corpo = await ler_pedido(reader)
+            status, dados = await _tratar_pedido(sofia, metodo, caminho, corpo)
+            writer.write(resposta_http(status, dados))
+            await writer.drain()
+        except Exception as e:
+            print(f"❌ Erro ao tratar pedido HTTP: {e}")
+        finally:
+            writer.close()
+
+    servidor = await asyncio.start_server(_ligacao, host, port)
+    print(f"🌐 Sofia a ouvir em http://{host}:{port}")
+    try:
+        async with servidor:
+            await servidor.serve_forever()
+    finally:
+        await _cancelar_tarefas(sofia)
+
+
+def _executar_worker(indice: int, porta: int, aquecer: bool, cache_partilhado: str):
+    """Processo worker: uma Sofia completa na porta interna, com o cache partilhado."""
+    app_constants = dict(vars(constants), SHARED_CACHE_DB=cache_partilhado)
+    try:
+        # Só o primeiro worker aquece os boards; os restantes recebem-nos pelo cache partilhado
+        # e só ficam prontos quando o aquecimento do primeiro, publicado nesse cache, ficar pronto
+        asyncio.run(iniciar_servidor('127.0.0.1', porta, aquecer and indice == 0, app_constants, acompanhar_aquecimento=aquecer and indice > 0))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sofia em modo servidor.")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--sem-aquecimento", action="store_true", help="Não pré-carrega os boards no arranque.")
+    parser.add_argument("--workers", type=int, default=constants.SERVER_WORKERS, help="Número de processos worker (1 = processo único).")
+    args = parser.parse_args()
+
+    aquecer = constants.BOARDS_WARMUP_ENABLED and not args.sem_aquecimento
+    try:
+        if args.workers > 1:
+            cache_partilhado = constants.SHARED_CACHE_DB or "shared_cache.db"
+            iniciar_workers(_executar_worker, args.workers, constants.SERVER_WORKER_BASE_PORT, aquecer, cache_partilhado)
+            portas = [constants.SERVER_WORKER_BASE_PORT + i for i in range(args.workers)]
+            asyncio.run(FrenteWorkers(portas).servir(args.host, args.port))
+        else:
+            asyncio.run(iniciar_servidor(args.host, args.port, aquecer))
+    except KeyboardInterrupt:
+        print("\nServidor interrompido.")
@@ -0,0 +1,53 @@
+import pytest
+
+from core.answer_cache import CacheRespostas
+
+
+@pytest.fixture
+def cache():
+    cache = CacheRespostas(limiar_semelhanca=0.8, palavras_excluidas=["hoje"])
+    cache.guardar("O projeto Atlas está ativo?", "neutro", 1, "Sim, está ativo.")
+    cache.guardar("Quem é o gerente do projeto Atlas?", "neutro", 1, "A Ana.")
+    return cache
+
+
+def test_hit_exato(cache):
+    assert cache.procurar("o projeto atlas esta ativo", "neutro", 1) == ("Sim, está ativo.", 1.0)
+
+
+def test_hit_semelhante_com_palavras_de_ligacao_diferentes(cache):
+    resposta, semelhanca = cache.procurar("quem é gerente no projeto atlas", "neutro", 1)
+    assert resposta == "A Ana."
+    assert semelhanca >= 0.8
+
+
+def test_negacao_nao_reutiliza_resposta(cache):
+    assert cache.procurar("o projeto atlas não está ativo", "neutro", 1) is None
+
+
+def test_entidade_trocada_nao_reutiliza_resposta(cache):
+    assert cache.procurar("Quem é o gerente do projeto Orion?", "neutro", 1) is None
+
+
+def test_tom_e_versao_diferentes_sao_misses(cache):
+    assert cache.procurar("O projeto Atlas está ativo?", "irritado", 1) is None
+    assert cache.procurar("O projeto Atlas está ativo?", "neutro", 2) is None
+
+
+def test_perguntas_dependentes_da_data_nao_sao_guardadas(cache):
+    cache.guardar("quem está de férias hoje", "neutro", 1, "Ninguém.")
+    assert cache.procurar("quem está de férias hoje", "neutro", 1) is None
+    assert cache.metricas()['excluidas'] == 1
+
+
+def test_guardar_atrasado_com_versao_antiga_nao_apaga_o_cache(cache):
+    # Os dados mudaram: um pedido novo já procurou com a versão 2 e guardou a sua resposta
+    assert cache.procurar("O projeto Atlas está ativo?", "neutro", 2) is None
+    cache.guardar("O projeto Atlas está ativo?", "neutro", 2, "Não, foi encerrado.")
+
+    # Um pedido lento, iniciado antes da mudança, termina com a versão 1
+    cache.guardar("Quem é o gerente do projeto Atlas?", "neutro", 1, "A Ana.")
+
+    assert cache.procurar("O projeto Atlas está ativo?", "neutro", 2) == ("Não, foi encerrado.", 1.0)
+    assert cache.procurar("Quem é o gerente do projeto Atlas?", "neutro", 2) is None
+    assert cache.metricas()['entradas'] == 1
@@ -0,0 +1,50 @@
+import pytest
+
+from core.answer_index import IndiceRespostas, semelhanca_palavras, palavras_relevantes, normalizar_pergunta
+
+
+@pytest.fixture
+def indice():
+    indice = IndiceRespostas(limiar_semelhanca=0.8)
+    indice.adicionar("Qual a senha do wifi?", "A senha do wifi é sofia123.")
+    indice.adicionar("Qual o horário do almoço?", "O almoço é às 12h.")
+    indice.adicionar("O projeto Atlas está ativo?", "Sim")
+    return indice
+
+
+def _palavras(pergunta):
+    return palavras_relevantes(normalizar_pergunta(pergunta))
+
+
+def test_pergunta_exata_ignora_acentos_e_pontuacao(indice):
+    assert indice.procurar("qual a senha do WIFI") == ("A senha do wifi é sofia123.", 1.0)
+
+
+def test_aceita_erro_de_digitacao(indice):
+    resposta, semelhanca = indice.procurar("qual o horaro do almoço")
+    assert resposta == "O almoço é às 12h."
+    assert 0.8 <= semelhanca < 1.0
+
+
+@pytest.mark.parametrize("pergunta", [
+    "qual a senha do email",
+    "qual o horario do lanche",
+    "o projeto atlas não está ativo?",
+    "o projeto orion está ativo?",
+])
+def test_rejeita_perguntas_quase_iguais(indice, pergunta):
+    assert indice.procurar(pergunta) is None
+
+
+def test_palavra_extra_relevante_nao_corresponde():
+    assert semelhanca_palavras(_palavras("o projeto atlas está ativo"), _palavras("o projeto atlas está ativo em lisboa")) == 0.0
+
+
+def test_prefixo_diferente_nao_e_erro_de_digitacao():
+    assert semelhanca_palavras(_palavras("o projeto está ativo"), _palavras("o projeto está inativo")) == 0.0
+
+
+def test_adicionar_atualiza_resposta(indice):
+    indice.adicionar("qual a senha do wifi", "Nova senha.")
+    assert indice.procurar("Qual a senha do wifi?")[0] == "Nova senha."
+    assert len(indice) == 3
@@ -0,0 +1,56 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+from batch import Checkpoint, processar_ficheiro
+
+
+class _SofiaFalsa:
+    def __init__(self):
+        self.mensagens = []
+
+    async def processar(self, user_id, mensagem, nome_usuario):
+        self.mensagens.append(mensagem)
+        await asyncio.sleep(0)
+        return SimpleNamespace(texto=f"ok: {mensagem}", intencao="general", duracao_ms=1.0)
+
+
+def test_checkpoint_avanca_a_contigua_e_guarda_as_linhas_fora_de_ordem(tmp_path):
+    caminho = str(tmp_path / "saida.checkpoint")
+    checkpoint = Checkpoint(caminho)
+    for linha in (1, 3, 4):
+        checkpoint.marcar(linha)
+    assert (checkpoint.contigua, checkpoint.acima) == (1, {3, 4})
+
+    relido = Checkpoint(caminho)
+    assert [relido.concluida(l) for l in range(1, 6)] == [True, False, True, True, False]
+    relido.marcar(2)
+    assert (relido.contigua, relido.acima) == (4, set())
+
+
+def test_retoma_apenas_as_linhas_por_concluir(tmp_path):
+    entrada, saida = tmp_path / "entrada.jsonl", tmp_path / "saida.jsonl"
+    entrada.write_text("\n".join(json.dumps({'mensagem': f"m{i}", 'user_id': f"u{i % 2}"}) for i in range(1, 6)) + "\n", encoding="utf-8")
+    saida.write_text(json.dumps({'linha': 1}) + "\n" + json.dumps({'linha': 3}) + "\n", encoding="utf-8")
+    checkpoint = Checkpoint(str(saida) + ".checkpoint")
+    checkpoint.marcar(1)
+    checkpoint.marcar(3)
+
+    sofia = _SofiaFalsa()
+    estatisticas = asyncio.run(processar_ficheiro(sofia, str(entrada), str(saida), concorrencia=2))
+
+    assert sorted(sofia.mensagens) == ["m2", "m4", "m5"]
+    assert estatisticas == {'processadas': 3, 'erros': 0, 'ja_concluidas': 2}
+    linhas = [json.loads(l)['linha'] for l in saida.read_text(encoding="utf-8").splitlines()]
+    assert sorted(linhas) == [1, 2, 3, 4, 5]
+    assert Checkpoint(str(saida) + ".checkpoint").contigua == 5
+
+
+def test_recomecar_ignora_o_checkpoint(tmp_path):
+    entrada, saida = tmp_path / "entrada.jsonl", tmp_path / "saida.jsonl"
+    entrada.write_text(json.dumps({'mensagem': "m1"}) + "\n", encoding="utf-8")
+    Checkpoint(str(saida) + ".checkpoint").marcar(1)
+
+    sofia = _SofiaFalsa()
+    asyncio.run(processar_ficheiro(sofia, str(entrada), str(saida), recomecar=True))
+    assert sofia.mensagens == ["m1"]
@@ -0,0 +1,58 @@
+import json
+
+from benchmarks import suite
+
+
+def _resultados(medianas):
+    return {'resultados': {nome: {'mediana_us': valor, 'min_us': valor, 'execucoes': 1} for nome, valor in medianas.items()}}
+
+
+def test_medir_calibra_as_execucoes_e_devolve_mediana_e_minimo():
+    chamadas = []
+
+    medicao = suite.medir(lambda: chamadas.append(1), repeticoes=3, tempo_minimo=0.001)
+
+    assert set(medicao) == {'mediana_us', 'min_us', 'execucoes'}
+    assert medicao['execucoes'] > 1
+    assert 0 < medicao['min_us'] <= medicao['mediana_us']
+    # Aquecimento + calibração + repetições
+    assert len(chamadas) > 3 * medicao['execucoes']
+
+
+def test_executar_corre_so_os_casos_filtrados(tmp_path):
+    # O filtro de cache não abre a base de dados, por isso o caminho não precisa de existir
+    atual = suite.executar("cache.get", caminho_db=str(tmp_path / "inexistente.db"), repeticoes=1, tempo_minimo=0.001)
+
+    assert list(atual['resultados']) == ["cache.get_10k"]
+    assert {'gerado_em', 'python', 'plataforma'} <= set(atual)
+
+    caminho = tmp_path / "resultados.json"
+    suite._escrever_json(str(caminho), atual)
+    assert suite._ler_json(str(caminho)) == json.loads(caminho.read_text(encoding="utf-8")) == atual
+    assert suite._ler_json(str(tmp_path / "sem_baseline.json")) is None
+
+
+def test_comparar_assinala_regressoes_acima_do_limiar(capsys):
+    baseline = _resultados({"cache.get_10k": 100.0, "cache.set_10k": 100.0})
+    atual = _resultados({"cache.get_10k": 130.0, "cache.set_10k": 120.0, "cache.cleanup_10k": 50.0})
+
+    regressoes = suite.comparar(atual, baseline, limiar=0.25)
+
+    assert regressoes == ["cache.get_10k"]
+    saida = capsys.readouterr().out
+    assert "❌ regressão" in saida and "novo" in saida
+
+
+def test_limiar_do_caso_prevalece_sobre_o_global():
+    # boards.snapshot_1k está registado com limiar de 0.5
+    baseline = _resultados({"boards.snapshot_1k": 100.0, "boards.tarefas_1k": 100.0})
+    atual = _resultados({"boards.snapshot_1k": 140.0, "boards.tarefas_1k": 140.0})
+
+    assert suite.comparar(atual, baseline, limiar=0.25) == ["boards.tarefas_1k"]
+
+
+def test_casos_registados_tem_nomes_unicos():
+    nomes = [c.nome for c in suite.CASOS]
+
+    assert len(nomes) == len(set(nomes))
+    assert {"boards.consulta_100k", "prompts.gerar_system_prompt_frio"} <= set(nomes)
@@ -0,0 +1,40 @@
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from core.board_history import HistoricoBoards
+
+
+def _snapshot(criado_em, total, projeto="Sonar"):
+    return SimpleNamespace(
+        projeto=projeto, criado_em=criado_em, total=total,
+        contagem_por_grupo_estado={'concluido': total // 2}, contagem_por_estado={},
+        contagem_por_tipo={}, contagem_por_responsavel={},
+    )
+
+
+def test_guarda_um_registo_por_projeto_e_hora(tmp_path):
+    historico = HistoricoBoards(str(tmp_path / "historico.db"))
+    hora = datetime.now().replace(minute=0, second=0, microsecond=0) - timedelta(hours=2)
+    historico.registar(_snapshot(hora + timedelta(minutes=5), 10))
+    historico.registar(_snapshot(hora + timedelta(minutes=40), 12))
+    historico.registar(_snapshot(hora + timedelta(minutes=50), 3, projeto="Labs"))
+    historico.registar(_snapshot(hora + timedelta(hours=1, minutes=1), 14))
+
+    assert [r['total'] for r in historico.registos("Sonar", 1)] == [12, 14]
+    assert [r['total'] for r in historico.registos("Labs", 1)] == [3]
+    historico.fechar()
+
+
+def test_apaga_registos_fora_da_retencao(tmp_path):
+    caminho = str(tmp_path / "historico.db")
+    historico = HistoricoBoards(caminho, retencao_dias=0)
+    historico.registar(_snapshot(datetime.now() - timedelta(days=40), 5))
+    historico.registar(_snapshot(datetime.now() - timedelta(days=1), 7))
+    historico.fechar()
+
+    historico = HistoricoBoards(caminho, retencao_dias=30)
+    assert [r['total'] for r in historico.registos("Sonar", 60)] == [7]
+
+    historico.registar(_snapshot(datetime.now() - timedelta(days=31), 6))
+    assert [r['total'] for r in historico.registos("Sonar", 60)] == [7]
+    historico.fechar()
@@ -0,0 +1,58 @@
+import pandas as pd
+
+from config import constants as app_constants
+from core import board_query
+from core.board_snapshot import BoardSnapshot
+
+CONSTANTES = {nome: getattr(app_constants, nome) for nome in dir(app_constants) if nome.isupper()}
+
+
+def _snapshot():
+    df = pd.DataFrame({
+        'id': range(4),
+        'tipo': ["Bug", "Task", "Task", "Bug"],
+        'estado': ["Active", "New", "Done", "Active"],
+        'responsavel': ["João Sá", "João Sá", "Maria Lopes", "Maria Lopes"],
+        'cliente': ["Sonar Labs", "Acme", "Acme", "Sonar Labs"],
+    })
+    return BoardSnapshot("Sonar", df, CONSTANTES)
+
+
+def test_colaborador_com_estado_nao_e_composta():
+    consulta = board_query.interpretar_pergunta("tarefas em andamento do joao", _snapshot(), CONSTANTES, "João Sá")
+    assert consulta.grupo_estado == "em andamento"
+    assert consulta.responsavel == "João Sá"
+    assert not consulta.composta
+
+
+def test_colaborador_com_outro_filtro_e_composta():
+    snapshot = _snapshot()
+    assert board_query.interpretar_pergunta("quantos bugs do joao", snapshot, CONSTANTES, "João Sá").composta
+    assert board_query.interpretar_pergunta("tarefas do joao no sonar labs", snapshot, CONSTANTES, "João Sá").composta
+
+
+def test_interpreta_tipo_estado_e_contagem():
+    consulta = board_query.interpretar_pergunta("Quantos bugs em andamento?", _snapshot(), CONSTANTES)
+    assert (consulta.tipo, consulta.grupo_estado, consulta.operacao) == ("bug", "em andamento", "contar")
+    assert consulta.composta
+
+
+def test_palavra_generica_so_e_tipo_depois_de_quantos():
+    snapshot = _snapshot()
+    assert board_query.interpretar_pergunta("quais as tarefas a fazer", snapshot, CONSTANTES).tipo is None
+    assert board_query.interpretar_pergunta("quantas tarefas a fazer", snapshot, CONSTANTES).tipo == "task"
+
+
+def test_interpreta_cliente_e_agrupamento():
+    snapshot = _snapshot()
+    consulta = board_query.interpretar_pergunta("bugs do cliente sonar labs", snapshot, CONSTANTES)
+    assert (consulta.tipo, consulta.cliente) == ("bug", "Sonar Labs")
+
+    consulta = board_query.interpretar_pergunta("itens concluídos por responsável", snapshot, CONSTANTES)
+    assert (consulta.operacao, consulta.agrupar_por, consulta.grupo_estado) == ("agrupar", "responsavel", "concluido")
+    assert consulta.composta
+
+
+def test_filtro_unico_nao_e_composta():
+    consulta = board_query.interpretar_pergunta("bugs do board", _snapshot(), CONSTANTES)
+    assert consulta.tipo == "bug" and not consulta.composta
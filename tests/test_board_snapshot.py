@@ -0,0 +1,99 @@
+import pandas as pd
+
+from config import constants as app_constants
+from core import board_query
+from core.board_snapshot import BoardSnapshot
+
+CONSTANTES = {nome: getattr(app_constants, nome) for nome in dir(app_constants) if nome.isupper()}
+
+
+def _snapshot(responsaveis):
+    df = pd.DataFrame({
+        'id': range(len(responsaveis)),
+        'tipo': ["Task"] * len(responsaveis),
+        'estado': ["Active"] * len(responsaveis),
+        'responsavel': responsaveis,
+    })
+    return BoardSnapshot("Sonar", df, CONSTANTES)
+
+
+def test_primeiro_nome_pesa_mais_do_que_o_apelido():
+    snapshot = _snapshot(["Ana Costa", "Rui Ana"])
+    assert snapshot.identificar_responsavel({"ana"}) == "Ana Costa"
+
+
+def test_so_o_apelido_identifica_o_colaborador():
+    snapshot = _snapshot(["João Pedro da Silva", "Maria Lopes"])
+    assert snapshot.identificar_responsavel({"silva"}) == "João Pedro da Silva"
+    assert snapshot.identificar_responsavel({"pedro"}) == "João Pedro da Silva"
+    # Partículas como 'da' não são indexadas
+    assert snapshot.identificar_responsavel({"da"}) is None
+
+
+def test_nome_e_apelido_desfazem_a_ambiguidade():
+    snapshot = _snapshot(["Ana Costa", "Ana Ferreira", "Ana Ferreira"])
+    assert snapshot.identificar_responsavel({"ana", "costa"}) == "Ana Costa"
+
+
+def test_empate_prefere_o_ultimo_consultado_e_depois_o_com_mais_tarefas():
+    snapshot = _snapshot(["Ana Costa", "Ana Ferreira", "Ana Ferreira"])
+    assert snapshot.identificar_responsavel({"ana"}) == "Ana Ferreira"
+    assert snapshot.identificar_responsavel({"ana"}, preferido="Ana Costa") == "Ana Costa"
+    # Um preferido que não está entre os empatados é ignorado
+    assert snapshot.identificar_responsavel({"ana"}, preferido="Maria Lopes") == "Ana Ferreira"
+
+
+def _snapshot_com_epicos():
+    df = pd.DataFrame({
+        'id': [10, 11, 12, 13],
+        'tipo': ["Bug", "Task", "Bug", "Task"],
+        'estado': ["Active", "New", "Active", "Done"],
+        'responsavel': ["Ana Costa", "Rui Sá", "Rui Sá", "Ana Costa"],
+        'epico': ["E1", "E1", "E2", None],
+        'cliente': ["Acme", "Acme", "Sonar Labs", None],
+    }, index=[7, 3, 9, 1])
+    return BoardSnapshot("Sonar", df, CONSTANTES)
+
+
+def test_vista_sem_epicos_tira_so_as_colunas_dos_epicos():
+    snapshot = _snapshot_com_epicos()
+    vista = snapshot.visao(com_epicos=False)
+
+    assert set(CONSTANTES['BOARD_EPIC_COLUMNS']).isdisjoint(vista.columns)
+    assert list(vista.columns) == ['id', 'tipo', 'estado', 'responsavel']
+    assert snapshot.visao(com_epicos=True) is snapshot.df
+    assert snapshot.visao(com_epicos=False) is vista
+
+
+def test_vista_sem_epicos_mantem_as_posicoes_das_consultas():
+    snapshot = _snapshot_com_epicos()
+    consulta = board_query.ConsultaBoard()
+    consulta.tipo = "bug"
+    consulta.responsavel = "Rui Sá"
+
+    com_epicos = board_query.executar_consulta(snapshot, consulta, com_epicos=True)
+    sem_epicos = board_query.executar_consulta(snapshot, consulta, com_epicos=False)
+    assert list(com_epicos['id']) == list(sem_epicos['id']) == [12]
+    assert list(snapshot.tarefas("Ana Costa", com_epicos=False)['id']) == [10, 13]
+
+
+def test_contagens_pre_calculadas_batem_com_o_dataframe():
+    snapshot = _snapshot_com_epicos()
+    df = snapshot.df
+
+    assert snapshot.total == 4
+    assert snapshot.contagem_por_tipo == {"bug": 2, "task": 2}
+    assert snapshot.contar_tipo("Bug") == 2
+    assert snapshot.contagem_por_responsavel == df['responsavel'].value_counts().to_dict()
+    assert snapshot.contagem_por_grupo_estado == {"em andamento": 2, "a fazer": 1, "concluido": 1}
+    assert snapshot.cliente_com_mais_atividades == ("Acme", 2)
+    assert snapshot.responsavel_com_mais_tarefas[1] == 2
+
+
+def test_linhas_por_responsavel_e_estado():
+    snapshot = _snapshot_com_epicos()
+    assert list(snapshot.linhas("Rui Sá", "em andamento")) == [2]
+    assert list(snapshot.linhas(grupo_estado="a fazer")) == [1]
+    assert list(snapshot.linhas()) == [0, 1, 2, 3]
+    assert list(snapshot.tarefas("Rui Sá")['id']) == [11, 12]
+    assert snapshot.tarefas("Ninguém").empty
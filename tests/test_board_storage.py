@@ -0,0 +1,38 @@
+import pandas as pd
+
+from core.board_storage import compactar_board_df
+
+CONSTANTES = {'BOARD_DATE_COLUMNS': ["data_criacao", "data_alteracao"], 'BOARD_CATEGORY_MAX_RATIO': 0.5}
+
+
+def _df(datas):
+    return pd.DataFrame({
+        'id': range(4),
+        'estado': ["Active", "Active", "Done", "New"],
+        'area_path': ["Sonar\\Web"] * 4,
+        'data_criacao': datas,
+    })
+
+
+def test_nao_descarta_colunas():
+    compacto, _ = compactar_board_df(_df(["2024-01-01T10:00:00"] * 4), CONSTANTES)
+    assert list(compacto.columns) == ['id', 'estado', 'area_path', 'data_criacao']
+    assert compacto['area_path'].dtype == 'category'
+
+
+def test_datas_sem_fuso_continuam_sem_fuso():
+    compacto, _ = compactar_board_df(_df(["2024-01-01T10:00:00", "2024-02-01T08:30:00", None, "2024-03-01"]), CONSTANTES)
+    assert pd.api.types.is_datetime64_dtype(compacto['data_criacao'])
+    assert compacto['data_criacao'].dt.tz is None
+    assert compacto['data_criacao'].iloc[0] < pd.Timestamp("2024-01-02")
+
+
+def test_datas_com_fuso_mantem_o_fuso():
+    compacto, _ = compactar_board_df(_df(["2024-01-01T10:00:00Z"] * 4), CONSTANTES)
+    assert str(compacto['data_criacao'].dt.tz) == "UTC"
+
+
+def test_fusos_misturados_ficam_como_estavam():
+    datas = ["2024-01-01T10:00:00+01:00", "2024-01-01T10:00:00-03:00", "2024-01-01T10:00:00Z", "2024-01-01T10:00:00"]
+    compacto, _ = compactar_board_df(_df(datas), CONSTANTES)
+    assert list(compacto['data_criacao']) == datas
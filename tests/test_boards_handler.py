@@ -0,0 +1,73 @@
+import asyncio
+import threading
+from types import SimpleNamespace
+
+import pandas as pd
+
+from benchmarks.fake_services import AzureBoardsFalso
+from config import constants as app_constants
+from core.board_history import HistoricoBoards
+from core.cache import CacheManager
+from handlers import boards_handler
+
+CONSTANTES = {nome: getattr(app_constants, nome) for nome in dir(app_constants) if nome.isupper()}
+
+
+class HistoricoComThreads(HistoricoBoards):
+    """Regista a thread de cada acesso ao SQLite do histórico."""
+    def __init__(self, caminho_db):
+        super().__init__(caminho_db)
+        self.threads = []
+
+    def registar(self, snapshot):
+        self.threads.append(threading.current_thread())
+        super().registar(snapshot)
+
+    def registos(self, projeto, dias):
+        self.threads.append(threading.current_thread())
+        return super().registos(projeto, dias)
+
+
+async def _processar_work_items_df(work_items, projeto, buscar_epicos):
+    return pd.DataFrame({
+        'id': [w['id'] for w in work_items],
+        'titulo': [w['fields']['System.Title'] for w in work_items],
+        'estado': [w['fields']['System.State'] for w in work_items],
+        'responsavel': ["Maria Silva"] * len(work_items),
+    })
+
+
+def test_atualizacao_regista_o_historico_fora_do_event_loop(tmp_path):
+    historico = HistoricoComThreads(str(tmp_path / "historico.db"))
+    processamento = SimpleNamespace(processar_work_items_df=_processar_work_items_df)
+    cache = CacheManager(600, -1)
+
+    async def _correr():
+        snapshot = await boards_handler._get_boards_data(
+            "Sonar", cache, AzureBoardsFalso, processamento, CONSTANTES, historico_boards=historico
+        )
+        return snapshot, threading.current_thread()
+
+    snapshot, thread_loop = asyncio.run(_correr())
+
+    assert snapshot.total == AzureBoardsFalso.total_work_items
+    assert len(historico.threads) == 1 and historico.threads[0] is not thread_loop
+    assert [r['total'] for r in historico.registos("Sonar", 1)] == [snapshot.total]
+    historico.fechar()
+
+
+def test_pergunta_de_burndown_le_o_historico_fora_do_event_loop(tmp_path):
+    historico = HistoricoComThreads(str(tmp_path / "historico.db"))
+
+    async def _correr():
+        resposta = await boards_handler.handle_boards_analysis(
+            "u1", "como está o burndown do sonar?", {}, CacheManager(600, -1), CONSTANTES,
+            AzureBoardsFalso, None, historico_boards=historico
+        )
+        return resposta, threading.current_thread()
+
+    resposta, thread_loop = asyncio.run(_correr())
+
+    assert resposta
+    assert historico.threads and all(t is not thread_loop for t in historico.threads)
+    historico.fechar()
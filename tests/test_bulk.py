@@ -0,0 +1,40 @@
+import sqlite3
+
+import pytest
+
+from database import bulk, fragment_cache, models
+from database.session import criar_engine
+
+
+@pytest.fixture
+def engine(tmp_path, monkeypatch):
+    for nome, valor in (('_engine', None), ('_persistidas', {}), ('_locais', {}), ('_lidas_em', float('-inf'))):
+        monkeypatch.setattr(fragment_cache, nome, valor)
+    engine = criar_engine(f"sqlite:///{tmp_path / 'sofia.db'}")
+    models.Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+
+def test_importacao_grava_versao_na_base_de_dados(engine, tmp_path):
+    ficheiro = tmp_path / "projetos.csv"
+    ficheiro.write_text("nome,descricao,status\nAtlas,Portal,Ativo\nOrion,App,Pausado\n", encoding="utf-8")
+
+    resultado = bulk.importar_ficheiro(engine, 'projetos', str(ficheiro))
+
+    assert resultado['inseridas'] == 2
+    conexao = sqlite3.connect(tmp_path / 'sofia.db')
+    versao = conexao.execute("SELECT versao FROM versoes_tabelas WHERE tabela = 'projetos'").fetchone()
+    conexao.close()
+    assert versao == (1,)
+
+
+def test_reimportacao_atualiza_em_vez_de_duplicar(engine, tmp_path):
+    ficheiro = tmp_path / "projetos.jsonl"
+    ficheiro.write_text('{"nome": "Atlas", "status": "Ativo"}\n', encoding="utf-8")
+    bulk.importar_ficheiro(engine, 'projetos', str(ficheiro))
+    ficheiro.write_text('{"nome": "Atlas", "status": "Pausado"}\n', encoding="utf-8")
+
+    resultado = bulk.importar_ficheiro(engine, 'projetos', str(ficheiro))
+
+    assert (resultado['inseridas'], resultado['atualizadas']) == (0, 1)
@@ -0,0 +1,39 @@
+from core.file_catalog import CatalogoArquivos, ItemArquivo
+
+
+def _arquivo(identificador, nome="Relatorio.docx"):
+    return {'id': identificador, 'name': nome, 'webUrl': f"https://exemplo.sharepoint.com/{identificador}"}
+
+
+def test_o_mesmo_arquivo_e_reutilizado_entre_buscas_e_listagens():
+    catalogo = CatalogoArquivos()
+    busca = catalogo.registar([_arquivo("a"), _arquivo("b")])
+    listagem = catalogo.registar([dict(_arquivo("b")), _arquivo("c")])
+
+    assert listagem[0] is busca[1]
+    assert len(catalogo) == 3
+
+
+def test_itens_vindos_de_outro_processo_passam_a_ser_os_do_catalogo():
+    catalogo = CatalogoArquivos()
+    (local,) = catalogo.registar([_arquivo("a")])
+    (recebido,) = catalogo.registar([ItemArquivo(_arquivo("a"))])
+    assert recebido is local
+
+
+def test_arquivo_alterado_atualiza_o_item_e_esquece_a_formatacao():
+    catalogo = CatalogoArquivos()
+    (item,) = catalogo.registar([_arquivo("a")])
+    item._data = "01/01/2024 10:00"
+    (atualizado,) = catalogo.registar([_arquivo("a", nome="Relatorio_v2.docx")])
+
+    assert atualizado is item
+    assert item.nome == "Relatorio_v2.docx" and item._data is None
+
+
+def test_arquivos_sem_referencias_saem_do_catalogo():
+    catalogo = CatalogoArquivos()
+    itens = catalogo.registar([_arquivo("a")])
+    assert len(catalogo) == 1
+    del itens
+    assert len(catalogo) == 0
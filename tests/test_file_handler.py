@@ -0,0 +1,39 @@
+import asyncio
+
+from benchmarks.fake_services import SharePointFalso
+from config import constants as app_constants
+from core.cache import CacheManager
+from core.file_catalog import CatalogoArquivos
+from handlers import file_handler
+from utils import helpers
+
+CONSTANTES = {nome: getattr(app_constants, nome) for nome in dir(app_constants) if nome.isupper()}
+
+
+class _SharePointContado(SharePointFalso):
+    def __init__(self):
+        super().__init__()
+        self.buscas = []
+
+    def search_files(self, termo):
+        self.buscas.append(termo)
+        return super().search_files(termo)
+
+
+def test_termos_com_maiusculas_acentos_e_espacos_partilham_a_chave():
+    chave = file_handler.chave_cache_busca("Relatório Mensal")
+    assert chave == file_handler.chave_cache_busca("relatorio  mensal")
+    assert chave == file_handler.chave_cache_busca(" RELATORIO mensal ")
+    assert chave != file_handler.chave_cache_busca("relatorio anual")
+
+
+def test_busca_com_outra_grafia_vem_do_cache():
+    sharepoint, cache, catalogo = _SharePointContado(), CacheManager(600, 300), CatalogoArquivos()
+
+    async def buscar(termo):
+        return await file_handler.buscar_arquivo_por_termo(termo, cache, sharepoint, None, CONSTANTES, helpers, catalogo)
+
+    primeira = asyncio.run(buscar("Relatorio"))
+    segunda = asyncio.run(buscar("relatório "))
+    assert sharepoint.buscas == ["Relatorio"]
+    assert primeira.split("\n", 1)[1] == segunda.split("\n", 1)[1]
@@ -0,0 +1,85 @@
+import asyncio
+import sqlite3
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from database import fragment_cache, models
+from database.session import criar_engine
+
+
+@pytest.fixture
+def engine(tmp_path, monkeypatch):
+    for nome, valor in (('_engine', None), ('_persistidas', {}), ('_locais', {}), ('_lidas_em', float('-inf'))):
+        monkeypatch.setattr(fragment_cache, nome, valor)
+    engine = criar_engine(f"sqlite:///{tmp_path / 'sofia.db'}")
+    models.Base.metadata.create_all(bind=engine)
+    fragment_cache.configurar(engine, intervalo_segundos=0)
+    yield engine
+    engine.dispose()
+
+
+def _escrever_noutro_processo(caminho):
+    conexao = sqlite3.connect(caminho)
+    with conexao:
+        conexao.execute("INSERT INTO projetos (nome) VALUES ('Orion')")
+        conexao.execute(fragment_cache.SQL_CRIAR_TABELA_VERSOES)
+        conexao.execute(fragment_cache.SQL_INCREMENTAR_VERSAO.replace(':tabela', "'projetos'"))
+    conexao.close()
+
+
+def test_escrita_pela_sessao_incrementa_versao_persistida(engine):
+    antes = fragment_cache.versao('projetos')
+    with sessionmaker(bind=engine)() as db:
+        db.add(models.Projeto(nome="Atlas"))
+        db.commit()
+    assert fragment_cache.versao('projetos') == antes + 1
+
+
+def test_escrita_de_outro_processo_invalida_fragmento(engine, tmp_path):
+    cache = fragment_cache.CacheFragmentos()
+    gerados = []
+    gerar = lambda: gerados.append(1) or f"projetos v{len(gerados)}"
+
+    assert cache.obter('projetos', gerar) == "projetos v1"
+    assert cache.obter('projetos', gerar) == "projetos v1"
+
+    # Outro processo (sem os listeners deste) grava e incrementa a versão na mesma transação
+    _escrever_noutro_processo(tmp_path / 'sofia.db')
+
+    assert cache.obter('projetos', gerar) == "projetos v2"
+
+
+def test_transacao_desfeita_nao_altera_versao(engine):
+    antes = fragment_cache.versao('projetos')
+    with sessionmaker(bind=engine)() as db:
+        db.add(models.Projeto(nome="Atlas"))
+        db.flush()
+        db.rollback()
+    assert fragment_cache.versao('projetos') == antes
+
+
+def test_incremento_local_sem_ligacao(engine):
+    antes = fragment_cache.versao('setores')
+    fragment_cache.incrementar_versao('setores')
+    assert fragment_cache.versao('setores') == antes + 1
+
+
+def test_leituras_usam_so_a_copia_em_memoria(engine, tmp_path):
+    antes = fragment_cache.versao('projetos')
+    _escrever_noutro_processo(tmp_path / 'sofia.db')
+    assert fragment_cache.versao('projetos') == antes
+
+    asyncio.run(fragment_cache.atualizar_versoes_async())
+    assert fragment_cache.versao('projetos') == antes + 1
+
+
+def test_commit_local_visivel_sem_reler_a_base_de_dados(engine):
+    fragment_cache.configurar(engine, intervalo_segundos=3600)
+    fragment_cache.atualizar_versoes()
+    antes = fragment_cache.versao('projetos')
+    with sessionmaker(bind=engine)() as db:
+        db.add(models.Projeto(nome="Atlas"))
+        db.commit()
+    assert fragment_cache.versao('projetos') == antes + 1
+    assert not fragment_cache._releitura_pendente()
@@ -0,0 +1,139 @@
+import asyncio
+import time
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from benchmarks.fake_services import OpenAIFalsa, Perturbacao
+from config import prompts
+from core.answer_cache import CacheRespostas
+from core.answer_index import IndiceRespostas
+from database import fragment_cache, models
+from database.fragment_cache import versao_conhecimento
+from database.session import criar_engine
+from handlers import general_handlers
+
+PERGUNTA = "Quem é o gerente do projeto Atlas?"
+
+
+class _Historico:
+    def __init__(self):
+        self.pedidos = 0
+
+    def format_for_prompt(self, user_id):
+        self.pedidos += 1
+        return ""
+
+
+def _perguntar(cache, historico, openai=None):
+    return asyncio.run(general_handlers.handle_general_question(
+        "u1", PERGUNTA, "Ana", None, openai or OpenAIFalsa(), historico, {},
+        cache_respostas=cache,
+    ))
+
+
+def test_hit_no_cache_ignora_a_preparacao_do_prompt(monkeypatch):
+    def _falhar(db, mensagem):
+        raise RuntimeError("a base de dados não devia ser precisa")
+
+    monkeypatch.setattr(prompts, 'gerar_fragmentos', _falhar)
+    cache = CacheRespostas()
+    cache.guardar(PERGUNTA, "neutro", versao_conhecimento(), "A Ana.")
+
+    assert _perguntar(cache, _Historico()) == "A Ana."
+
+
+def test_miss_no_cache_prepara_o_prompt_e_guarda_a_resposta(monkeypatch):
+    fragmentos = []
+    monkeypatch.setattr(prompts, 'gerar_fragmentos', lambda db, mensagem: fragmentos.append(mensagem) or [])
+    monkeypatch.setattr(prompts, 'completar_system_prompt', lambda fragmentos, historico, tom: "")
+    cache = CacheRespostas()
+    historico = _Historico()
+
+    resposta = _perguntar(cache, historico)
+    assert resposta.startswith("Resposta simulada")
+    assert len(fragmentos) == 1 and historico.pedidos == 1
+    assert cache.procurar(PERGUNTA, "neutro", versao_conhecimento())[0] == resposta
+
+
+def test_tom_e_fragmentos_em_paralelo_com_o_cache_configurado(monkeypatch):
+    def _fragmentos_lentos(db, mensagem):
+        time.sleep(0.2)
+        return []
+
+    monkeypatch.setattr(prompts, 'gerar_fragmentos', _fragmentos_lentos)
+    monkeypatch.setattr(prompts, 'completar_system_prompt', lambda fragmentos, historico, tom: "")
+    openai = OpenAIFalsa(Perturbacao(latencia=0.2))
+
+    inicio = time.perf_counter()
+    _perguntar(CacheRespostas(), _Historico(), openai)
+    # Tom (0.2 s) + fragmentos (0.2 s) + resposta (0.2 s): em série seriam 0.6 s
+    assert time.perf_counter() - inicio < 0.55
+
+
+@pytest.fixture
+def sessoes(tmp_path, monkeypatch):
+    for nome, valor in (('_engine', None), ('_persistidas', {}), ('_locais', {}), ('_lidas_em', float('-inf'))):
+        monkeypatch.setattr(fragment_cache, nome, valor)
+    engine = criar_engine(f"sqlite:///{tmp_path / 'sofia.db'}")
+    models.Base.metadata.create_all(bind=engine)
+    fragment_cache.configurar(engine, intervalo_segundos=3600)
+    yield sessionmaker(bind=engine)
+    engine.dispose()
+
+
+def _ensinar(user_states, mensagem, sessoes, indice):
+    return asyncio.run(general_handlers.handle_learning("u1", mensagem, user_states, CONSTANTES_APRENDIZADO, sessoes, indice))
+
+
+CONSTANTES_APRENDIZADO = {'LEARNING_TRIGGERS': ["quero te ensinar"], 'LEARNING_STEPS': {'resposta': 2}}
+
+
+def _estados():
+    return {'aprendizado_manual_ativo': {}, 'etapa_aprendizado': {}}
+
+
+def test_aprendizado_local_mantem_o_indice_sincronizado(sessoes):
+    indice = IndiceRespostas()
+    indice.versao = fragment_cache.versao('conhecimentos_manuais')
+    estados = _estados()
+
+    _ensinar(estados, "quero te ensinar: qual é o horário da daily?", sessoes, indice)
+    assert _ensinar(estados, "Às 9h30.", sessoes, indice).startswith("Aprendido!")
+
+    assert indice.procurar("qual é o horário da daily")[0] == "Às 9h30."
+    assert indice.versao == fragment_cache.versao('conhecimentos_manuais')
+    assert estados == _estados()
+    with sessoes() as db:
+        assert db.query(models.ConhecimentoManual).count() == 1
+
+
+def test_indice_desatualizado_continua_a_precisar_de_recarga(sessoes):
+    indice = IndiceRespostas()
+    indice.versao = fragment_cache.versao('conhecimentos_manuais') - 1
+    estados = _estados()
+
+    _ensinar(estados, "quero te ensinar: qual é o horário da daily?", sessoes, indice)
+    _ensinar(estados, "Às 9h30.", sessoes, indice)
+    assert indice.versao != fragment_cache.versao('conhecimentos_manuais')
+
+
+def test_falha_ao_gravar_mantem_a_pergunta_pendente(sessoes, monkeypatch):
+    indice = IndiceRespostas()
+    estados = _estados()
+    _ensinar(estados, "quero te ensinar: qual é o horário da daily?", sessoes, indice)
+
+    salvar = general_handlers._salvar_aprendizado
+    falhas = [RuntimeError("database is locked")]
+
+    def _falhar_uma_vez(*args):
+        if falhas:
+            raise falhas.pop()
+        return salvar(*args)
+
+    monkeypatch.setattr(general_handlers, '_salvar_aprendizado', _falhar_uma_vez)
+    assert _ensinar(estados, "Às 9h30.", sessoes, indice) == "Algo deu errado. Vamos tentar de novo."
+    assert estados['aprendizado_manual_ativo']['u1']['pergunta'] == "qual é o horário da daily?"
+
+    assert _ensinar(estados, "Às 9h30.", sessoes, indice).startswith("Aprendido!")
+    assert estados == _estados()
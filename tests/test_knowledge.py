@@ -0,0 +1,68 @@
+import asyncio
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.orm import sessionmaker
+
+from benchmarks.bench_knowledge_queries import _popular
+from database import models
+from database.knowledge import carregar_conhecimento, carregar_conhecimento_async
+from database.session import ExecutorBD, PoolSessoesLeitura, criar_engine
+
+
+@pytest.fixture
+def url(tmp_path):
+    return f"sqlite:///{tmp_path / 'sofia.db'}"
+
+
+def _criar_base(url, total_projetos):
+    engine = criar_engine(url)
+    models.Base.metadata.create_all(bind=engine)
+    _popular(sessionmaker(bind=engine), total_projetos, 3)
+    return engine
+
+
+def _contar_consultas(engine):
+    consultas = []
+    event.listen(engine, "before_cursor_execute", lambda *args: consultas.append(args[2]))
+    with sessionmaker(bind=engine)() as db:
+        conhecimento = carregar_conhecimento(db)
+    return conhecimento, len(consultas)
+
+
+def test_carrega_tudo_com_participantes(url):
+    engine = _criar_base(url, 4)
+    conhecimento, _ = _contar_consultas(engine)
+    engine.dispose()
+
+    assert conhecimento.persona == "Você é Sofia."
+    assert conhecimento.empresa.nome == "Sonar"
+    assert len(conhecimento.setores) == 5 and len(conhecimento.cerimonias) == 5
+    assert len(conhecimento.projetos) == 4
+    assert set(conhecimento.projetos[1].participantes) == {"Funcionário 1", "Funcionário 2", "Funcionário 3"}
+    assert len(conhecimento.conhecimentos) == 20
+
+
+def test_numero_de_consultas_nao_depende_do_numero_de_projetos(tmp_path):
+    pequena = _criar_base(f"sqlite:///{tmp_path / 'pequena.db'}", 2)
+    grande = _criar_base(f"sqlite:///{tmp_path / 'grande.db'}", 50)
+    _, consultas_pequena = _contar_consultas(pequena)
+    _, consultas_grande = _contar_consultas(grande)
+    pequena.dispose()
+    grande.dispose()
+
+    assert consultas_pequena == consultas_grande
+
+
+def test_versao_assincrona_devolve_o_mesmo_conhecimento(url):
+    engine = _criar_base(url, 6)
+    with sessionmaker(bind=engine)() as db:
+        esperado = carregar_conhecimento(db)
+    sessoes = PoolSessoesLeitura(criar_engine(url, somente_leitura=True))
+    executor_bd = ExecutorBD(sessoes)
+    try:
+        assert asyncio.run(carregar_conhecimento_async(executor_bd)) == esperado
+    finally:
+        executor_bd.fechar()
+        sessoes.fechar()
+        engine.dispose()
@@ -0,0 +1,40 @@
+import asyncio
+import threading
+
+from core.memory import ContabilidadeMemoria, tamanho_profundo
+
+
+def test_objetos_partilhados_contam_uma_vez():
+    partilhado = ["x" * 10_000]
+    contabilidade = ContabilidadeMemoria()
+    contabilidade.registar('primeiro', lambda: {'dados': partilhado})
+    contabilidade.registar('segundo', lambda: {'dados': partilhado})
+
+    tamanhos = contabilidade.medir_componentes()
+    assert tamanhos['primeiro'] >= tamanho_profundo(partilhado)
+    assert tamanhos['segundo'] < tamanho_profundo(partilhado)
+    assert sum(tamanhos.values()) < 2 * tamanho_profundo(partilhado)
+
+
+def test_registar_periodicamente_grava_fora_do_event_loop(tmp_path, monkeypatch):
+    contabilidade = ContabilidadeMemoria()
+    contabilidade.registar('lista', lambda: [1, 2, 3])
+    caminho = tmp_path / "memoria.jsonl"
+    threads = []
+    original = contabilidade.gravar_jsonl
+
+    def gravar(destino):
+        threads.append(threading.current_thread())
+        return original(destino)
+
+    monkeypatch.setattr(contabilidade, 'gravar_jsonl', gravar)
+
+    async def correr():
+        tarefa = asyncio.create_task(contabilidade.registar_periodicamente(str(caminho), 0.01))
+        while not threads:
+            await asyncio.sleep(0.01)
+        tarefa.cancel()
+
+    asyncio.run(correr())
+    assert threads[0] is not threading.main_thread()
+    assert caminho.read_text(encoding="utf-8").count("\n") >= 1
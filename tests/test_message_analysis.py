@@ -0,0 +1,25 @@
+from config import constants as app_constants
+from core import message_analysis
+from core.message_analysis import MessageAnalysis
+from utils import helpers
+
+CONSTANTES = {nome: getattr(app_constants, nome) for nome in dir(app_constants) if nome.isupper()}
+
+
+def test_termo_busca_e_extraido_uma_vez(monkeypatch):
+    chamadas = []
+    extrair = helpers.extract_search_term
+
+    def _contar(*args):
+        chamadas.append(args[0])
+        return extrair(*args)
+
+    monkeypatch.setattr(message_analysis.helpers, 'extract_search_term', _contar)
+    analise = MessageAnalysis("procura o relatório mensal de vendas", CONSTANTES)
+
+    assert analise.termo_busca == analise.termo_busca
+    assert analise.termo_busca == extrair(
+        analise.original, CONSTANTES.get('REGEX_PATTERNS', {}), CONSTANTES.get('FILE_KEYWORDS'),
+        CONSTANTES.get('MIN_WORD_LENGTH'), CONSTANTES.get('MAX_RELEVANT_WORDS'),
+    )
+    assert chamadas == ["procura o relatório mensal de vendas"]
@@ -0,0 +1,73 @@
+from core.prompt_assembler import MontadorPrompt
+
+
+def _palavras(texto):
+    return len(texto.split())
+
+
+def _montador(total, orcamentos, obrigatorias=("persona", "instrucoes")):
+    prioridades = {"persona": 0, "instrucoes": 0, "conhecimento": 1, "projetos": 2, "historico": 3}
+    return MontadorPrompt(total, orcamentos, prioridades, contar_tokens=_palavras, secoes_obrigatorias=obrigatorias)
+
+
+def _linhas(prefixo, quantidade, palavras=3):
+    return "\n".join(" ".join(f"{prefixo}{i}" for _ in range(palavras)) for i in range(quantidade))
+
+
+def test_tudo_cabe_sem_cortes():
+    montador = _montador(100, {})
+    prompt = montador.montar([("persona", "Você é a Sofia."), ("conhecimento", "Setores:\n" + _linhas("s", 2))])
+    assert prompt == "Você é a Sofia.\n\nSetores:\n" + _linhas("s", 2)
+    assert montador.ultima_medicao.secoes_cortadas == ()
+
+
+def test_secoes_menos_prioritarias_sao_cortadas_primeiro():
+    montador = _montador(20, {})
+    prompt = montador.montar([
+        ("projetos", "Projetos:\n" + _linhas("p", 4)),
+        ("conhecimento", "Setores:\n" + _linhas("s", 4)),
+    ])
+    medicao = montador.ultima_medicao
+    assert medicao.tokens_por_secao["conhecimento"] == 13
+    assert medicao.tokens_por_secao["projetos"] <= 7
+    assert medicao.secoes_cortadas == ("projetos",)
+    assert prompt.index("Projetos:") < prompt.index("Setores:")
+
+
+def test_orcamento_por_secao():
+    montador = _montador(100, {"conhecimento": 7})
+    montador.montar([("conhecimento", "Setores:\n" + _linhas("s", 4))])
+    assert montador.ultima_medicao.tokens_por_secao["conhecimento"] == 7
+
+
+def test_historico_e_cortado_do_inicio():
+    montador = _montador(100, {"historico": 7})
+    prompt = montador.montar([("historico", "Histórico:\n" + _linhas("m", 4))])
+    assert prompt == "Histórico:\nm2 m2 m2\nm3 m3 m3"
+
+
+def test_secoes_obrigatorias_nunca_sao_cortadas(capsys):
+    persona = "Você é a Sofia, uma assistente da Sonar, prestativa e clara."
+    montador = _montador(5, {"persona": 3, "instrucoes": 3})
+    prompt = montador.montar([
+        ("persona", persona),
+        ("instrucoes", "Responda sempre em português."),
+        ("conhecimento", "Setores:\n" + _linhas("s", 2)),
+    ])
+    assert prompt == persona + "\n\nResponda sempre em português."
+    assert montador.ultima_medicao.secoes_descartadas == ("conhecimento",)
+    assert "descartadas" in capsys.readouterr().out
+
+
+def test_fragmento_sem_espaco_para_uma_linha_e_cortado_por_caracteres():
+    montador = _montador(100, {"conhecimento": 4}, obrigatorias=())
+    prompt = montador.montar([("conhecimento", "Setores da empresa:\nEngenharia desenvolve e mantém os produtos")])
+    assert prompt.startswith("Setores da empresa:") and prompt.endswith("…")
+    assert _palavras(prompt) <= 4
+    assert montador.ultima_medicao.secoes_descartadas == ()
+
+
+def test_fragmento_de_uma_linha_e_cortado_em_vez_de_descartado():
+    montador = _montador(100, {"instrucoes": 3}, obrigatorias=())
+    prompt = montador.montar([("instrucoes", "Adote um tom formal e direto.")])
+    assert prompt == "Adote um tom…"
@@ -0,0 +1,148 @@
+import asyncio
+
+import pytest
+
+from core.resilience import CircuitoAberto, ClienteResiliente, Disjuntor, PoliticaResiliencia, e_falha_do_servico
+
+
+class ErroHttp(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+def _cliente(limiar=2, tempo_aberto=0.05, tentativas=1):
+    return ClienteResiliente("teste", PoliticaResiliencia(tentativas=tentativas, espera_base=0, limiar_falhas=limiar, tempo_aberto=tempo_aberto))
+
+
+async def _falhar(erro):
+    raise erro
+
+
+async def _ok():
+    return "ok"
+
+
+@pytest.mark.parametrize("erro, falha", [
+    (TimeoutError(), True),
+    (asyncio.TimeoutError(), True),
+    (ConnectionResetError(), True),
+    (ErroHttp(503), True),
+    (ErroHttp(404), False),
+    (ErroHttp(400), False),
+    (ValueError("resposta inválida"), False),
+])
+def test_so_erros_de_servidor_e_timeouts_sao_falhas(erro, falha):
+    assert e_falha_do_servico(erro) is falha
+
+
+def test_disjuntor_abre_fecha_e_volta_a_abrir():
+    disjuntor = Disjuntor(limiar_falhas=2, tempo_aberto=0.01)
+    disjuntor.registar_falha()
+    assert disjuntor.estado == "fechado"
+    disjuntor.registar_falha()
+    assert disjuntor.estado == "aberto" and disjuntor.permitir() > 0
+
+    asyncio.run(asyncio.sleep(0.02))
+    assert disjuntor.estado == "meio-aberto"
+    assert disjuntor.permitir() == 0.0
+    assert disjuntor.permitir() > 0  # só uma chamada de teste de cada vez
+    disjuntor.registar_falha()
+    assert disjuntor.estado == "aberto" and disjuntor.aberturas == 2
+
+    asyncio.run(asyncio.sleep(0.02))
+    assert disjuntor.permitir() == 0.0
+    disjuntor.registar_sucesso()
+    assert disjuntor.estado == "fechado" and disjuntor.permitir() == 0.0
+
+
+def test_erros_de_cliente_nao_abrem_o_disjuntor():
+    cliente = _cliente(limiar=2)
+
+    async def _executar():
+        for _ in range(5):
+            with pytest.raises(ErroHttp):
+                await cliente.chamar(_falhar, ErroHttp(404))
+        return await cliente.chamar(_ok)
+
+    assert asyncio.run(_executar()) == "ok"
+    assert cliente.metricas()['disjuntor'] == "fechado"
+    assert cliente.contadores['erros'] == 5 and cliente.contadores['falhas'] == 0
+
+
+def test_erros_de_cliente_nao_sao_repetidos():
+    cliente = _cliente(tentativas=3)
+    with pytest.raises(ErroHttp):
+        asyncio.run(cliente.chamar(_falhar, ErroHttp(400), idempotente=True))
+    assert cliente.contadores['chamadas'] == 1
+
+
+def test_timeouts_abrem_o_disjuntor_e_rejeitam_chamadas():
+    cliente = _cliente(limiar=2, tempo_aberto=10)
+
+    async def _executar():
+        for _ in range(2):
+            with pytest.raises(TimeoutError):
+                await cliente.chamar(_falhar, TimeoutError())
+        with pytest.raises(CircuitoAberto):
+            await cliente.chamar(_ok)
+
+    asyncio.run(_executar())
+    assert cliente.contadores['rejeitadas'] == 1
+
+
+def test_chamada_de_teste_cancelada_liberta_o_disjuntor():
+    cliente = _cliente(limiar=1, tempo_aberto=0.01)
+
+    async def _pendurada():
+        await asyncio.sleep(10)
+
+    async def _executar():
+        with pytest.raises(TimeoutError):
+            await cliente.chamar(_falhar, TimeoutError())
+        await asyncio.sleep(0.02)
+
+        teste = asyncio.create_task(cliente.chamar(_pendurada))
+        await asyncio.sleep(0.01)
+        teste.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await teste
+
+        # A próxima chamada pode testar o serviço, e o sucesso fecha o disjuntor
+        return await cliente.chamar(_ok)
+
+    assert asyncio.run(_executar()) == "ok"
+    assert cliente.disjuntor.estado == "fechado"
+
+
+def test_chamada_cancelada_sem_o_teste_nao_liberta_o_disjuntor():
+    cliente = _cliente(limiar=2, tempo_aberto=0.01)
+
+    async def _pendurada():
+        await asyncio.sleep(10)
+
+    async def _executar():
+        # Começa com o disjuntor fechado e continua pendurada enquanto ele abre
+        antiga = asyncio.create_task(cliente.chamar(_pendurada))
+        await asyncio.sleep(0)
+        for _ in range(2):
+            with pytest.raises(TimeoutError):
+                await cliente.chamar(_falhar, TimeoutError())
+        await asyncio.sleep(0.02)
+
+        teste = asyncio.create_task(cliente.chamar(_pendurada))
+        await asyncio.sleep(0)
+        antiga.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await antiga
+
+        # O teste continua em curso: outra chamada não pode testar ao mesmo tempo
+        with pytest.raises(CircuitoAberto):
+            await cliente.chamar(_ok)
+        teste.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await teste
+        return await cliente.chamar(_ok)
+
+    assert asyncio.run(_executar()) == "ok"
+    assert cliente.disjuntor.estado == "fechado"
@@ -0,0 +1,87 @@
+from database.knowledge import (
+    CerimoniaInfo, ConhecimentoInfo, ConhecimentoSnapshot, EmpresaInfo, FuncionarioInfo, GerenteInfo,
+    ProjetoInfo, SetorInfo,
+)
+from database.retrieval import (
+    Documento, IndiceBM25, documentos_do_conhecimento, estimar_tokens, selecionar_contexto,
+)
+
+
+def _conhecimento():
+    return ConhecimentoSnapshot(
+        persona="Você é Sofia.",
+        empresa=EmpresaInfo("Sonar", "Empresa de tecnologia."),
+        setores=(SetorInfo("Financeiro", "Trata da faturação e dos pagamentos."), SetorInfo("Marketing", "Campanhas.")),
+        funcionarios=(FuncionarioInfo("Ana Silva", "Dev"), FuncionarioInfo("Bruno Costa", "")),
+        gerentes=(GerenteInfo("Carla Dias", "Tecnologia"),),
+        projetos=(
+            ProjetoInfo("Atlas", "Portal de clientes.", "Ativo", ("Ana Silva",)),
+            ProjetoInfo("Legado", "Migração antiga.", "Concluído", ()),
+        ),
+        conhecimentos=(ConhecimentoInfo("Qual é o horário?", "Das 9h às 18h."),),
+        cerimonias=(CerimoniaInfo("Daily", "Reunião diária de 15 minutos."),),
+    )
+
+
+def test_documentos_cobrem_cada_linha_do_conhecimento():
+    documentos = documentos_do_conhecimento(_conhecimento())
+
+    assert Documento("Membros da Equipa", "- Ana Silva (Dev)") in documentos
+    assert Documento("Membros da Equipa", "- Bruno Costa") in documentos
+    assert Documento("Participação em Projetos", "- No projeto **Atlas** participam: Ana Silva.") in documentos
+    # Só os projetos ativos entram na lista de projetos atuais
+    projetos = [d.texto for d in documentos if d.secao == "Principais Projetos Atuais"]
+    assert projetos == ["- **Atlas**: Portal de clientes."]
+
+
+def test_procurar_ordena_por_relevancia_e_respeita_k():
+    indice = IndiceBM25(documentos_do_conhecimento(_conhecimento()))
+
+    resultados = indice.procurar("quem trata dos pagamentos e da faturação?", 3)
+
+    assert resultados[0][1].texto.startswith("- **Financeiro**")
+    assert len(resultados) <= 3
+    pontuacoes = [pontuacao for pontuacao, _ in resultados]
+    assert pontuacoes == sorted(pontuacoes, reverse=True) and all(p > 0 for p in pontuacoes)
+
+
+def test_procurar_ignora_palavras_de_ligacao_e_termos_desconhecidos():
+    indice = IndiceBM25(documentos_do_conhecimento(_conhecimento()))
+
+    assert indice.procurar("o que é que a Sofia sabe sobre xyzzy?", 5) == []
+    assert IndiceBM25([]).procurar("Atlas", 5) == []
+
+
+def test_secao_entra_nos_termos_pesquisaveis():
+    indice = IndiceBM25(documentos_do_conhecimento(_conhecimento()))
+
+    secoes = {documento.secao for _, documento in indice.procurar("rituais", 5)}
+
+    assert secoes == {"Rituais e Cerimónias"}
+
+
+def test_selecionar_contexto_agrupa_por_secao():
+    indice = IndiceBM25(documentos_do_conhecimento(_conhecimento()))
+
+    contexto = dict(selecionar_contexto(indice, "Atlas", top_k=5, orcamento_tokens=1000))
+
+    assert set(contexto) == {"Principais Projetos Atuais", "Participação em Projetos"}
+    assert contexto["Principais Projetos Atuais"] == "### Principais Projetos Atuais\n- **Atlas**: Portal de clientes."
+
+
+def test_selecionar_contexto_respeita_orcamento_de_tokens():
+    documentos = [
+        Documento("A", "atlas " + "x" * 400),
+        Documento("B", "atlas curto"),
+    ]
+    indice = IndiceBM25(documentos)
+
+    contexto = selecionar_contexto(indice, "atlas", top_k=5, orcamento_tokens=estimar_tokens("atlas curto"))
+
+    # O documento longo não cabe no orçamento e é saltado, mas o curto ainda entra
+    assert contexto == [("B", "### B\natlas curto")]
+
+
+def test_estimar_tokens():
+    assert estimar_tokens("") == 1
+    assert estimar_tokens("a" * 40) == 10
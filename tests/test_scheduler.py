@@ -0,0 +1,106 @@
+import asyncio
+
+from core.scheduler import EscalonadorFaixas
+
+
+async def _mensagem(escalonador, user_id, nome, ordem, libertar):
+    async with escalonador.vez("boards", user_id):
+        ordem.append(nome)
+        await libertar.wait()
+
+
+def test_rodizio_entre_usuarios():
+    async def correr():
+        escalonador = EscalonadorFaixas({"boards": 1})
+        ordem, libertar = [], asyncio.Event()
+        libertar.set()
+        bloqueio = asyncio.Event()
+        primeira = asyncio.create_task(_mensagem(escalonador, "a", "a1", ordem, bloqueio))
+        await asyncio.sleep(0)
+        outras = [
+            asyncio.create_task(_mensagem(escalonador, user, nome, ordem, libertar))
+            for user, nome in (("a", "a2"), ("a", "a3"), ("a", "a4"), ("b", "b1"), ("c", "c1"))
+        ]
+        await asyncio.sleep(0)
+        assert escalonador.metricas()["boards"]["em_espera"] == 5
+        bloqueio.set()
+        await asyncio.gather(primeira, *outras)
+        return ordem, escalonador.metricas()["boards"]
+
+    ordem, metricas = asyncio.run(correr())
+    assert ordem == ["a1", "a2", "b1", "c1", "a3", "a4"]
+    assert metricas["atendidas"] == 6 and metricas["ativas"] == 0
+
+
+def test_mensagem_cancelada_na_fila_nao_ocupa_vaga():
+    async def correr():
+        escalonador = EscalonadorFaixas({"boards": 1})
+        ordem, bloqueio, libertar = [], asyncio.Event(), asyncio.Event()
+        libertar.set()
+        primeira = asyncio.create_task(_mensagem(escalonador, "a", "a1", ordem, bloqueio))
+        await asyncio.sleep(0)
+        cancelada = asyncio.create_task(_mensagem(escalonador, "b", "b1", ordem, libertar))
+        seguinte = asyncio.create_task(_mensagem(escalonador, "c", "c1", ordem, libertar))
+        await asyncio.sleep(0)
+        cancelada.cancel()
+        await asyncio.sleep(0)
+        bloqueio.set()
+        await asyncio.gather(primeira, seguinte)
+        return ordem, cancelada.cancelled(), escalonador.metricas()["boards"]
+
+    ordem, foi_cancelada, metricas = asyncio.run(correr())
+    assert foi_cancelada
+    assert ordem == ["a1", "c1"]
+    assert metricas["ativas"] == 0 and metricas["em_espera"] == 0
+
+
+def test_cancelada_depois_de_receber_a_vaga_passa_a_vez():
+    async def correr():
+        escalonador = EscalonadorFaixas({"boards": 1})
+        ordem, libertar, bloqueio = [], asyncio.Event(), asyncio.Event()
+        libertar.set()
+        primeira = asyncio.create_task(_mensagem(escalonador, "a", "a1", ordem, bloqueio))
+        await asyncio.sleep(0)
+        cancelada = asyncio.create_task(_mensagem(escalonador, "b", "b1", ordem, libertar))
+        seguinte = asyncio.create_task(_mensagem(escalonador, "c", "c1", ordem, libertar))
+        await asyncio.sleep(0)
+
+        # Cancela a 'b1' logo depois de a vaga lhe ser entregue, antes de ela voltar a correr
+        faixa = escalonador.faixas["boards"]
+        libertar_original = faixa.libertar
+
+        def libertar_e_cancelar():
+            libertar_original()
+            faixa.libertar = libertar_original
+            cancelada.cancel()
+
+        faixa.libertar = libertar_e_cancelar
+        bloqueio.set()
+        await asyncio.wait_for(asyncio.gather(primeira, seguinte), timeout=1)
+        await asyncio.gather(cancelada, return_exceptions=True)
+        return ordem, cancelada.cancelled(), escalonador.metricas()["boards"]
+
+    ordem, foi_cancelada, metricas = asyncio.run(correr())
+    assert foi_cancelada
+    assert ordem == ["a1", "c1"]
+    assert metricas["ativas"] == 0
+
+
+def test_faixa_rapida_sem_limite():
+    async def correr():
+        escalonador = EscalonadorFaixas({"boards": 1})
+        dentro = 0
+        maximo = 0
+
+        async def rapida():
+            nonlocal dentro, maximo
+            async with escalonador.vez("rapida", "a"):
+                dentro += 1
+                maximo = max(maximo, dentro)
+                await asyncio.sleep(0)
+                dentro -= 1
+
+        await asyncio.gather(*(rapida() for _ in range(5)))
+        return maximo
+
+    assert asyncio.run(correr()) == 5
@@ -0,0 +1,98 @@
+import asyncio
+import threading
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from database.session import BUSY_TIMEOUT_MS, ExecutorBD, PoolSessoesLeitura, criar_engine
+
+
+@pytest.fixture
+def url(tmp_path):
+    url = f"sqlite:///{tmp_path / 'sofia.db'}"
+    engine = criar_engine(url)
+    with engine.begin() as ligacao:
+        ligacao.execute(text("CREATE TABLE itens (id INTEGER PRIMARY KEY, nome TEXT)"))
+        ligacao.execute(text("INSERT INTO itens (nome) VALUES ('a'), ('b')"))
+    engine.dispose()
+    return url
+
+
+def _pragma(ligacao, nome):
+    return ligacao.exec_driver_sql(f"PRAGMA {nome}").scalar()
+
+
+def test_criar_engine_aplica_pragmas(url):
+    engine = criar_engine(url, mmap_size=1024 * 1024, cache_size_kb=2048)
+    with engine.connect() as ligacao:
+        assert _pragma(ligacao, "journal_mode") == "wal"
+        assert _pragma(ligacao, "synchronous") == 1  # NORMAL
+        assert _pragma(ligacao, "cache_size") == -2048
+        assert _pragma(ligacao, "temp_store") == 2  # MEMORY
+        assert _pragma(ligacao, "busy_timeout") == BUSY_TIMEOUT_MS
+        assert _pragma(ligacao, "query_only") == 0
+    engine.dispose()
+
+
+def test_engine_somente_leitura_recusa_escritas(url):
+    engine = criar_engine(url, somente_leitura=True)
+    with engine.connect() as ligacao:
+        assert _pragma(ligacao, "query_only") == 1
+        assert ligacao.execute(text("SELECT COUNT(*) FROM itens")).scalar() == 2
+        with pytest.raises(OperationalError):
+            ligacao.execute(text("INSERT INTO itens (nome) VALUES ('c')"))
+    engine.dispose()
+
+
+def test_pool_reutiliza_sessoes_e_regista_metricas(url):
+    sessoes = PoolSessoesLeitura(criar_engine(url, somente_leitura=True), tamanho_maximo=1)
+
+    with sessoes.sessao() as primeira:
+        with sessoes.sessao() as segunda:
+            assert segunda is not primeira
+            assert sessoes.metricas()['sessoes_em_uso'] == 2
+    with sessoes.sessao() as terceira:
+        # A LifoQueue só guarda uma sessão livre: a última devolvida é a reutilizada
+        assert terceira is segunda
+
+    metricas = sessoes.metricas()
+    assert metricas['sessoes_criadas'] == 2
+    assert metricas['sessoes_reutilizadas'] == 1
+    assert metricas['sessoes_em_uso'] == 0
+    assert metricas['max_sessoes_em_uso'] == 2
+    assert metricas['sessoes_livres'] == 1
+    sessoes.fechar()
+    assert sessoes.metricas()['sessoes_livres'] == 0
+
+
+def test_sessao_devolvida_ao_pool_termina_a_transacao(url):
+    sessoes = PoolSessoesLeitura(criar_engine(url, somente_leitura=True))
+
+    with sessoes.sessao() as db:
+        db.execute(text("SELECT COUNT(*) FROM itens"))
+        assert db.in_transaction()
+    assert not db.in_transaction()
+    sessoes.fechar()
+
+
+def test_executor_corre_consultas_fora_do_event_loop(url):
+    sessoes = PoolSessoesLeitura(criar_engine(url, somente_leitura=True))
+    executor_bd = ExecutorBD(sessoes, max_threads=2)
+
+    def _consulta(db, nome):
+        return threading.current_thread().name, db.execute(
+            text("SELECT COUNT(*) FROM itens WHERE nome = :nome"), {"nome": nome}
+        ).scalar()
+
+    async def _correr():
+        return await asyncio.gather(executor_bd.executar(_consulta, "a"), executor_bd.executar(_consulta, "z"))
+
+    try:
+        (thread_a, total_a), (thread_z, total_z) = asyncio.run(_correr())
+    finally:
+        executor_bd.fechar()
+        sessoes.fechar()
+
+    assert (total_a, total_z) == (1, 0)
+    assert thread_a.startswith("sofia-bd") and thread_z.startswith("sofia-bd")
@@ -0,0 +1,50 @@
+import asyncio
+
+from core.warmup import EstadoAquecimento, executar_aquecimento
+
+
+def _aquecer(tarefas):
+    return asyncio.run(executar_aquecimento(tarefas, 2, EstadoAquecimento()))
+
+
+async def _ok():
+    return object()
+
+
+async def _sem_dados():
+    return None
+
+
+async def _falha():
+    raise ConnectionError("Azure indisponível")
+
+
+def test_pronto_quando_alguma_tarefa_tem_sucesso():
+    estado = _aquecer({'Sonar': _ok, 'Atlas': _falha})
+    assert estado.pronto
+    assert estado.erros == {'Atlas': "ConnectionError: Azure indisponível"}
+
+
+def test_nao_fica_pronto_se_todas_as_tarefas_falharem():
+    estado = _aquecer({'Sonar': _sem_dados, 'Atlas': _falha})
+    assert not estado.pronto
+    assert set(estado.resumo()['erros']) == {'Sonar', 'Atlas'}
+
+
+def test_sem_tarefas_fica_pronto():
+    assert _aquecer({}).pronto
+
+
+def test_estado_publicado_no_cache_partilhado_e_adotado_por_outro_worker(tmp_path):
+    from core.shared_cache import CacheCompartilhado
+    from core.warmup import CHAVE_ESTADO_PARTILHADO
+
+    lider = _aquecer({'Sonar': _ok, 'Atlas': _falha})
+    CacheCompartilhado(str(tmp_path / "partilhado.db")).set(CHAVE_ESTADO_PARTILHADO, lider.resumo(), 600)
+
+    seguidor = EstadoAquecimento()
+    resumo, _ = CacheCompartilhado(str(tmp_path / "partilhado.db")).get(CHAVE_ESTADO_PARTILHADO)
+    seguidor.copiar_resumo(resumo)
+
+    assert seguidor.pronto
+    assert seguidor.resumo() == lider.resumo()
@@ -5,8 +5,39 @@ reutilizadas em diferentes partes da aplicação. Elas não devem manter estado.
 
 import re
 import traceback
+import unicodedata
 from datetime import datetime
 
+
+def normalizar_texto(texto: str) -> str:
+    """
+    Converte um texto para minúsculas e remove os acentos.
+
+    Args:
+        texto (str): O texto a ser normalizado.
+
+    Returns:
+        str: O texto normalizado (ex: 'João Ávila' -> 'joao avila').
+    """
+    if not texto:
+        return ""
+    decomposto = unicodedata.normalize('NFKD', str(texto).lower())
+    return "".join(c for c in decomposto if not unicodedata.combining(c))
+
+
+def tokenizar(texto: str) -> list:
+    """
+    Normaliza um texto e divide-o em palavras, descartando a pontuação.
+
+    Args:
+        texto (str): O texto a ser dividido.
+
+    Returns:
+        list: A lista de palavras normalizadas.
+    """
+    return re.findall(r'\w+', normalizar_texto(texto))
+
+
 def formatar_data_com_hora(data_iso: str) -> str:
     """
     Converte uma string de data no formato ISO 8601 para um formato legível.
@@ -77,7 +108,7 @@ def obter_url_valida(arquivo: dict, url_fields: list, url_validation_patterns: l
             return url
     return "#"
 
-def extrair_quantidade_listagem(message: str, regex_patterns: dict, default_limit: int, max_limit: int) -> int:
+def extrair_quantidade_listagem(message: str, regex_patterns: dict, default_limit: int, max_limit: int, numeros: tuple = None) -> int:
     """
     Extrai um número de uma mensagem para determinar a quantidade de itens.
 
@@ -86,10 +117,15 @@ def extrair_quantidade_listagem(message: str, regex_patterns: dict, default_limi
         regex_patterns (dict): Dicionário contendo os padrões de regex.
         default_limit (int): O valor padrão a ser retornado se nenhum número for encontrado.
         max_limit (int): O valor máximo permitido.
+        numeros (tuple): Os números já extraídos da mensagem (MessageAnalysis.numeros).
+                         Se for vazio, os padrões de regex nem são testados.
 
     Returns:
         int: A quantidade extraída, limitada entre 1 e max_limit.
     """
+    if numeros is not None and not numeros:
+        return default_limit
+
     message_lower = message.lower()
     
     for pattern in regex_patterns.get('quantity_patterns', []):
@@ -121,7 +157,7 @@ def extract_search_term(message: str, regex_patterns: dict, file_keywords: list,
     clean_message = re.sub(regex_patterns.get('action_cleaning', ''), '', message, flags=re.IGNORECASE)
     clean_message = re.sub(regex_patterns.get('articles_cleaning', ''), '', clean_message, flags=re.IGNORECASE)
     
-    file_extension_pattern = re.compile(regex_patterns.get('file_extension', r'\.\w{2,4}$'), re.IGNORECASE)
+    file_extension_pattern = regex_patterns.get('file_extension_compiled') or re.compile(regex_patterns.get('file_extension', r'\.\w{2,4}$'), re.IGNORECASE)
     file_match = file_extension_pattern.search(clean_message)
     if file_match:
         words = clean_message.split()